@@ -52,6 +52,10 @@ class Collection:
     group: str = None
     store_type: str = None
     config: str = None
+    slicer: str = None
+    execution_backend: str = None
+    granule_access: str = None
+    chunks: str = None
 
     @staticmethod
     def __decode_dimension_names(dimension_names_dict):
@@ -93,6 +97,7 @@ class Collection:
             preprocess = json.dumps(properties['preprocess']) if 'preprocess' in properties else None
             extra_processors = json.dumps(properties['processors']) if 'processors' in properties else None
             config = properties['config'] if 'config' in properties else None
+            chunks = json.dumps(properties['chunks']) if 'chunks' in properties else None
 
             projection = properties['projection'] if 'projection' in properties else None
 
@@ -109,7 +114,11 @@ class Collection:
                                     processors=extra_processors,
                                     group=properties.get('group'),
                                     store_type=store_type,
-                                    config=config
+                                    config=config,
+                                    slicer=properties.get('slicer'),
+                                    execution_backend=properties.get('executionBackend'),
+                                    granule_access=properties.get('granuleAccess'),
+                                    chunks=chunks
                                     )
             return collection
         except KeyError as e:
@@ -135,7 +135,7 @@ class CollectionProcessor:
                 'resource': granule_path
             },
             'slicer': {
-                'name': 'sliceFileByStepSize',
+                'name': collection.slicer or 'sliceFileByStepSize',
                 'dimension_step_sizes': dict(collection.slices)
             },
             'processors': CollectionProcessor._get_default_processors(collection)
@@ -150,6 +150,15 @@ class CollectionProcessor:
         if collection.group is not None:
             config_dict['granule']['group'] = collection.group
 
+        if collection.granule_access is not None:
+            config_dict['granule']['access'] = collection.granule_access
+
+        if collection.chunks is not None:
+            config_dict['granule']['chunks'] = json.loads(collection.chunks)
+
+        if collection.execution_backend is not None:
+            config_dict['execution_backend'] = collection.execution_backend
+
         config_str = yaml.dump(config_dict)
         logger.debug(f"Templated dataset config:\n{config_str}")
         return config_str
@@ -93,6 +93,73 @@ class TestCollectionProcessor(unittest.TestCase):
 
         self.assertEqual(expected, generated_yaml)
 
+    def test_fill_template_with_slicer(self):
+        collection = Collection(dataset_id="test_dataset",
+                                path="/granules/test*.nc",
+                                projection="Grid",
+                                slices=frozenset([('lat', 30), ('lon', 30), ('time', 1)]),
+                                dimension_names=frozenset([
+                                    ('latitude', 'lat'),
+                                    ('longitude', 'lon'),
+                                    ('variable', 'test_var')
+                                ]),
+                                historical_priority=1,
+                                slicer='sliceFileByChunks')
+        filled = CollectionProcessor._generate_ingestion_message("/granules/test_granule.nc", collection)
+        generated_yaml = yaml.load(filled, Loader=yaml.FullLoader)
+
+        self.assertEqual({'name': 'sliceFileByChunks', 'dimension_step_sizes': {'lat': 30, 'lon': 30, 'time': 1}},
+                         generated_yaml['slicer'])
+
+    def test_fill_template_with_execution_backend(self):
+        collection = Collection(dataset_id="test_dataset",
+                                path="/granules/test*.nc",
+                                projection="Grid",
+                                slices=frozenset([('lat', 30), ('lon', 30)]),
+                                dimension_names=frozenset([
+                                    ('latitude', 'lat'),
+                                    ('longitude', 'lon'),
+                                    ('variable', 'test_var')
+                                ]),
+                                historical_priority=1,
+                                execution_backend='thread')
+        filled = CollectionProcessor._generate_ingestion_message("/granules/test_granule.nc", collection)
+        generated_yaml = yaml.load(filled, Loader=yaml.FullLoader)
+
+        self.assertEqual('thread', generated_yaml['execution_backend'])
+
+    def test_fill_template_with_granule_access(self):
+        collection = Collection(dataset_id="test_dataset",
+                                path="s3://test-bucket/granules/test*.nc",
+                                projection="Grid",
+                                slices=frozenset([('lat', 30), ('lon', 30)]),
+                                dimension_names=frozenset([
+                                    ('latitude', 'lat'),
+                                    ('longitude', 'lon'),
+                                    ('variable', 'test_var')
+                                ]),
+                                historical_priority=1,
+                                granule_access='ranged')
+        filled = CollectionProcessor._generate_ingestion_message("s3://test-bucket/granules/test_granule.nc",
+                                                                 collection)
+        generated_yaml = yaml.load(filled, Loader=yaml.FullLoader)
+
+        self.assertEqual('ranged', generated_yaml['granule']['access'])
+
+    def test_fill_template_with_chunks(self):
+        collection = Collection.from_dict({'id': 'test_dataset',
+                                           'path': '/granules/test*.nc',
+                                           'priority': 1,
+                                           'projection': 'Grid',
+                                           'dimensionNames': {'latitude': 'lat', 'longitude': 'lon',
+                                                              'variable': 'test_var'},
+                                           'slices': {'lat': 30, 'lon': 30},
+                                           'chunks': {'time': 1, 'lat': 1000, 'lon': 1000}})
+        filled = CollectionProcessor._generate_ingestion_message("/granules/test_granule.nc", collection)
+        generated_yaml = yaml.load(filled, Loader=yaml.FullLoader)
+
+        self.assertEqual({'time': 1, 'lat': 1000, 'lon': 1000}, generated_yaml['granule']['chunks'])
+
     @async_test
     @mock.patch('collection_manager.services.history_manager.FileIngestionHistory', new_callable=AsyncMock)
     @mock.patch('collection_manager.services.history_manager.FileIngestionHistoryBuilder', autospec=True)
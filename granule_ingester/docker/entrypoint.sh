@@ -35,5 +35,20 @@ python /sdap/granule_ingester/main.py \
   $([[ ! -z "$ELASTIC_PASSWORD" ]] && echo --elastic-password=$ELASTIC_PASSWORD) \
   $([[ ! -z "$ELASTIC_INDEX" ]] && echo --elastic-index=$ELASTIC_INDEX) \
   $([[ ! -z "$MAX_THREADS" ]] && echo --max-threads=$MAX_THREADS) \
+  $([[ ! -z "$MAX_PENDING_TILES" ]] && echo --max-pending-tiles=$MAX_PENDING_TILES) \
+  $([[ ! -z "$MAX_PENDING_MIB" ]] && echo --max-pending-mib=$MAX_PENDING_MIB) \
+  $([[ ! -z "$TILE_MEMORY_CEILING" ]] && echo --tile-memory-ceiling=$TILE_MEMORY_CEILING) \
+  $([[ ! -z "$LOCAL_SINK_DIR" ]] && echo --local-sink-dir=$LOCAL_SINK_DIR) \
+  $([[ ! -z "$CHECKPOINT_DIR" ]] && echo --checkpoint-dir=$CHECKPOINT_DIR) \
+  $([[ ! -z "$SKIP_UNCHANGED_TILES" ]] && echo --skip-unchanged-tiles) \
+  $([[ ! -z "$S3_PART_SIZE_MIB" ]] && echo --s3-part-size-mib=$S3_PART_SIZE_MIB) \
+  $([[ ! -z "$S3_DOWNLOAD_CONCURRENCY" ]] && echo --s3-download-concurrency=$S3_DOWNLOAD_CONCURRENCY) \
+  $([[ ! -z "$GRANULE_CACHE_DIR" ]] && echo --granule-cache-dir=$GRANULE_CACHE_DIR) \
+  $([[ ! -z "$GRANULE_CACHE_MIB" ]] && echo --granule-cache-mib=$GRANULE_CACHE_MIB) \
+  $([[ ! -z "$EXECUTION_BACKEND" ]] && echo --execution-backend=$EXECUTION_BACKEND) \
+  $([[ ! -z "$MAX_CONCURRENT_GRANULES" ]] && echo --max-concurrent-granules=$MAX_CONCURRENT_GRANULES) \
+  $([[ ! -z "$PREFETCH_GRANULES" ]] && echo --prefetch-granules=$PREFETCH_GRANULES) \
+  $([[ ! -z "$GRANULE_MEMORY_BUDGET" ]] && echo --granule-memory-budget=$GRANULE_MEMORY_BUDGET) \
+  $([[ ! -z "$METRICS_PORT" ]] && echo --metrics-port=$METRICS_PORT) \
   $([[ ! -z "$VERBOSE" ]] && echo --verbose)
   $([[ ! -z "$IS_VERBOSE" ]] && echo --verbose)
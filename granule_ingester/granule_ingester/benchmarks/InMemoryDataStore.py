@@ -0,0 +1,47 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import List
+
+from nexusproto import DataTile_pb2 as nexusproto
+
+from granule_ingester.writers import DataStore
+
+
+class InMemoryDataStore(DataStore):
+    """
+    A DataStore that only counts what it is given, so that benchmarks measure the pipeline rather than Cassandra.
+    """
+
+    def __init__(self):
+        self.tile_count = 0
+        self.tile_bytes = 0
+
+    def connect(self):
+        pass
+
+    def close(self):
+        pass
+
+    async def health_check(self) -> bool:
+        return True
+
+    def save_data(self, nexus_tile: nexusproto.NexusTile) -> None:
+        self.tile_count += 1
+        self.tile_bytes += nexus_tile.tile.ByteSize()
+
+    async def save_batch(self, tiles: List[nexusproto.NexusTile]) -> None:
+        for tile in tiles:
+            self.save_data(tile)
@@ -0,0 +1,231 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Runs the ingestion pipeline end to end on synthetic granules, against in-memory stores, and reports its throughput:
+tiles/s, MB/s of serialized tiles, peak RSS of the benchmark process, and the time spent in each tile processor.
+
+    python -m granule_ingester.benchmarks.run_benchmarks --granules grid swath --output baseline.json
+    python -m granule_ingester.benchmarks.run_benchmarks --granules grid swath --baseline baseline.json
+
+Peak RSS is that of the benchmark process, so it does not include the worker processes of the process backend.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from granule_ingester.benchmarks.InMemoryDataStore import InMemoryDataStore
+from granule_ingester.benchmarks.InMemoryMetadataStore import InMemoryMetadataStore
+from granule_ingester.benchmarks.synthetic_granules import granule_generators
+from granule_ingester.metrics.GranuleMetrics import PROCESSOR
+from granule_ingester.pipeline import Pipeline, WorkerPool, worker_pools
+
+logger = logging.getLogger(__name__)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    unit = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit / 2 ** 20
+
+
+async def run_benchmark(granule_type: str,
+                        config: dict,
+                        worker_pool: WorkerPool,
+                        repeat: int = 1) -> dict:
+    """
+    Ingests the granule described by config repeat times and returns the results of the fastest run.
+    """
+    best = None
+    for _ in range(max(1, repeat)):
+        data_store = InMemoryDataStore()
+        metadata_store = InMemoryMetadataStore()
+        pipeline = Pipeline.from_string(json.dumps(config),
+                                        data_store_factory=lambda: data_store,
+                                        metadata_store_factory=lambda: metadata_store,
+                                        max_concurrency=worker_pool.max_concurrency,
+                                        worker_pool=worker_pool)
+        pipeline.set_log_level(logging.getLogger().level)
+
+        start = time.perf_counter()
+        await pipeline.run()
+        seconds = time.perf_counter() - start
+
+        if best is None or seconds < best['seconds']:
+            metrics = pipeline.metrics
+            best = {
+                'granule_type': granule_type,
+                'backend': worker_pool.backend,
+                'tiles': data_store.tile_count,
+                'bytes': metrics.tile_bytes,
+                'seconds': seconds,
+                'tiles_per_second': data_store.tile_count / seconds,
+                'mb_per_second': metrics.tile_bytes / seconds / 2 ** 20,
+                'processor_seconds': {name: processor_seconds
+                                      for (stage, name), processor_seconds in sorted(metrics.stage_seconds.items())
+                                      if stage == PROCESSOR},
+            }
+    best['peak_rss_mb'] = peak_rss_mb()
+    return best
+
+
+async def run_benchmarks(granule_types: List[str],
+                         scale: float = 1.0,
+                         backend: str = 'process',
+                         max_concurrency: int = 8,
+                         repeat: int = 1,
+                         work_dir: str = None) -> List[dict]:
+    with tempfile.TemporaryDirectory(dir=work_dir) as temp_dir:
+        configs = {}
+        for granule_type in granule_types:
+            logger.info(f'Generating {granule_type} granule at scale {scale}')
+            configs[granule_type] = granule_generators[granule_type](os.path.join(temp_dir, f'{granule_type}.nc'),
+                                                                     scale)
+
+        # One pool for every run, so that its start-up cost is not part of the measurements.
+        async with worker_pools[backend](max_concurrency, logging.getLogger().level) as worker_pool:
+            return [await run_benchmark(granule_type, configs[granule_type], worker_pool, repeat)
+                    for granule_type in granule_types]
+
+
+def _key(result: dict) -> Tuple[str, str]:
+    return result['granule_type'], result['backend']
+
+
+def _by_key(results: List[dict]) -> Dict[Tuple[str, str], dict]:
+    return {_key(result): result for result in results}
+
+
+def compare_to_baseline(results: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    """
+    Returns a description of every granule type whose throughput dropped by more than tolerance (a fraction) from the
+    baseline run on the same execution backend.
+    """
+    baseline_by_key = _by_key(baseline)
+    regressions = []
+    for result in results:
+        previous = baseline_by_key.get(_key(result))
+        if previous is None:
+            continue
+        ratio = result['tiles_per_second'] / previous['tiles_per_second']
+        if ratio < 1 - tolerance:
+            regressions.append(f"{result['granule_type']} ({result['backend']}): "
+                               f"{result['tiles_per_second']:.1f} tiles/s is "
+                               f"{(1 - ratio) * 100:.1f}% slower than the baseline's "
+                               f"{previous['tiles_per_second']:.1f} tiles/s")
+    return regressions
+
+
+def format_report(results: List[dict], baseline: List[dict] = None) -> str:
+    baseline_by_key = _by_key(baseline or [])
+    lines = [f"{'granule':<14}{'backend':<9}{'tiles':>8}{'seconds':>10}{'tiles/s':>10}{'MB/s':>9}{'RSS MB':>9}"
+             f"{'vs base':>9}"]
+    for result in results:
+        previous = baseline_by_key.get(_key(result))
+        change = f"{(result['tiles_per_second'] / previous['tiles_per_second'] - 1) * 100:+.1f}%" if previous else '-'
+        lines.append(f"{result['granule_type']:<14}{result['backend']:<9}{result['tiles']:>8}"
+                     f"{result['seconds']:>10.2f}{result['tiles_per_second']:>10.1f}{result['mb_per_second']:>9.2f}"
+                     f"{result['peak_rss_mb']:>9.0f}{change:>9}")
+        for name, seconds in result['processor_seconds'].items():
+            lines.append(f"{'':<14}{name:<40}{seconds:>9.3f}s")
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the granule ingestion pipeline on synthetic granules.')
+    parser.add_argument('--granules',
+                        nargs='+',
+                        default=list(granule_generators.keys()),
+                        choices=list(granule_generators.keys()),
+                        help='Types of granule to benchmark. (Default: all of them)')
+    parser.add_argument('--scale',
+                        type=float,
+                        default=1.0,
+                        help='Size of the synthetic granules, relative to the default size. (Default: 1.0)')
+    parser.add_argument('--execution-backend',
+                        default='process',
+                        choices=list(worker_pools.keys()),
+                        help='Execution backend to process tiles with. (Default: process)')
+    parser.add_argument('--max-concurrency',
+                        type=int,
+                        default=8,
+                        help='Number of batches to process at the same time. (Default: 8)')
+    parser.add_argument('--repeat',
+                        type=int,
+                        default=1,
+                        help='Number of times to ingest each granule; the fastest run is reported. (Default: 1)')
+    parser.add_argument('--output',
+                        metavar='FILE',
+                        help='Write the results as JSON to this file, for use as a later baseline.')
+    parser.add_argument('--baseline',
+                        metavar='FILE',
+                        help='Compare the results to those saved in this file.')
+    parser.add_argument('--tolerance',
+                        type=float,
+                        default=0.1,
+                        help='Slowdown, as a fraction of the baseline throughput, reported as a regression. '
+                             '(Default: 0.1)')
+    parser.add_argument('--work-dir',
+                        help='Directory to write the synthetic granules in. (Default: the system temp directory)')
+    parser.add_argument('-v',
+                        '--verbose',
+                        action='store_true',
+                        help='Log the pipeline at INFO level.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    # Importing the processors already configured logging at DEBUG level, so it has to be forced.
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s [%(levelname)s] [%(name)s::%(lineno)d] %(message)s",
+                        force=True)
+
+    results = asyncio.run(run_benchmarks(args.granules,
+                                         args.scale,
+                                         args.execution_backend,
+                                         args.max_concurrency,
+                                         args.repeat,
+                                         args.work_dir))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(format_report(results, baseline))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Synthetic granules for benchmarking the ingestion pipeline.
+
+Each generator writes a granule of the given scale to a NetCDF file and returns the pipeline configuration that
+ingests it, in the same shape as the messages the Collection Manager sends. A scale of 1 produces a granule of a
+few tens of megabytes; tile sizes stay the same at every scale, so the number of tiles grows with it.
+"""
+
+import json
+from typing import Callable, Dict
+
+import numpy as np
+import xarray as xr
+
+_RNG_SEED = 0
+
+
+def _scaled(length: int, scale: float) -> int:
+    return max(1, int(round(length * scale)))
+
+
+def _values(rng: np.random.Generator, shape, low: float, high: float, nan_fraction: float = 0.1) -> np.ndarray:
+    values = rng.uniform(low, high, shape).astype(np.float32)
+    values[rng.random(shape) < nan_fraction] = np.nan
+    return values
+
+
+def _times(count: int, step: np.timedelta64 = np.timedelta64(1, 'D')) -> np.ndarray:
+    return (np.datetime64('2020-01-01', 'ns') + np.arange(count) * step).astype('datetime64[ns]')
+
+
+def _reading_processor(name: str, variable, **kwargs) -> dict:
+    # Reading processors parse their variable as a JSON list.
+    variable = variable if isinstance(variable, list) else [variable]
+    return {'name': name, 'variable': json.dumps(variable), **kwargs}
+
+
+def _config(path: str, dimension_step_sizes: Dict[str, int], reading_processor: dict, *processors: dict) -> dict:
+    return {
+        'granule': {'resource': path},
+        'slicer': {'name': 'sliceFileByStepSize', 'dimension_step_sizes': dimension_step_sizes},
+        'processors': [reading_processor,
+                       {'name': 'emptyTileFilter'},
+                       *processors,
+                       {'name': 'tileSummary', 'dataset_name': 'benchmark'},
+                       {'name': 'generateTileId'}],
+    }
+
+
+def grid_granule(path: str, scale: float = 1.0) -> dict:
+    """A daily global grid of sea surface temperature in Kelvin: time x lat x lon."""
+    rng = np.random.default_rng(_RNG_SEED)
+    n_time, n_lat, n_lon = _scaled(4, scale), 720, 1440
+    xr.Dataset({'analysed_sst': (('time', 'lat', 'lon'), _values(rng, (n_time, n_lat, n_lon), 271.0, 305.0))},
+               coords={'time': _times(n_time),
+                       'lat': np.linspace(-89.875, 89.875, n_lat, dtype=np.float32),
+                       'lon': np.linspace(-179.875, 179.875, n_lon, dtype=np.float32)}).to_netcdf(path)
+    return _config(path,
+                   {'time': 1, 'lat': 30, 'lon': 30},
+                   _reading_processor('Grid', 'analysed_sst', latitude='lat', longitude='lon', time='time'),
+                   {'name': 'kelvinToCelsius'})
+
+
+def multi_variable_granule(path: str, scale: float = 1.0) -> dict:
+    """A grid with several variables read into every tile: time x lat x lon."""
+    rng = np.random.default_rng(_RNG_SEED)
+    n_time, n_lat, n_lon = _scaled(2, scale), 720, 1440
+    variables = ['analysed_sst', 'analysis_error', 'sea_ice_fraction']
+    shape = (n_time, n_lat, n_lon)
+    xr.Dataset({name: (('time', 'lat', 'lon'), _values(rng, shape, 0.0, 300.0)) for name in variables},
+               coords={'time': _times(n_time),
+                       'lat': np.linspace(-89.875, 89.875, n_lat, dtype=np.float32),
+                       'lon': np.linspace(-179.875, 179.875, n_lon, dtype=np.float32)}).to_netcdf(path)
+    return _config(path,
+                   {'time': 1, 'lat': 30, 'lon': 30},
+                   _reading_processor('GridMulti', variables, latitude='lat', longitude='lon', time='time'))
+
+
+def swath_granule(path: str, scale: float = 1.0) -> dict:
+    """A satellite swath with 2-D latitude and longitude and a time per scan row: row x col."""
+    rng = np.random.default_rng(_RNG_SEED)
+    n_row, n_col = _scaled(16000, scale), 82
+    rows = np.arange(n_row, dtype=np.float32)[:, np.newaxis]
+    cols = np.arange(n_col, dtype=np.float32)[np.newaxis, :]
+    xr.Dataset({'wind_speed': (('row', 'col'), _values(rng, (n_row, n_col), 0.0, 30.0)),
+                'lat': (('row', 'col'), (np.sin(rows / 2000.0) * 80.0 + cols * 0.01).astype(np.float32)),
+                'lon': (('row', 'col'), ((rows * 0.1 + cols * 0.25) % 360.0 - 180.0).astype(np.float32)),
+                'time': (('row',), _times(n_row, np.timedelta64(1, 's')))}).to_netcdf(path)
+    return _config(path,
+                   {'row': 30, 'col': 82},
+                   _reading_processor('Swath', 'wind_speed', latitude='lat', longitude='lon', time='time'))
+
+
+def time_series_granule(path: str, scale: float = 1.0) -> dict:
+    """River discharge at a set of stations, one full time series per tile: time x rivid."""
+    rng = np.random.default_rng(_RNG_SEED)
+    n_time, n_station = 2920, _scaled(4000, scale)
+    xr.Dataset({'Qout': (('time', 'rivid'), _values(rng, (n_time, n_station), 0.0, 1000.0, nan_fraction=0.0)),
+                'lat': (('rivid',), rng.uniform(25.0, 50.0, n_station).astype(np.float32)),
+                'lon': (('rivid',), rng.uniform(-125.0, -65.0, n_station).astype(np.float32))},
+               coords={'time': _times(n_time, np.timedelta64(3, 'h')),
+                       'rivid': np.arange(n_station)}).to_netcdf(path)
+    return _config(path,
+                   {'time': n_time, 'rivid': 4},
+                   _reading_processor('TimeSeries', 'Qout', latitude='lat', longitude='lon', time='time'))
+
+
+def ecco_granule(path: str, scale: float = 1.0) -> dict:
+    """An ECCO native-grid granule of 13 faces: time x tile x j x i, with 2-D coordinates per face."""
+    rng = np.random.default_rng(_RNG_SEED)
+    n_time, n_tile, n_j, n_i = _scaled(8, scale), 13, 90, 90
+    shape = (n_tile, n_j, n_i)
+    xr.Dataset({'OBP': (('time', 'tile', 'j', 'i'), _values(rng, (n_time, *shape), -1.0, 1.0)),
+                'XC': (('tile', 'j', 'i'), rng.uniform(-180.0, 180.0, shape).astype(np.float32)),
+                'YC': (('tile', 'j', 'i'), rng.uniform(-90.0, 90.0, shape).astype(np.float32))},
+               coords={'time': _times(n_time),
+                       'tile': np.arange(n_tile),
+                       'j': np.arange(n_j),
+                       'i': np.arange(n_i)}).to_netcdf(path)
+    return _config(path,
+                   {'time': 1, 'tile': 1, 'j': 30, 'i': 30},
+                   _reading_processor('ECCO', 'OBP', latitude='YC', longitude='XC', time='time', tile='tile'))
+
+
+granule_generators: Dict[str, Callable[[str, float], dict]] = {
+    'grid': grid_granule,
+    'multivariable': multi_variable_granule,
+    'swath': swath_granule,
+    'timeseries': time_series_granule,
+    'ecco': ecco_granule,
+}
@@ -0,0 +1,176 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Loads the tiles written by the local file sink (--local-sink-dir) into Cassandra and Solr or Elasticsearch.
+
+    python -m granule_ingester.bulk_loader --local-sink-dir /data/staged --cassandra-contact-points cassandra ...
+
+Every data segment is loaded before any metadata segment, so the metadata store never references tiles that are not
+in the data store yet. Loaded segments are renamed to *.loaded, so an interrupted load can simply be run again.
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import sys
+import time
+
+from nexusproto.DataTile_pb2 import NexusTile
+
+from granule_ingester.writers import DataStore, LocalFileDataStore, LocalFileMetadataStore, MetadataStore
+from granule_ingester.writers.TileSegmentWriter import TileSegmentWriter
+
+logger = logging.getLogger(__name__)
+
+
+async def load_segments(directory: str, store, batch_size: int = 1024, keep_segments: bool = False) -> int:
+    """
+    Saves the tiles of every complete segment in directory to store, batch_size tiles at a time, and returns the
+    number of tiles loaded.
+    """
+    tile_count = 0
+    for segment in TileSegmentWriter.segments(directory):
+        start = time.perf_counter()
+        segment_tile_count = 0
+        records = TileSegmentWriter.read(segment)
+        while True:
+            batch = [NexusTile.FromString(record) for record in itertools.islice(records, batch_size)]
+            if not batch:
+                break
+            await store.save_batch(batch)
+            segment_tile_count += len(batch)
+
+        if not keep_segments:
+            TileSegmentWriter.mark_loaded(segment)
+        tile_count += segment_tile_count
+        logger.info(f'Loaded {segment_tile_count} tiles from {segment} in {time.perf_counter() - start:.2f} seconds')
+    return tile_count
+
+
+async def bulk_load(local_sink_dir: str,
+                    data_store: DataStore,
+                    metadata_store: MetadataStore,
+                    batch_size: int = 1024,
+                    keep_segments: bool = False):
+    data_tiles = await load_segments(f'{local_sink_dir}/{LocalFileDataStore.SUBDIRECTORY}',
+                                     data_store,
+                                     batch_size,
+                                     keep_segments)
+    metadata_tiles = await load_segments(f'{local_sink_dir}/{LocalFileMetadataStore.SUBDIRECTORY}',
+                                         metadata_store,
+                                         batch_size,
+                                         keep_segments)
+    logger.info(f'Loaded {data_tiles} tiles into the data store and {metadata_tiles} into the metadata store')
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Load tiles written by the local file sink into the data and '
+                                                 'metadata stores.')
+    parser.add_argument('--local-sink-dir',
+                        required=True,
+                        metavar='DIR',
+                        help='Directory the ingester wrote tiles to with --local-sink-dir.')
+    parser.add_argument('--batch-size',
+                        default=1024,
+                        type=int,
+                        help='Number of tiles to save to the stores at once. (Default: 1024)')
+    parser.add_argument('--keep-segments',
+                        action='store_true',
+                        help='Leave the segments in place once loaded instead of renaming them to *.loaded.')
+
+    # CASSANDRA
+    parser.add_argument('--cassandra-contact-points',
+                        default=['localhost'],
+                        metavar="HOST",
+                        nargs='+',
+                        help='List of one or more Cassandra contact points, separated by spaces. '
+                             '(Default: "localhost")')
+    parser.add_argument('--cassandra-port',
+                        default=9042,
+                        metavar="PORT",
+                        help='Cassandra port. (Default: 9042)')
+    parser.add_argument('--cassandra-keyspace',
+                        default='nexustiles',
+                        metavar='KEYSPACE',
+                        help='Cassandra Keyspace (Default: "nexustiles")')
+    parser.add_argument('--cassandra-username',
+                        metavar="USERNAME",
+                        default=None,
+                        help='Cassandra username. Optional.')
+    parser.add_argument('--cassandra-password',
+                        metavar="PASSWORD",
+                        default=None,
+                        help='Cassandra password. Optional.')
+
+    # METADATA STORE
+    parser.add_argument('--metadata-store',
+                        default='solr',
+                        metavar='STORE',
+                        help='Which metadata store to use')
+    parser.add_argument('--solr-host-and-port',
+                        default='http://localhost:8983',
+                        metavar='HOST:PORT',
+                        help='Solr host and port. (Default: http://localhost:8983)')
+    parser.add_argument('--zk-host-and-port',
+                        metavar="HOST:PORT")
+    parser.add_argument('--elastic-url',
+                        default='http://localhost:9200',
+                        metavar='ELASTIC_URL',
+                        help='ElasticSearch URL:PORT (Default: http://localhost:9200)')
+    parser.add_argument('--elastic-username',
+                        metavar='ELASTIC_USER',
+                        help='ElasticSearch username')
+    parser.add_argument('--elastic-password',
+                        metavar='ELASTIC_PWD',
+                        help='ElasticSearch password')
+    parser.add_argument('--elastic-index',
+                        default='nexustiles',
+                        metavar='ELASTIC_INDEX',
+                        help='ElasticSearch index')
+    parser.add_argument('-v',
+                        '--verbose',
+                        action='store_true',
+                        help='Print verbose logs.')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, force=True)
+
+    # Imported here so that the store clients are only needed when actually loading.
+    from granule_ingester.main import cassandra_factory, elasticsearch_factory, solr_factory
+
+    data_store = cassandra_factory(args.cassandra_contact_points,
+                                   args.cassandra_port,
+                                   args.cassandra_keyspace,
+                                   args.cassandra_username,
+                                   args.cassandra_password)
+    if args.metadata_store == 'solr':
+        metadata_store = solr_factory(args.solr_host_and_port, args.zk_host_and_port)
+    else:
+        metadata_store = elasticsearch_factory(args.elastic_url,
+                                               args.elastic_username,
+                                               args.elastic_password,
+                                               args.elastic_index)
+    try:
+        await bulk_load(args.local_sink_dir, data_store, metadata_store, args.batch_size, args.keep_segments)
+    finally:
+        data_store.close()
+        metadata_store.close()
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
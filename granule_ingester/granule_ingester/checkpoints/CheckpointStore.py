@@ -0,0 +1,44 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from abc import ABC, abstractmethod
+from typing import List, Tuple
+
+# Half-open [start, end) ranges of tile indices, in the order the slicer generates the granule's tiles.
+TileRanges = List[Tuple[int, int]]
+
+
+class CheckpointStore(ABC):
+    """
+    Remembers which tiles of a granule have already been written to the stores, so that a granule whose processing
+    was interrupted can resume where it left off instead of starting from its first tile.
+
+    Checkpoints are keyed by a hash of the full pipeline configuration, granule included, so changing how a granule
+    is processed starts it over.
+    """
+
+    @abstractmethod
+    async def load(self, key: str) -> TileRanges:
+        """Returns the completed tile ranges saved for key, or an empty list if there are none."""
+        pass
+
+    @abstractmethod
+    async def save(self, key: str, ranges: TileRanges):
+        pass
+
+    @abstractmethod
+    async def clear(self, key: str):
+        """Forgets key, once its granule has been ingested completely."""
+        pass
@@ -0,0 +1,65 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import os
+import uuid
+
+from common.async_utils.AsyncUtils import run_in_executor
+
+from granule_ingester.checkpoints.CheckpointStore import CheckpointStore, TileRanges
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCheckpointStore(CheckpointStore):
+    """
+    Keeps each granule's checkpoint in a small JSON file in a directory, which should be on a volume that outlives
+    the ingester (a persistent volume shared by the ingester pods, for instance).
+    """
+
+    def __init__(self, directory: str):
+        self._directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, f'{key}.json')
+
+    @run_in_executor
+    def load(self, key: str) -> TileRanges:
+        try:
+            with open(self._path(key)) as f:
+                return [tuple(tile_range) for tile_range in json.load(f)['ranges']]
+        except FileNotFoundError:
+            return []
+        except (ValueError, KeyError):
+            logger.warning(f'Ignoring unreadable checkpoint {self._path(key)}')
+            return []
+
+    @run_in_executor
+    def save(self, key: str, ranges: TileRanges):
+        os.makedirs(self._directory, exist_ok=True)
+        # Write to a temporary file first, so a crash mid-write never leaves a corrupt checkpoint behind.
+        temp_path = f'{self._path(key)}.{uuid.uuid4().hex}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({'ranges': ranges}, f)
+        os.replace(temp_path, self._path(key))
+
+    @run_in_executor
+    def clear(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,74 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import bisect
+import collections
+from typing import Deque, Iterable, Iterator, TypeVar
+
+from granule_ingester.checkpoints.CheckpointStore import TileRanges
+
+T = TypeVar('T')
+
+
+class TileCheckpoint:
+    """
+    Tracks which tiles of a granule have been written, by their index in the order the slicer generates them.
+
+    pending() filters the slicer's tiles down to those that still need processing and remembers the index of each
+    tile it hands out, so that claim() can tell which indices the next batch cut from it covers. Batches may be
+    written out of order; complete() merges each batch's indices into the completed ranges.
+    """
+
+    def __init__(self, completed: TileRanges = None):
+        self._ranges = sorted(tuple(tile_range) for tile_range in completed or [])
+        self._dispatched: Deque[int] = collections.deque()
+
+    @property
+    def ranges(self) -> TileRanges:
+        return list(self._ranges)
+
+    @property
+    def completed_count(self) -> int:
+        return sum(end - start for start, end in self._ranges)
+
+    def contains(self, index: int) -> bool:
+        position = bisect.bisect_right(self._ranges, (index, float('inf')))
+        return position > 0 and self._ranges[position - 1][0] <= index < self._ranges[position - 1][1]
+
+    def pending(self, tiles: Iterable[T]) -> Iterator[T]:
+        for index, tile in enumerate(tiles):
+            if not self.contains(index):
+                self._dispatched.append(index)
+                yield tile
+
+    def claim(self, tile_count: int) -> TileRanges:
+        """Returns the ranges of indices covered by the next tile_count tiles handed out by pending()."""
+        ranges = []
+        for _ in range(tile_count):
+            index = self._dispatched.popleft()
+            if ranges and ranges[-1][1] == index:
+                ranges[-1] = (ranges[-1][0], index + 1)
+            else:
+                ranges.append((index, index + 1))
+        return ranges
+
+    def complete(self, ranges: TileRanges):
+        merged = []
+        for start, end in sorted(self._ranges + [tuple(tile_range) for tile_range in ranges]):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        self._ranges = merged
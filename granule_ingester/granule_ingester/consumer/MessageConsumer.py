@@ -13,13 +13,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import collections
 import logging
+from functools import partial
+from typing import Tuple
 
 import aio_pika
+import yaml
+from granule_ingester.checkpoints import CheckpointStore
 from granule_ingester.exceptions import PipelineBuildingError, PipelineRunningError, RabbitMQLostConnectionError, \
     RabbitMQFailedHealthCheckError, LostConnectionError
+from granule_ingester.granule_loaders import GranuleLoader, GranulePrefetcher, S3Downloader
 from granule_ingester.healthcheck import HealthCheck
-from granule_ingester.pipeline import Pipeline
+from granule_ingester.pipeline import MemoryGovernor, Pipeline, PendingTileWindow, ResourceBudget, WorkerPool, \
+    worker_pools
+from granule_ingester.pipeline.Pipeline import BATCH_SIZE, DEFAULT_EXECUTION_BACKEND, MAX_PENDING_BYTES, \
+    MAX_PENDING_TILES
 
 logger = logging.getLogger(__name__)
 
@@ -69,7 +79,15 @@ class MessageConsumer(HealthCheck):
                                 data_store_factory,
                                 metadata_store_factory,
                                 pipeline_max_concurrency: int,
-                                log_level=logging.INFO):
+                                log_level=logging.INFO,
+                                worker_pool: WorkerPool = None,
+                                pipeline_max_pending_tiles: int = MAX_PENDING_TILES,
+                                memory_budget: ResourceBudget = None,
+                                pending_window: PendingTileWindow = None,
+                                memory_governor: MemoryGovernor = None,
+                                checkpoint_store: CheckpointStore = None,
+                                skip_unchanged_tiles: bool = False,
+                                s3_downloader: S3Downloader = None):
         logger.info("Received a job from the queue. Starting pipeline.")
         try:
             config_str = message.body.decode("utf-8")
@@ -77,7 +95,15 @@ class MessageConsumer(HealthCheck):
             pipeline = Pipeline.from_string(config_str=config_str,
                                             data_store_factory=data_store_factory,
                                             metadata_store_factory=metadata_store_factory,
-                                            max_concurrency=pipeline_max_concurrency)
+                                            max_concurrency=pipeline_max_concurrency,
+                                            worker_pool=worker_pool,
+                                            max_pending_tiles=pipeline_max_pending_tiles,
+                                            memory_budget=memory_budget,
+                                            pending_window=pending_window,
+                                            memory_governor=memory_governor,
+                                            checkpoint_store=checkpoint_store,
+                                            skip_unchanged_tiles=skip_unchanged_tiles,
+                                            s3_downloader=s3_downloader)
             pipeline.set_log_level(log_level)
             await pipeline.run()
             await message.ack()
@@ -95,23 +121,145 @@ class MessageConsumer(HealthCheck):
             await message.reject(requeue=True)
             logger.exception(f"Processing message failed. Message will be re-queued. The exception was:\n{e}")
 
-    async def start_consuming(self, pipeline_max_concurrency=16):
+    @staticmethod
+    def _prefetchable_granule(message: aio_pika.IncomingMessage) -> str:
+        """Returns the URL of the message's granule if it is downloaded from S3, or None."""
+        try:
+            granule = yaml.safe_load(message.body.decode('utf-8'))['granule']
+            granule_loader = GranuleLoader(**granule)
+        except Exception:
+            # Left for the pipeline to reject.
+            return None
+        return granule['resource'] if granule_loader.downloads_granule() else None
+
+    async def start_consuming(self,
+                              pipeline_max_concurrency=16,
+                              pipeline_max_pending_tiles=MAX_PENDING_TILES,
+                              execution_backend=DEFAULT_EXECUTION_BACKEND,
+                              max_concurrent_granules=1,
+                              granule_memory_budget=None,
+                              pipeline_max_pending_bytes=MAX_PENDING_BYTES,
+                              tile_memory_ceiling=None,
+                              checkpoint_store: CheckpointStore = None,
+                              skip_unchanged_tiles=False,
+                              s3_downloader: S3Downloader = None,
+                              prefetch_granules=0):
+        """
+        Consumes messages until the connection is lost or a granule fails in a way that cannot be recovered from.
+
+        Up to max_concurrent_granules messages are processed at once. If granule_memory_budget (in bytes) is set, a
+        granule only starts processing once its estimated in-memory size fits in what the granules already being
+        processed have left of the budget. The granules also share one window of processed tiles waiting to be
+        written, of at most pipeline_max_pending_tiles tiles and pipeline_max_pending_bytes bytes, so running more
+        granules at once does not multiply the memory held on behalf of slow stores. If tile_memory_ceiling (in bytes)
+        is set, each granule's batch size and concurrency are picked so that its tiles being processed fit in it.
+        If checkpoint_store is given, a granule whose message is redelivered after an interruption skips the tiles
+        that were already written. With skip_unchanged_tiles, tiles whose content hash matches the one in the metadata
+        store are not written again. Granules on S3 are downloaded with s3_downloader, if given.
+
+        If prefetch_granules is set, up to that many more messages are taken from the queue than are being processed,
+        and the granules of waiting messages are downloaded from S3 while the granules before them are processed.
+        """
         channel = await self._connection.channel()
-        await channel.set_qos(prefetch_count=1)
+        await channel.set_qos(prefetch_count=max_concurrent_granules + prefetch_granules)
         queue = await channel.declare_queue(self._rabbitmq_queue, durable=True, arguments={'x-max-priority': 10})
         queue_iter = queue.iterator()
-        async for message in queue_iter:
+        memory_budget = ResourceBudget(granule_memory_budget)
+        pending_window = PendingTileWindow(pipeline_max_pending_tiles, pipeline_max_pending_bytes)
+        memory_governor = MemoryGovernor(tile_memory_ceiling, BATCH_SIZE)
+        prefetcher = GranulePrefetcher(s3_downloader) if prefetch_granules else None
+
+        # The worker pool is started once and shared by every granule this consumer processes, so that process
+        # start-up cost is not paid again for each message.
+        async with worker_pools[execution_backend](pipeline_max_concurrency, self._level) as worker_pool:
+            in_flight = asyncio.Semaphore(max_concurrent_granules)
+            tasks = set()
+            failures = []
+
+            def granule_done(task: asyncio.Future, prefetch: Tuple[str, asyncio.Future] = None):
+                tasks.discard(task)
+                in_flight.release()
+                if prefetch is not None:
+                    # The granule was not loaded if the message was rejected before the pipeline ran.
+                    prefetcher.discard(*prefetch)
+                if not task.cancelled() and task.exception() is not None:
+                    # Stop taking new messages; the failure is raised once the consumer loop has stopped.
+                    failures.append(task.exception())
+                    consumer.cancel()
+
+            async def consume():
+                # Messages taken from the queue but not processed yet, with their prefetches. They are taken as soon as
+                # they are delivered, so that their granules are prefetched while every granule slot is busy; the
+                # channel's QoS keeps at most prefetch_granules of them waiting.
+                waiting = collections.deque()
+                received = asyncio.Event()
+
+                async def receive():
+                    try:
+                        async for message in queue_iter:
+                            granule_url = self._prefetchable_granule(message) if prefetcher else None
+                            prefetch = (granule_url, prefetcher.prefetch(granule_url)) if granule_url else None
+                            waiting.append((message, prefetch))
+                            received.set()
+                    finally:
+                        waiting.append(None)
+                        received.set()
+
+                receiver = asyncio.ensure_future(receive())
+                try:
+                    while True:
+                        while not waiting:
+                            received.clear()
+                            await received.wait()
+                        item = waiting.popleft()
+                        if item is None:
+                            break
+                        message, prefetch = item
+
+                        await in_flight.acquire()
+                        task = asyncio.ensure_future(self._received_message(message,
+                                                                            self._data_store_factory,
+                                                                            self._metadata_store_factory,
+                                                                            pipeline_max_concurrency,
+                                                                            self._level,
+                                                                            worker_pool,
+                                                                            pipeline_max_pending_tiles,
+                                                                            memory_budget,
+                                                                            pending_window,
+                                                                            memory_governor,
+                                                                            checkpoint_store,
+                                                                            skip_unchanged_tiles,
+                                                                            prefetcher or s3_downloader))
+                        tasks.add(task)
+                        task.add_done_callback(partial(granule_done, prefetch=prefetch))
+                    # Raises whatever stopped the queue iterator.
+                    await receiver
+                finally:
+                    receiver.cancel()
+
+            consumer = asyncio.ensure_future(consume())
             try:
-                await self._received_message(message,
-                                             self._data_store_factory,
-                                             self._metadata_store_factory,
-                                             pipeline_max_concurrency,
-                                             self._level)
-            except aio_pika.exceptions.MessageProcessError:
+                await consumer
+                # The queue iterator ran out; let the granules in flight finish.
+                await asyncio.gather(*tasks, return_exceptions=True)
+            except asyncio.CancelledError:
+                if not failures:
+                    raise
+            finally:
+                # Granules still in flight are abandoned; their messages are re-queued once the channel closes.
+                for task in list(tasks):
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                if prefetcher is not None:
+                    prefetcher.close()
+
+            if not failures:
+                return
+            e = failures[0]
+            if isinstance(e, aio_pika.exceptions.MessageProcessError):
                 # Do not try to close() the queue iterator! If we get here, that means the RabbitMQ
                 # connection has died, and attempting to close the queue will only raise another exception.
                 raise RabbitMQLostConnectionError("Lost connection to RabbitMQ while processing a granule.")
-            except Exception as e:
-                await queue_iter.close()
-                await channel.close()
-                raise e
+            await queue_iter.close()
+            await channel.close()
+            raise e
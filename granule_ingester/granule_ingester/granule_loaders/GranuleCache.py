@@ -0,0 +1,191 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import hashlib
+import logging
+import os
+from collections import Counter, OrderedDict
+from typing import Dict, IO
+
+import aioboto3
+from granule_ingester.granule_loaders.S3Downloader import DEFAULT_MAX_CONCURRENCY, DEFAULT_PART_SIZE, S3Downloader
+from granule_ingester.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+PARTIAL_SUFFIX = '.partial'
+
+
+class GranuleCache(S3Downloader):
+    """
+    An S3Downloader that keeps the granules it downloads in a local directory, up to max_bytes in total, so that a
+    granule that is needed again (because it is re-ingested, its message was requeued or several collections read
+    it) is opened from disk instead of being downloaded again.
+
+    Granules are keyed by bucket, key and ETag, so a granule that changed on S3 is downloaded again. The least
+    recently used granules are evicted first, but never while a loader still has them open. Granules larger than the
+    whole cache are downloaded to temporary files as usual. The cache outlives the process: granules already in the
+    directory are picked up, in the order they were last used, when the cache is created.
+    """
+
+    def __init__(self,
+                 directory: str,
+                 max_bytes: int,
+                 part_size: int = DEFAULT_PART_SIZE,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 session: aioboto3.Session = None):
+        super().__init__(part_size, max_concurrency, session)
+        self._directory = directory
+        self._max_bytes = int(max_bytes)
+        # Cache key -> size in bytes, least recently used first.
+        self._entries: Dict[str, int] = OrderedDict()
+        self._pins: Dict[str, int] = {}
+        self._downloads: Dict[str, asyncio.Future] = {}
+        # Cache key -> number of callers waiting for its download.
+        self._waiters: Dict[str, int] = {}
+        # Number of hits, misses and evictions since the cache was created.
+        self.counts = Counter()
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_entries()
+
+    @property
+    def size(self) -> int:
+        return sum(self._entries.values())
+
+    async def download(self, url: str) -> IO:
+        """
+        Returns a handle on the cached copy of the granule at url, downloading it first if needed. The granule stays
+        in the cache at least until the handle is closed.
+        """
+        bucket, key = self.parse_url(url)
+        head = await self.head(bucket, key)
+        size = head['ContentLength']
+        if size > self._max_bytes:
+            logger.info(f"s3://{bucket}/{key} is larger than the granule cache; downloading it to a temporary file")
+            return await super().download(url)
+
+        cache_key = self.cache_key(bucket, key, head.get('ETag', ''))
+        if cache_key in self._entries:
+            self._record('hit')
+            self._entries.move_to_end(cache_key)
+            os.utime(self._path(cache_key))
+            logger.info(f"Opening s3://{bucket}/{key} from the granule cache")
+        else:
+            self._record('miss')
+            # Granules requested again while they are being downloaded wait for that download. The download pins the
+            # granule once for each caller waiting for it, and each caller hands its pin over to its handle, so that
+            # the granule cannot be evicted between the end of the download and the caller resuming.
+            download = self._downloads.get(cache_key)
+            if download is None:
+                download = asyncio.ensure_future(self._download_entry(bucket, key, size, cache_key))
+                self._downloads[cache_key] = download
+            self._waiters[cache_key] = self._waiters.get(cache_key, 0) + 1
+            try:
+                await asyncio.shield(download)
+            except BaseException:
+                if not download.done():
+                    self._waiters[cache_key] -= 1
+                elif not download.cancelled() and download.exception() is None:
+                    self._unpin(cache_key)
+                raise
+            return _CachedGranule(self, cache_key, pinned=True)
+
+        return _CachedGranule(self, cache_key)
+
+    @staticmethod
+    def cache_key(bucket: str, key: str, etag: str) -> str:
+        return hashlib.sha256(f'{bucket}/{key}/{etag}'.encode('utf-8')).hexdigest()
+
+    async def _download_entry(self, bucket: str, key: str, size: int, cache_key: str):
+        partial_path = self._path(cache_key) + PARTIAL_SUFFIX
+        try:
+            self._evict(self._max_bytes - size)
+            with open(partial_path, 'wb') as file:
+                await self.download_to(bucket, key, file, size)
+            os.replace(partial_path, self._path(cache_key))
+            self._entries[cache_key] = size
+            for _ in range(self._waiters.get(cache_key, 0)):
+                self._pin(cache_key)
+            # Other granules may have been added while this one was downloading.
+            self._evict(self._max_bytes, keep=cache_key)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        finally:
+            del self._downloads[cache_key]
+            self._waiters.pop(cache_key, None)
+
+    def _evict(self, max_bytes: int, keep: str = None):
+        for cache_key in list(self._entries):
+            if self.size <= max_bytes:
+                return
+            if self._pins.get(cache_key) or cache_key == keep:
+                continue
+            logger.info(f"Evicting {self._path(cache_key)} ({self._entries[cache_key]} bytes) from the granule cache")
+            del self._entries[cache_key]
+            os.remove(self._path(cache_key))
+            self._record('eviction')
+
+    def _pin(self, cache_key: str):
+        self._pins[cache_key] = self._pins.get(cache_key, 0) + 1
+
+    def _unpin(self, cache_key: str):
+        self._pins[cache_key] -= 1
+        if not self._pins[cache_key]:
+            del self._pins[cache_key]
+
+    def _record(self, result: str):
+        self.counts[result] += 1
+        registry.increment('granule_ingester_granule_cache_total', result=result)
+
+    def _load_entries(self):
+        entries = []
+        for name in os.listdir(self._directory):
+            path = os.path.join(self._directory, name)
+            if name.endswith(PARTIAL_SUFFIX):
+                # Left behind by a download that was interrupted.
+                os.remove(path)
+            elif os.path.isfile(path):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name, stat.st_size))
+
+        for _, cache_key, size in sorted(entries):
+            self._entries[cache_key] = size
+        if entries:
+            logger.info(f"Found {len(entries)} granules ({self.size} bytes) in the granule cache at {self._directory}")
+        self._evict(self._max_bytes)
+
+    def _path(self, cache_key: str) -> str:
+        return os.path.join(self._directory, cache_key)
+
+
+class _CachedGranule:
+    """A handle on a granule in the cache, which keeps it from being evicted until it is closed."""
+
+    def __init__(self, cache: GranuleCache, cache_key: str, pinned: bool = False):
+        self._cache = cache
+        self._cache_key = cache_key
+        self.name = cache._path(cache_key)
+        self._closed = False
+        if not pinned:
+            cache._pin(cache_key)
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._cache._unpin(self._cache_key)
@@ -13,45 +13,122 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import copy
+import importlib.util
 import logging
 import os
-import tempfile
+from functools import partial
+from typing import List
 from urllib import parse
 
-import aioboto3
 import xarray as xr
 from granule_ingester.exceptions import GranuleLoadingError, PipelineBuildingError
 from granule_ingester.granule_loaders.Preprocessors import modules as module_mappings
+from granule_ingester.granule_loaders.S3Downloader import S3Downloader
+from granule_ingester.granule_loaders.S3RangedFile import S3RangedFile
 from granule_ingester.preprocessors import GranulePreprocessor
 
 logger = logging.getLogger(__name__)
 
+DOWNLOAD = 'download'
+RANGED = 'ranged'
+ACCESS_MODES = (DOWNLOAD, RANGED)
+
+NETCDF = 'netcdf'
+ZARR = 'zarr'
+ZARR_METADATA_FILES = ('.zgroup', '.zattrs', 'zarr.json')
+FORMATS = (NETCDF, ZARR)
+
+HDF5_SIGNATURE = b'\x89HDF\r\n\x1a\n'
+
 
 class GranuleLoader:
 
     def __init__(self, resource: str, *args, **kwargs):
         self._granule_temp_file = None
+        self._ranged_dataset = None
+        self._file_path = None
         self._resource = resource
         self._preprocess = None
+        self._s3_downloader: S3Downloader = None
+        self._engine = None
 
         if 'group' in kwargs:
             self._group = kwargs['group']
         else:
             self._group = None
 
+        self._access = kwargs.get('access') or DOWNLOAD
+        if self._access not in ACCESS_MODES:
+            raise PipelineBuildingError(f"'{self._access}' is not a valid granule access mode; expected one of "
+                                        f"{', '.join(ACCESS_MODES)}.")
+
+        # Granules are told apart by their path if no format is given: Zarr stores are directories or end in .zarr.
+        self._format = kwargs.get('format')
+        if self._format is not None and self._format not in FORMATS:
+            raise PipelineBuildingError(f"'{self._format}' is not a valid granule format; expected one of "
+                                        f"{', '.join(FORMATS)}.")
+
+        # Dask chunk sizes to open the granule lazily with, by dimension, or 'auto'.
+        self._chunks = kwargs.get('chunks')
+        if self._chunks is not None and importlib.util.find_spec('dask') is None:
+            raise PipelineBuildingError("Opening granules in chunks requires the dask package to be installed.")
+
         if 'preprocess' in kwargs:
             self._preprocess = [GranuleLoader._parse_module(module) for module in kwargs['preprocess']]
 
+    def with_resource(self, resource: str, s3_downloader: S3Downloader = None) -> 'GranuleLoader':
+        """
+        Returns a loader for another granule, with the same group, access mode, format, chunks and (already parsed)
+        preprocessors. Granules on S3 are downloaded with s3_downloader (which may be a GranuleCache), or with a default
+        S3Downloader if none is given. Granules opened with ranged access, and Zarr stores, are read in place and not
+        downloaded, except for HDF5 granules when h5netcdf is not installed.
+        """
+        loader = copy.copy(self)
+        loader._granule_temp_file = None
+        loader._ranged_dataset = None
+        loader._file_path = None
+        loader._engine = None
+        loader._resource = resource
+        loader._s3_downloader = s3_downloader
+        return loader
+
+    def downloads_granule(self) -> bool:
+        """
+        Returns whether open() downloads the granule from S3 before opening it. Zarr stores and granules opened with
+        ranged access are read in place instead (though HDF5 granules may still be downloaded, see with_resource).
+        """
+        return parse.urlparse(self._resource).scheme == 's3' and self._access == DOWNLOAD and not self._is_zarr()
+
     async def __aenter__(self):
         return await self.open()
 
     async def __aexit__(self, type, value, traceback):
+        if self._ranged_dataset is not None:
+            self._ranged_dataset.close()
         if self._granule_temp_file:
             self._granule_temp_file.close()
 
     async def open(self) -> (xr.Dataset, str):
         resource_url = parse.urlparse(self._resource)
-        if resource_url.scheme == 's3':
+        engine = ZARR if self._is_zarr() else None
+        loop = asyncio.get_event_loop()
+        ranged = False
+        if engine is None and resource_url.scheme == 's3' and self._access == RANGED:
+            # Reading a granule in place makes blocking S3 requests, which are kept off the event loop.
+            ranged = await loop.run_in_executor(None, GranuleLoader._can_read_in_place, self._resource)
+
+        if engine == ZARR:
+            # Zarr stores are read in place, a chunk at a time, whether they are local or on S3.
+            if resource_url.scheme not in ('', 's3'):
+                raise RuntimeError("Granule path scheme '{}' is not supported.".format(resource_url.scheme))
+            GranuleLoader._check_zarr_dependencies(self._resource)
+            file_path = self._resource
+        elif ranged:
+            # The granule is read in place, a block at a time, by whoever opens it (see _open_dataset).
+            file_path = self._resource
+        elif resource_url.scheme == 's3':
             # We need to save a reference to the temporary granule file so we can delete it when the context manager
             # closes. The file needs to be kept around until nothing is reading the dataset anymore.
             self._granule_temp_file = await self._download_s3_file(self._resource)
@@ -61,43 +138,139 @@ class GranuleLoader:
         else:
             raise RuntimeError("Granule path scheme '{}' is not supported.".format(resource_url.scheme))
 
-        granule_name = os.path.basename(self._resource)
+        granule_name = os.path.basename(self._resource.rstrip('/'))
         try:
-            additional_params = {}
-
-            if self._group is not None:
-                additional_params['group'] = self._group
-
-            ds = xr.open_dataset(file_path, lock=False, **additional_params)
-
-            if self._preprocess is not None:
-                logger.info(f'There are {len(self._preprocess)} preprocessors to apply for granule {self._resource}')
-                while len(self._preprocess) > 0:
-                    preprocessor: GranulePreprocessor = self._preprocess.pop(0)
-
-                    ds = preprocessor.process(ds)
+            open_dataset = partial(self._open_dataset, file_path, self._group, self._preprocess, self._chunks, engine)
+            if ranged:
+                ds = self._ranged_dataset = await loop.run_in_executor(None, open_dataset)
+            else:
+                ds = open_dataset()
+            self._file_path = file_path
+            self._engine = engine
 
             return ds, granule_name
+        except GranuleLoadingError:
+            raise
         except FileNotFoundError:
             raise GranuleLoadingError(f"The granule file {self._resource} does not exist.")
         except Exception:
-            raise GranuleLoadingError(f"The granule {self._resource} is not a valid NetCDF file.")
+            raise GranuleLoadingError(f"The granule {self._resource} is not a valid "
+                                      f"{'Zarr store' if engine == ZARR else 'NetCDF file'}.")
+
+    def dataset_opener(self):
+        """
+        Returns a picklable callable that opens the granule again from the local file (or from S3, with ranged access or
+        for a Zarr store), with the same group, chunks and preprocessors applied. This lets worker processes open the
+        granule themselves instead of being sent a copy of the dataset. Only valid between open() and the end of the
+        context manager, while the local file still exists.
+
+        The granule is opened without locking, like open() does, unless the callable is called with lock=None, which
+        gives a dataset that can safely be read from several threads at once.
+        """
+        return partial(GranuleLoader._open_dataset,
+                       self._file_path,
+                       self._group,
+                       self._preprocess,
+                       self._chunks,
+                       self._engine)
 
     @staticmethod
-    async def _download_s3_file(url: str):
-        parsed_url = parse.urlparse(url)
-        logger.info(
-            "Downloading S3 file from bucket '{}' with key '{}'".format(parsed_url.hostname, parsed_url.path[1:]))
-        async with aioboto3.resource("s3") as s3:
-            obj = await s3.Object(bucket_name=parsed_url.hostname, key=parsed_url.path[1:])
-            response = await obj.get()
-            data = await response['Body'].read()
-            logger.info("Finished downloading S3 file.")
-
-        fp = tempfile.NamedTemporaryFile()
-        fp.write(data)
-        logger.info("Saved downloaded file to {}.".format(fp.name))
-        return fp
+    def _open_dataset(file_path: str,
+                      group: str = None,
+                      preprocess: List[GranulePreprocessor] = None,
+                      chunks=None,
+                      engine: str = None,
+                      lock=False) -> xr.Dataset:
+        additional_params = {}
+        closers = None
+
+        if group is not None:
+            additional_params['group'] = group
+
+        if chunks is not None:
+            # The reading processors compute each tile's chunks in the thread that processes it (see
+            # TileReadingProcessor._computed).
+            additional_params['chunks'] = chunks
+
+        if engine == ZARR:
+            # Consolidated metadata is read in one request when the store has it. Zarr reads are thread-safe, so the
+            # store takes no lock.
+            ds = xr.open_dataset(file_path, engine=ZARR, consolidated=None, **additional_params)
+        elif parse.urlparse(file_path).scheme == 's3':
+            ranged_file = GranuleLoader._open_ranged_file(file_path)
+            try:
+                ds = xr.open_dataset(ranged_file, lock=lock, **additional_params)
+            except Exception:
+                ranged_file.close()
+                raise
+            # xarray does not close the file objects it is given, so the ranged file (its client and cached blocks) is
+            # closed along with the dataset.
+            closers = [ds._close, ranged_file.close]
+        else:
+            ds = xr.open_dataset(file_path, lock=lock, **additional_params)
+
+        if preprocess is not None:
+            logger.info(f'There are {len(preprocess)} preprocessors to apply for granule {file_path}')
+            for preprocessor in preprocess:
+                ds = preprocessor.process(ds)
+
+        if closers is not None:
+            # Preprocessors may return a new dataset that does not close the granule, so the last one closes it.
+            ds.set_close(partial(GranuleLoader._close_all, closers))
+
+        return ds
+
+    @staticmethod
+    def _close_all(closers: list):
+        for close in closers:
+            if close is not None:
+                close()
+
+    def _is_zarr(self) -> bool:
+        if self._format is not None:
+            return self._format == ZARR
+        if self._resource.rstrip('/').endswith('.zarr'):
+            return True
+        # Local stores named otherwise are recognized by the metadata files at their root (Zarr v2 or v3).
+        return any(os.path.isfile(os.path.join(self._resource, name)) for name in ZARR_METADATA_FILES)
+
+    @staticmethod
+    def _check_zarr_dependencies(url: str):
+        required = ['zarr', 's3fs'] if parse.urlparse(url).scheme == 's3' else ['zarr']
+        missing = [package for package in required if importlib.util.find_spec(package) is None]
+        if missing:
+            raise GranuleLoadingError(f"Reading the Zarr store {url} requires the {' and '.join(missing)} "
+                                      f"package{'s' if len(missing) > 1 else ''} to be installed.")
+
+    @staticmethod
+    def _can_read_in_place(url: str) -> bool:
+        # netCDF-4 granules are HDF5 files, which can only be read from a file object through h5netcdf. Without it,
+        # they are downloaded instead.
+        if importlib.util.find_spec('h5netcdf') is not None and importlib.util.find_spec('h5py') is not None:
+            return True
+        with S3RangedFile.from_url(url) as ranged_file:
+            if ranged_file.read(len(HDF5_SIGNATURE)) != HDF5_SIGNATURE:
+                return True
+        logger.warning(f'Downloading the HDF5 granule {url} because reading it with ranged access requires the '
+                       f'h5netcdf and h5py packages to be installed.')
+        return False
+
+    @staticmethod
+    def _open_ranged_file(url: str) -> S3RangedFile:
+        ranged_file = S3RangedFile.from_url(url)
+        # netCDF-4 granules are HDF5 files, which can only be read from a file object through h5netcdf.
+        if ranged_file.read(len(HDF5_SIGNATURE)) == HDF5_SIGNATURE:
+            try:
+                import h5netcdf  # noqa: F401
+                import h5py  # noqa: F401
+            except ImportError:
+                raise GranuleLoadingError(f'Reading the HDF5 granule {url} with ranged access requires the h5netcdf '
+                                          f'and h5py packages to be installed.')
+        ranged_file.seek(0)
+        return ranged_file
+
+    async def _download_s3_file(self, url: str):
+        return await (self._s3_downloader or S3Downloader()).download(url)
 
     @staticmethod
     def _parse_module(module_config: dict):
@@ -112,4 +285,3 @@ class GranuleLoader:
             raise PipelineBuildingError(f"Parsing module '{module_name}' failed because of the following error: {e}")
 
         return processor_module
-
@@ -0,0 +1,88 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from typing import Dict, IO, List
+
+from granule_ingester.granule_loaders.S3Downloader import S3Downloader
+from granule_ingester.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class GranulePrefetcher:
+    """
+    Downloads granules from S3 ahead of time, so that the next granule is already on disk (or well on its way) when
+    the one before it is done processing.
+
+    A prefetcher wraps the S3Downloader (or GranuleCache) granules are downloaded with, and can be given to a
+    GranuleLoader in its place. prefetch() starts downloading a granule in the background; download() then returns
+    that download instead of starting another one. Every prefetch is its own download, which one loader takes over
+    and closes, so a granule prefetched for two messages is downloaded twice (or shared through the GranuleCache).
+    Prefetches that are not going to be loaded after all should be discarded, so that their temporary files are
+    deleted.
+    """
+
+    def __init__(self, downloader: S3Downloader = None):
+        self._downloader = downloader or S3Downloader()
+        # Prefetches not taken by a loader yet, oldest first, by URL.
+        self._prefetched: Dict[str, List[asyncio.Future]] = defaultdict(list)
+        # Number of prefetched granules that were used and discarded since the prefetcher was created.
+        self.counts = Counter()
+
+    def prefetch(self, url: str) -> asyncio.Future:
+        """Starts downloading the granule at url, and returns the prefetch to discard it with."""
+        logger.info(f"Prefetching {url}")
+        prefetched = asyncio.ensure_future(self._downloader.download(url))
+        self._prefetched[url].append(prefetched)
+        return prefetched
+
+    async def download(self, url: str) -> IO:
+        prefetches = self._prefetched.get(url)
+        if not prefetches:
+            return await self._downloader.download(url)
+        prefetched = prefetches.pop(0)
+        if not prefetches:
+            del self._prefetched[url]
+        self._record('used')
+        return await prefetched
+
+    def discard(self, url: str, prefetched: asyncio.Future):
+        """Cancels the prefetch of the granule at url, unless a loader took it, and deletes what was downloaded."""
+        prefetches = self._prefetched.get(url, [])
+        if prefetched not in prefetches:
+            return
+        prefetches.remove(prefetched)
+        if not prefetches:
+            del self._prefetched[url]
+        self._record('discarded')
+        prefetched.cancel()
+        prefetched.add_done_callback(_close_download)
+
+    def close(self):
+        for url, prefetches in list(self._prefetched.items()):
+            for prefetched in list(prefetches):
+                self.discard(url, prefetched)
+
+    def _record(self, result: str):
+        self.counts[result] += 1
+        registry.increment('granule_ingester_prefetched_granules_total', result=result)
+
+
+def _close_download(download: asyncio.Future):
+    if not download.cancelled() and download.exception() is None:
+        download.result().close()
@@ -0,0 +1,169 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import errno
+import logging
+import os
+import tempfile
+import time
+from typing import IO, List, Tuple
+from urllib import parse
+
+import aioboto3
+from granule_ingester.exceptions import GranuleLoadingError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PART_SIZE = 8 * 2 ** 20
+DEFAULT_MAX_CONCURRENCY = 8
+# Size of the reads from each part's response stream, and so of every write to the local file.
+CHUNK_SIZE = 2 ** 20
+
+
+class S3Downloader:
+    """
+    Downloads S3 objects with parallel ranged GETs of part_size bytes each, at most max_concurrency at a time.
+
+    The local file is preallocated to the size of the object, and each part is streamed straight into its place in the
+    file as it arrives, so the object is never held in memory and is written to disk exactly once.
+    """
+
+    def __init__(self,
+                 part_size: int = DEFAULT_PART_SIZE,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 session: aioboto3.Session = None):
+        self._part_size = max(1, int(part_size))
+        self._max_concurrency = max(1, int(max_concurrency))
+        self._session = session
+
+    @property
+    def part_size(self) -> int:
+        return self._part_size
+
+    @property
+    def max_concurrency(self) -> int:
+        return self._max_concurrency
+
+    @staticmethod
+    def parse_url(url: str) -> Tuple[str, str]:
+        """Returns the bucket and key of an s3:// URL."""
+        parsed_url = parse.urlparse(url)
+        return parsed_url.hostname, parsed_url.path[1:]
+
+    async def download(self, url: str) -> IO:
+        """Downloads the object at url into a temporary file, which is deleted once it is closed."""
+        bucket, key = self.parse_url(url)
+        temp_file = tempfile.NamedTemporaryFile()
+        try:
+            await self.download_to(bucket, key, temp_file)
+        except BaseException:
+            temp_file.close()
+            raise
+        logger.info(f"Saved downloaded file to {temp_file.name}.")
+        return temp_file
+
+    async def head(self, bucket: str, key: str) -> dict:
+        """Returns the object's metadata (ContentLength, ETag, ...) without downloading it."""
+        async with self._get_session().client('s3') as s3:
+            return await s3.head_object(Bucket=bucket, Key=key)
+
+    async def download_to(self, bucket: str, key: str, file: IO, size: int = None) -> int:
+        """
+        Downloads an object into file, which must be open for writing, and returns its size. The object is looked up
+        first unless its size is given.
+        """
+        logger.info(f"Downloading S3 file from bucket '{bucket}' with key '{key}'")
+        start = time.perf_counter()
+        async with self._get_session().client('s3') as s3:
+            if size is None:
+                size = (await s3.head_object(Bucket=bucket, Key=key))['ContentLength']
+
+            fd = file.fileno()
+            self._preallocate(fd, size)
+            semaphore = asyncio.Semaphore(self._max_concurrency)
+
+            async def download_part(part_start: int, part_end: int):
+                async with semaphore:
+                    await self._download_part(s3, bucket, key, fd, part_start, part_end)
+
+            await _gather_or_cancel([download_part(part_start, part_end)
+                                     for part_start, part_end in self._parts(size)])
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"Finished downloading S3 file: {size} bytes in {elapsed:.3f}s "
+                    f"({size / max(elapsed, 1e-9) / 2 ** 20:.2f} MB/s)")
+        return size
+
+    def _parts(self, size: int) -> List[Tuple[int, int]]:
+        return [(part_start, min(part_start + self._part_size, size))
+                for part_start in range(0, size, self._part_size)]
+
+    @staticmethod
+    async def _download_part(s3, bucket: str, key: str, fd: int, start: int, end: int):
+        response = await s3.get_object(Bucket=bucket, Key=key, Range=f'bytes={start}-{end - 1}')
+        loop = asyncio.get_running_loop()
+        offset = start
+        async with response['Body'] as body:
+            while True:
+                chunk = await body.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                await loop.run_in_executor(None, _write_at, fd, chunk, offset)
+                offset += len(chunk)
+
+        if offset != end:
+            raise GranuleLoadingError(f"Downloading s3://{bucket}/{key} failed: expected bytes {start}-{end - 1}, "
+                                      f"but the part ended at {offset}.")
+
+    @staticmethod
+    def _preallocate(fd: int, size: int):
+        # Reserving the blocks up front fails early if the disk is too small, and keeps the file from fragmenting
+        # as the parts are written out of order.
+        if size == 0:
+            return
+        if hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(fd, 0, size)
+                return
+            except OSError as e:
+                # Some filesystems cannot reserve blocks; sizing the file is enough there.
+                if e.errno not in (errno.EOPNOTSUPP, errno.EINVAL):
+                    raise
+        os.ftruncate(fd, size)
+
+    def _get_session(self) -> aioboto3.Session:
+        if self._session is None:
+            self._session = aioboto3.Session()
+        return self._session
+
+
+def _write_at(fd: int, data: bytes, offset: int):
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+async def _gather_or_cancel(coroutines):
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
@@ -0,0 +1,160 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import logging
+import threading
+from collections import OrderedDict
+from typing import List
+
+import boto3
+from granule_ingester.granule_loaders.S3Downloader import S3Downloader
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_SIZE = 512 * 2 ** 10
+DEFAULT_MAX_CACHED_BLOCKS = 128
+DEFAULT_READ_AHEAD_BLOCKS = 4
+
+
+class S3RangedFile(io.RawIOBase):
+    """
+    A read-only, seekable file-like view of an S3 object that fetches only the byte ranges that are read, so that a
+    granule can be opened without downloading it.
+
+    Reads are served from a cache of the max_cached_blocks most recently used blocks of block_size bytes. Each read
+    that misses the cache fetches each run of consecutive missing blocks in one ranged GET; a read that carries on
+    where the last one stopped also fetches the next read_ahead_blocks blocks, since the HDF5 library reads metadata
+    and contiguous data sequentially. The object is read with a synchronous client, because the netCDF libraries read
+    from it synchronously, possibly from several threads at once.
+    """
+
+    def __init__(self,
+                 bucket: str,
+                 key: str,
+                 block_size: int = DEFAULT_BLOCK_SIZE,
+                 max_cached_blocks: int = DEFAULT_MAX_CACHED_BLOCKS,
+                 read_ahead_blocks: int = DEFAULT_READ_AHEAD_BLOCKS,
+                 client=None):
+        super().__init__()
+        self._bucket = bucket
+        self._key = key
+        self._block_size = max(1, int(block_size))
+        self._max_cached_blocks = max(1, int(max_cached_blocks))
+        self._read_ahead_blocks = max(0, int(read_ahead_blocks))
+        self._client = client or boto3.client('s3')
+        self._size = self._client.head_object(Bucket=bucket, Key=key)['ContentLength']
+        self._block_count = -(-self._size // self._block_size)
+        self._position = 0
+        self._blocks = OrderedDict()
+        self._last_block = None
+        self._lock = threading.Lock()
+        # Number of ranged GETs made and bytes fetched so far.
+        self.request_count = 0
+        self.bytes_fetched = 0
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> 'S3RangedFile':
+        bucket, key = S3Downloader.parse_url(url)
+        return cls(bucket, key, **kwargs)
+
+    @property
+    def name(self) -> str:
+        return f's3://{self._bucket}/{self._key}'
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        with self._lock:
+            if whence == io.SEEK_SET:
+                position = offset
+            elif whence == io.SEEK_CUR:
+                position = self._position + offset
+            elif whence == io.SEEK_END:
+                position = self._size + offset
+            else:
+                raise ValueError(f'Invalid whence: {whence}')
+            if position < 0:
+                raise ValueError(f'Negative seek position {position}')
+            self._position = position
+            return position
+
+    def readinto(self, buffer) -> int:
+        with self._lock:
+            length = min(len(buffer), self._size - self._position)
+            if length <= 0:
+                return 0
+
+            first_block = self._position // self._block_size
+            last_block = (self._position + length - 1) // self._block_size
+            data = b''.join(self._get_blocks(first_block, last_block))
+            start = self._position - first_block * self._block_size
+            memoryview(buffer)[:length] = data[start:start + length]
+            self._position += length
+            return length
+
+    def close(self):
+        self._blocks.clear()
+        super().close()
+
+    def _get_blocks(self, first_block: int, last_block: int) -> List[bytes]:
+        sequential = self._last_block is not None and first_block in (self._last_block, self._last_block + 1)
+        self._last_block = last_block
+        index = first_block
+        while index <= last_block:
+            if index in self._blocks:
+                index += 1
+                continue
+            run_end = index
+            while run_end < last_block and run_end + 1 not in self._blocks:
+                run_end += 1
+            if sequential and run_end == last_block:
+                run_end = min(self._block_count - 1, last_block + self._read_ahead_blocks)
+            self._fetch(index, run_end)
+            index = run_end + 1
+
+        blocks = []
+        for index in range(first_block, last_block + 1):
+            self._blocks.move_to_end(index)
+            blocks.append(self._blocks[index])
+        while len(self._blocks) > self._max_cached_blocks:
+            self._blocks.popitem(last=False)
+        return blocks
+
+    def _fetch(self, first_block: int, last_block: int):
+        start = first_block * self._block_size
+        end = min(self._size, (last_block + 1) * self._block_size)
+        logger.debug(f'Fetching bytes {start}-{end - 1} of {self.name}')
+        response = self._client.get_object(Bucket=self._bucket, Key=self._key, Range=f'bytes={start}-{end - 1}')
+        data = response['Body'].read()
+        if len(data) != end - start:
+            raise IOError(f'Expected {end - start} bytes from {self.name} at offset {start}, got {len(data)}')
+        self.request_count += 1
+        self.bytes_fetched += len(data)
+
+        for index in range(first_block, last_block + 1):
+            offset = index * self._block_size - start
+            self._blocks[index] = data[offset:offset + self._block_size]
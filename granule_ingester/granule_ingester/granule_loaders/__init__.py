@@ -13,4 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from granule_ingester.granule_loaders.GranuleCache import GranuleCache
+from granule_ingester.granule_loaders.GranulePrefetcher import GranulePrefetcher
 from granule_ingester.granule_loaders.GranuleLoader import GranuleLoader
+from granule_ingester.granule_loaders.S3Downloader import S3Downloader
+from granule_ingester.granule_loaders.S3RangedFile import S3RangedFile
@@ -20,10 +20,13 @@ import sys
 from functools import partial
 from typing import List
 
+from granule_ingester.checkpoints import LocalCheckpointStore
 from granule_ingester.consumer import MessageConsumer
 from granule_ingester.exceptions import FailedHealthCheckError, LostConnectionError
+from granule_ingester.granule_loaders import GranuleCache, S3Downloader
 from granule_ingester.healthcheck import HealthCheck
-from granule_ingester.writers import CassandraStore, SolrStore
+from granule_ingester.metrics import MetricsServer
+from granule_ingester.writers import CassandraStore, LocalFileDataStore, LocalFileMetadataStore, SolrStore
 from granule_ingester.writers.ElasticsearchStore import ElasticsearchStore
 
 
@@ -45,6 +48,18 @@ def elasticsearch_factory(elastic_url, username, password, index):
     return store
 
 
+def local_data_store_factory(directory):
+    store = LocalFileDataStore(directory)
+    store.connect()
+    return store
+
+
+def local_metadata_store_factory(directory):
+    store = LocalFileMetadataStore(directory)
+    store.connect()
+    return store
+
+
 async def run_health_checks(dependencies: List[HealthCheck]):
     for dependency in dependencies:
         if not await dependency.health_check():
@@ -126,17 +141,119 @@ async def main(loop):
                         metavar='ELASTIC_INDEX', 
                         help='ElasticSearch index')
     
+    # LOCAL FILE SINK
+    parser.add_argument('--local-sink-dir',
+                        default=None,
+                        metavar='DIR',
+                        help='Write tiles and their metadata to segment files in this directory instead of the data '
+                             'and metadata stores, for offline bulk ingest or profiling. Load them into the stores '
+                             'later with `python -m granule_ingester.bulk_loader`.')
+
+    # CHECKPOINTS
+    parser.add_argument('--checkpoint-dir',
+                        default=None,
+                        metavar='DIR',
+                        help='Directory to record which tiles of each granule have been written in, so that a granule '
+                             'interrupted part way (by a pod restart, for instance) resumes where it left off when '
+                             'its message is redelivered. Should be on a volume that outlives the ingester. '
+                             '(Default: no checkpoints)')
+
+    # RE-INGESTION
+    parser.add_argument('--skip-unchanged-tiles',
+                        action='store_true',
+                        help='Store a content hash with every tile, and when a granule is ingested again only write '
+                             'the tiles whose data or summary changed since. Needs a metadata store that can look '
+                             'tiles up (Solr or Elasticsearch), so it cannot be used with --local-sink-dir.')
+
+    # S3
+    parser.add_argument('--s3-part-size-mib',
+                        default=8,
+                        type=int,
+                        metavar='MIB',
+                        help='Size of each ranged GET when downloading granules from S3, in MiB. (Default: 8)')
+    parser.add_argument('--s3-download-concurrency',
+                        default=8,
+                        type=int,
+                        metavar='PARTS',
+                        help='Number of parts of a granule downloaded from S3 at the same time. (Default: 8)')
+    parser.add_argument('--granule-cache-dir',
+                        default=None,
+                        metavar='DIR',
+                        help='Directory to keep granules downloaded from S3 in, so that granules that are ingested '
+                             'again are opened from disk instead of being downloaded again. (Default: no cache)')
+    parser.add_argument('--granule-cache-mib',
+                        default=10240,
+                        type=int,
+                        metavar='MIB',
+                        help='Size of the granule cache in MiB; the least recently used granules are evicted first. '
+                             '(Default: 10240)')
+
     # OTHERS
     parser.add_argument('--max-threads',
                         default=16,
                         metavar='MAX_THREADS',
                         help='Maximum number of threads to use when processing granules. (Default: 16)')
+    parser.add_argument('--max-pending-tiles',
+                        default=4096,
+                        type=int,
+                        metavar='MAX_PENDING_TILES',
+                        help='Maximum number of processed tiles to hold in memory while waiting to be written to the '
+                             'data and metadata stores. (Default: 4096)')
+    parser.add_argument('--max-pending-mib',
+                        default=512,
+                        type=int,
+                        metavar='MAX_PENDING_MIB',
+                        help='Maximum total size, in MiB, of the processed tiles to hold in memory while waiting to be '
+                             'written to the data and metadata stores. Tile processing pauses until the stores catch '
+                             'up. (Default: 512)')
+    parser.add_argument('--tile-memory-ceiling',
+                        default=None,
+                        type=int,
+                        metavar='MIB',
+                        help='Memory ceiling, in MiB, for the tiles of a granule being processed at once. The size of '
+                             'a tile is estimated from the granule\'s variables and the slicer\'s tile shape, and '
+                             'the batch size and concurrency are lowered to fit. (Default: no ceiling)')
+    parser.add_argument('--execution-backend',
+                        default='process',
+                        choices=['process', 'thread', 'inline'],
+                        metavar='BACKEND',
+                        help='Where to run the tile processors: "process" for a pool of worker processes, "thread" '
+                             'for a pool of threads, or "inline" to process one batch at a time on the main thread. '
+                             'Collections can override this with their executionBackend property. '
+                             '(Default: "process")')
+    parser.add_argument('--max-concurrent-granules',
+                        default=1,
+                        type=int,
+                        metavar='MAX_CONCURRENT_GRANULES',
+                        help='Maximum number of granules to process at the same time. (Default: 1)')
+    parser.add_argument('--prefetch-granules',
+                        default=0,
+                        type=int,
+                        metavar='GRANULES',
+                        help='Number of messages to take from the queue ahead of the granules being processed, whose '
+                             'granules are downloaded from S3 in the meantime. (Default: 0)')
+    parser.add_argument('--granule-memory-budget',
+                        default=None,
+                        type=int,
+                        metavar='MIB',
+                        help='Maximum combined estimated in-memory size, in MiB, of the granules being processed at '
+                             'the same time. A granule larger than the budget is processed on its own. Unlimited if '
+                             'not set.')
+    parser.add_argument('--metrics-port',
+                        default=None,
+                        type=int,
+                        metavar='PORT',
+                        help='Port on which to serve Prometheus metrics at /metrics. Metrics are not served if this is '
+                             'not set.')
     parser.add_argument('-v',
                         '--verbose',
                         action='store_true',
                         help='Print verbose logs.')
 
     args = parser.parse_args()
+    if args.skip_unchanged_tiles and args.local_sink_dir:
+        # Segment files cannot be looked up, so nothing would be skipped.
+        parser.error('--skip-unchanged-tiles cannot be used with --local-sink-dir')
 
     logging_level = logging.DEBUG if args.verbose else logging.INFO
     logging.basicConfig(level=logging_level)
@@ -165,78 +282,91 @@ async def main(loop):
     elastic_password = args.elastic_password
     elastic_index = args.elastic_index       
 
-    if metadata_store == 'solr':
-        consumer = MessageConsumer(rabbitmq_host=args.rabbitmq_host,
-                                   rabbitmq_username=args.rabbitmq_username,
-                                   rabbitmq_password=args.rabbitmq_password,
-                                   rabbitmq_queue=args.rabbitmq_queue,
-                                   data_store_factory=partial(cassandra_factory,
-                                                              cassandra_contact_points,
-                                                              cassandra_port,
-                                                              cassandra_keyspace,
-                                                              cassandra_username,
-                                                              cassandra_password),
-                                   metadata_store_factory=partial(solr_factory, solr_host_and_port, zk_host_and_port),
-                                   log_level=logging_level)
-        try:
-            solr_store = SolrStore(zk_url=zk_host_and_port) if zk_host_and_port else SolrStore(solr_url=solr_host_and_port)
-            await run_health_checks([CassandraStore(cassandra_contact_points,
-                                                    cassandra_port,
-                                                    cassandra_keyspace,
-                                                    cassandra_username,
-                                                    cassandra_password),
-                                     solr_store,
-                                     consumer])
-            async with consumer:
-                logger.info("All external dependencies have passed the health checks. Now listening to message queue.")
-                await consumer.start_consuming(args.max_threads)
-        except FailedHealthCheckError as e:
-            logger.error(f"Quitting because not all dependencies passed the health checks: {e}")
-        except LostConnectionError as e:
-            logger.error(f"{e} Any messages that were being processed have been re-queued. Quitting.")
-        except Exception as e:
-            logger.exception(f"Shutting down because of an unrecoverable error:\n{e}")
-        finally:
-            sys.exit(1)
+    granule_memory_budget = args.granule_memory_budget * 2 ** 20 if args.granule_memory_budget else None
+    tile_memory_ceiling = args.tile_memory_ceiling * 2 ** 20 if args.tile_memory_ceiling else None
+    checkpoint_store = LocalCheckpointStore(args.checkpoint_dir) if args.checkpoint_dir else None
+    if args.granule_cache_dir:
+        s3_downloader = GranuleCache(args.granule_cache_dir,
+                                     args.granule_cache_mib * 2 ** 20,
+                                     args.s3_part_size_mib * 2 ** 20,
+                                     args.s3_download_concurrency)
+    else:
+        s3_downloader = S3Downloader(args.s3_part_size_mib * 2 ** 20, args.s3_download_concurrency)
+
+    if args.metrics_port is not None:
+        # Serves for the lifetime of the process.
+        await MetricsServer(args.metrics_port).start()
 
+    if args.local_sink_dir:
+        # Tiles are written to local segment files, to be loaded into the stores later with bulk_loader.
+        data_store_factory = partial(local_data_store_factory, args.local_sink_dir)
+        metadata_store_factory = partial(local_metadata_store_factory, args.local_sink_dir)
+        stores = [LocalFileDataStore(args.local_sink_dir), LocalFileMetadataStore(args.local_sink_dir)]
+    elif metadata_store == 'solr':
+        data_store_factory = partial(cassandra_factory,
+                                     cassandra_contact_points,
+                                     cassandra_port,
+                                     cassandra_keyspace,
+                                     cassandra_username,
+                                     cassandra_password)
+        metadata_store_factory = partial(solr_factory, solr_host_and_port, zk_host_and_port)
+        solr_store = SolrStore(zk_url=zk_host_and_port) if zk_host_and_port else SolrStore(solr_url=solr_host_and_port)
+        stores = [CassandraStore(cassandra_contact_points,
+                                 cassandra_port,
+                                 cassandra_keyspace,
+                                 cassandra_username,
+                                 cassandra_password),
+                  solr_store]
     else:
-        consumer = MessageConsumer(rabbitmq_host=args.rabbitmq_host,
-                                   rabbitmq_username=args.rabbitmq_username,
-                                   rabbitmq_password=args.rabbitmq_password,
-                                   rabbitmq_queue=args.rabbitmq_queue,
-                                   data_store_factory=partial(cassandra_factory,
-                                                              cassandra_contact_points,
-                                                              cassandra_port,
-                                                              cassandra_keyspace,
-                                                              cassandra_username,
-                                                              cassandra_password),
-                                   metadata_store_factory=partial(elasticsearch_factory, 
-                                                                  elastic_url, 
-                                                                  elastic_username, 
-                                                                  elastic_password, 
-                                                                  elastic_index))
-        try:
-            es_store = ElasticsearchStore(elastic_url, elastic_username, elastic_password, elastic_index)
-            await run_health_checks([CassandraStore(cassandra_contact_points,
-                                                    cassandra_port,
-                                                    cassandra_keyspace,
-                                                    cassandra_username,
-                                                    cassandra_password),
-                                     es_store,
-                                     consumer])
-
-            async with consumer:
-                logger.info("All external dependencies have passed the health checks. Now listening to message queue.")
-                await consumer.start_consuming(args.max_threads)
-        except FailedHealthCheckError as e:
-            logger.error(f"Quitting because not all dependencies passed the health checks: {e}")
-        except LostConnectionError as e:
-            logger.error(f"{e} Any messages that were being processed have been re-queued. Quitting.")
-        except Exception as e:
-            logger.exception(f"Shutting down because of an unrecoverable error:\n{e}")
-        finally:
-            sys.exit(1)
+        data_store_factory = partial(cassandra_factory,
+                                     cassandra_contact_points,
+                                     cassandra_port,
+                                     cassandra_keyspace,
+                                     cassandra_username,
+                                     cassandra_password)
+        metadata_store_factory = partial(elasticsearch_factory,
+                                         elastic_url,
+                                         elastic_username,
+                                         elastic_password,
+                                         elastic_index)
+        es_store = ElasticsearchStore(elastic_url, elastic_username, elastic_password, elastic_index)
+        stores = [CassandraStore(cassandra_contact_points,
+                                 cassandra_port,
+                                 cassandra_keyspace,
+                                 cassandra_username,
+                                 cassandra_password),
+                  es_store]
 
+    consumer = MessageConsumer(rabbitmq_host=args.rabbitmq_host,
+                               rabbitmq_username=args.rabbitmq_username,
+                               rabbitmq_password=args.rabbitmq_password,
+                               rabbitmq_queue=args.rabbitmq_queue,
+                               data_store_factory=data_store_factory,
+                               metadata_store_factory=metadata_store_factory,
+                               log_level=logging_level)
+    try:
+        await run_health_checks([*stores, consumer])
+        async with consumer:
+            logger.info("All external dependencies have passed the health checks. Now listening to message queue.")
+            await consumer.start_consuming(args.max_threads,
+                                           args.max_pending_tiles,
+                                           args.execution_backend,
+                                           args.max_concurrent_granules,
+                                           granule_memory_budget,
+                                           args.max_pending_mib * 2 ** 20,
+                                           tile_memory_ceiling,
+                                           checkpoint_store,
+                                           args.skip_unchanged_tiles,
+                                           s3_downloader,
+                                           args.prefetch_granules)
+    except FailedHealthCheckError as e:
+        logger.error(f"Quitting because not all dependencies passed the health checks: {e}")
+    except LostConnectionError as e:
+        logger.error(f"{e} Any messages that were being processed have been re-queued. Quitting.")
+    except Exception as e:
+        logger.exception(f"Shutting down because of an unrecoverable error:\n{e}")
+    finally:
+        sys.exit(1)
 
 if __name__ == '__main__':
     loop = asyncio.get_event_loop()
@@ -0,0 +1,84 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Stage names used by the pipeline. Stages that run once per component (a tile processor, a store) are also labelled
+# with the component's class name.
+OPEN = 'open'
+SLICE = 'slice'
+PROCESSOR = 'processor'
+SERIALIZATION = 'serialization'
+IPC = 'ipc'
+WRITE = 'write'
+LOOKUP = 'lookup'
+
+StageKey = Tuple[str, str]
+
+
+class GranuleMetrics:
+    """
+    Time spent in each stage of the pipeline while ingesting one granule, along with how many tiles and bytes it
+    produced.
+
+    Stage timings are summed over every tile and batch, so the stages that run in parallel (the tile processors, in
+    particular) can add up to more than the granule's wall-clock time.
+    """
+
+    def __init__(self, granule_name: str = None):
+        self.granule_name = granule_name
+        self.stage_seconds: Dict[StageKey, float] = defaultdict(float)
+        self.tile_count = 0
+        self.tile_bytes = 0
+        self.batch_count = 0
+        # Tiles that were not written because they had not changed since the last time they were (see TileWriter).
+        self.unchanged_tile_count = 0
+        # The BatchPlan the granule was processed with, if any.
+        self.batch_plan: Any = None
+
+    @contextmanager
+    def time(self, stage: str, name: str = ''):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start, name)
+
+    def add(self, stage: str, seconds: float, name: str = ''):
+        self.stage_seconds[(stage, name)] += seconds
+
+    def merge(self, stage_seconds: Dict[StageKey, float]):
+        for (stage, name), seconds in stage_seconds.items():
+            self.add(stage, seconds, name)
+
+    def count_tiles(self, tile_count: int, tile_bytes: int):
+        self.tile_count += tile_count
+        self.tile_bytes += tile_bytes
+
+    def log_summary(self, elapsed: float):
+        stages = ', '.join(f"{stage}{'[' + name + ']' if name else ''}={seconds:.3f}s"
+                           for (stage, name), seconds in sorted(self.stage_seconds.items()))
+        tiles_per_second = self.tile_count / elapsed if elapsed > 0 else 0.0
+        megabytes_per_second = self.tile_bytes / elapsed / 2 ** 20 if elapsed > 0 else 0.0
+        unchanged = f", {self.unchanged_tile_count} unchanged tiles skipped" if self.unchanged_tile_count else ''
+        logger.info(f"Granule {self.granule_name}: {self.tile_count} tiles, {self.tile_bytes} bytes in {elapsed:.3f}s "
+                    f"({tiles_per_second:.1f} tiles/s, {megabytes_per_second:.2f} MB/s) in {self.batch_count} "
+                    f"batches{unchanged}. Stage times: {stages}")
@@ -0,0 +1,89 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from collections import defaultdict
+from typing import Dict, Tuple
+
+from granule_ingester.metrics.GranuleMetrics import GranuleMetrics
+
+# Help text of every metric the registry exports, in the order they are rendered.
+_METRICS = {
+    'granule_ingester_granules_total': 'Number of granules processed, by outcome.',
+    'granule_ingester_granule_seconds_total': 'Wall-clock time spent processing granules.',
+    'granule_ingester_stage_seconds_total': 'Time spent in each pipeline stage, summed over tiles and batches.',
+    'granule_ingester_tiles_total': 'Number of tiles written to the stores.',
+    'granule_ingester_tile_bytes_total': 'Serialized size of the tiles written to the stores.',
+    'granule_ingester_unchanged_tiles_total': 'Number of tiles that were not written because their content hash '
+                                              'matched the one already stored.',
+    'granule_ingester_batches_total': 'Number of tile batches dispatched to the worker pool.',
+    'granule_ingester_planned_tile_bytes_total': 'In-memory size of the tiles written, as estimated by the memory '
+                                                 'governor when planning their batches.',
+    'granule_ingester_granule_cache_total': 'Lookups of S3 granules in the local granule cache, by result (hit or '
+                                            'miss), and granules evicted from it.',
+    'granule_ingester_prefetched_granules_total': 'Granules downloaded from S3 ahead of their turn, by whether the '
+                                                  'download was used or discarded.',
+}
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters for every granule the ingester has processed, rendered in the Prometheus text exposition
+    format. Rates (tiles/s, bytes/s, share of time per stage) are left to the scraper.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelSet, float]] = defaultdict(lambda: defaultdict(float))
+
+    def increment(self, metric: str, value: float = 1.0, **labels):
+        if metric not in _METRICS:
+            raise KeyError(f'Unknown metric {metric}')
+        with self._lock:
+            self._counters[metric][tuple(sorted(labels.items()))] += value
+
+    def record_granule(self, granule_metrics: GranuleMetrics, elapsed: float, succeeded: bool = True):
+        self.increment('granule_ingester_granules_total', status='success' if succeeded else 'failure')
+        self.increment('granule_ingester_granule_seconds_total', elapsed)
+        for (stage, name), seconds in granule_metrics.stage_seconds.items():
+            labels = {'stage': stage, 'name': name} if name else {'stage': stage}
+            self.increment('granule_ingester_stage_seconds_total', seconds, **labels)
+        self.increment('granule_ingester_tiles_total', granule_metrics.tile_count)
+        self.increment('granule_ingester_tile_bytes_total', granule_metrics.tile_bytes)
+        self.increment('granule_ingester_unchanged_tiles_total', granule_metrics.unchanged_tile_count)
+        self.increment('granule_ingester_batches_total', granule_metrics.batch_count)
+        if granule_metrics.batch_plan is not None:
+            self.increment('granule_ingester_planned_tile_bytes_total',
+                           granule_metrics.batch_plan.tile_bytes * granule_metrics.tile_count)
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for metric, help_text in _METRICS.items():
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} counter')
+                for labels, value in sorted(self._counters[metric].items()):
+                    label_str = ','.join(f'{key}="{_escape(value)}"' for key, value in labels)
+                    lines.append(f'{metric}{{{label_str}}} {value}' if label_str else f'{metric} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(label_value: str) -> str:
+    return label_value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry()
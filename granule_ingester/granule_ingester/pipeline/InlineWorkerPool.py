@@ -0,0 +1,71 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+import xarray as xr
+from granule_ingester.metrics.GranuleMetrics import StageKey
+from granule_ingester.pipeline.WorkerPool import WorkerPool, process_tile_batch, release_processors
+from granule_ingester.processors import TileProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class InlineWorkerPool(WorkerPool):
+    """
+    Processes tiles one batch at a time on the event loop, in the consumer's own process.
+
+    There is no process or thread hand-off at all, which makes this the cheapest backend for small granules, where
+    the IPC round-trip to a worker process costs more than processing the tiles. The writers only make progress
+    between batches, since processing a batch blocks the event loop.
+    """
+
+    backend = 'inline'
+
+    def __init__(self, max_concurrency: int = 1, log_level=logging.INFO):
+        # Batches are processed one after the other no matter what was asked for.
+        super().__init__(1, log_level)
+        self._jobs = {}
+
+    def start(self):
+        logger.info('Started inline worker pool')
+
+    async def close(self):
+        pass
+
+    async def register_job(self,
+                           processor_list: List[TileProcessor],
+                           dataset: xr.Dataset,
+                           dataset_opener: Optional[Callable[..., xr.Dataset]] = None) -> str:
+        job_id = str(uuid.uuid4())
+        self._jobs[job_id] = (processor_list, dataset)
+        return job_id
+
+    def release_job(self, job_id: str):
+        job = self._jobs.pop(job_id, None)
+        if job is not None:
+            release_processors(job[0])
+
+    async def process_batch(self,
+                            job_id: str,
+                            serialized_tiles: List[bytes]) -> Tuple[List[Optional[bytes]], Dict[StageKey, float]]:
+        processor_list, dataset = self._jobs[job_id]
+        results = process_tile_batch(processor_list, dataset, serialized_tiles)
+        # Give the writers a chance to run before the next batch is processed.
+        await asyncio.sleep(0)
+        return results
@@ -0,0 +1,98 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import math
+from typing import Mapping, NamedTuple, Optional
+
+import xarray as xr
+
+from granule_ingester.processors.reading_processors.TileReadingProcessor import MAX_GRANULE_READ_BYTES
+from granule_ingester.slicers import TileSlicer
+
+logger = logging.getLogger(__name__)
+
+
+class BatchPlan(NamedTuple):
+    # Estimated in-memory size of one tile's arrays.
+    tile_bytes: int
+    # Number of tiles dispatched to the worker pool at once.
+    batch_size: int
+    # Number of batches processed at the same time. Twice as many are in flight, so that a batch is queued up
+    # behind each busy worker.
+    max_concurrency: int
+    # Most bytes of variables each copy of the reading processors may read for the whole granule at once.
+    granule_read_bytes: int
+
+
+class MemoryGovernor:
+    """
+    Picks the batch size and concurrency a granule is processed with so that the tiles in flight fit in a memory
+    ceiling.
+
+    The size of a tile is estimated from the dtype of every variable in the granule and the shape of the tiles the
+    slicer cuts, so a granule of large 3-D multi-variable tiles is sent to the workers in small batches while a swath
+    granule of small tiles keeps the full batch size. Concurrency is only lowered when even single-tile batches would
+    not fit. Without a ceiling, every granule gets the full batch size and concurrency.
+
+    Reading processors may also read whole variables of the granule at once, in every worker that holds its own copy
+    of them. With a ceiling, the copies together are kept within it.
+    """
+
+    def __init__(self,
+                 memory_ceiling: Optional[int] = None,
+                 max_batch_size: int = 256,
+                 max_granule_read_bytes: int = MAX_GRANULE_READ_BYTES):
+        self._memory_ceiling = memory_ceiling
+        self._max_batch_size = max(1, int(max_batch_size))
+        self._max_granule_read_bytes = int(max_granule_read_bytes)
+
+    @property
+    def memory_ceiling(self) -> Optional[int]:
+        return self._memory_ceiling
+
+    def plan(self,
+             dataset: xr.Dataset,
+             slicer: TileSlicer,
+             max_concurrency: int,
+             granule_copies: int = 1) -> BatchPlan:
+        """
+        Plans how a granule is processed by max_concurrency workers, granule_copies of which hold their own copy of
+        the processors (see WorkerPool.granule_copies).
+        """
+        tile_bytes = self.estimate_tile_bytes(dataset, slicer.tile_shape(dataset.sizes))
+        max_concurrency = max(1, int(max_concurrency))
+        granule_copies = max(1, int(granule_copies))
+
+        if self._memory_ceiling is None:
+            return BatchPlan(tile_bytes, self._max_batch_size, max_concurrency, self._max_granule_read_bytes)
+
+        tiles_in_flight = max(1, self._memory_ceiling // tile_bytes)
+        concurrency = max(1, min(max_concurrency, tiles_in_flight // 2))
+        batch_size = max(1, min(self._max_batch_size, tiles_in_flight // (concurrency * 2)))
+        granule_read_bytes = min(self._max_granule_read_bytes, self._memory_ceiling // granule_copies)
+        return BatchPlan(tile_bytes, batch_size, concurrency, granule_read_bytes)
+
+    @staticmethod
+    def estimate_tile_bytes(dataset: xr.Dataset, tile_shape: Mapping[str, int]) -> int:
+        """
+        Returns the size of every variable of the dataset, coordinates included, cut to tile_shape. Dimensions missing
+        from tile_shape are taken whole.
+        """
+        tile_bytes = 0
+        for variable in dataset.variables.values():
+            tile_bytes += variable.dtype.itemsize * math.prod(tile_shape.get(dim, size)
+                                                              for dim, size in variable.sizes.items())
+        return max(1, tile_bytes)
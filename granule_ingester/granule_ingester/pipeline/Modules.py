@@ -13,7 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from granule_ingester.processors import (GenerateTileId,
+from granule_ingester.processors import (GenerateContentHash,
+                                         GenerateTileId,
                                          TileSummarizingProcessor,
                                          EmptyTileFilter,
                                          KelvinToCelsius,
@@ -25,13 +26,18 @@ from granule_ingester.processors.reading_processors import (EccoReadingProcessor
                                                             TimeSeriesReadingProcessor,
                                                             GridMultiVariableReadingProcessor,
                                                             SwathMultiVariableReadingProcessor)
-from granule_ingester.slicers import SliceFileByStepSize
+from granule_ingester.pipeline.InlineWorkerPool import InlineWorkerPool
+from granule_ingester.pipeline.ProcessWorkerPool import ProcessWorkerPool
+from granule_ingester.pipeline.ThreadWorkerPool import ThreadWorkerPool
+from granule_ingester.slicers import SliceFileByChunks, SliceFileByStepSize
 from granule_ingester.granule_loaders import GranuleLoader
 
 modules = {
     "granule": GranuleLoader,
     "sliceFileByStepSize": SliceFileByStepSize,
+    "sliceFileByChunks": SliceFileByChunks,
     "generateTileId": GenerateTileId,
+    "generateContentHash": GenerateContentHash,
     "ECCO": EccoReadingProcessor,
     "Grid": GridReadingProcessor,
     "GridMulti": GridMultiVariableReadingProcessor,
@@ -44,3 +50,6 @@ modules = {
     "subtract180FromLongitude": Subtract180FromLongitude,
     "forceAscendingLatitude": ForceAscendingLatitude
 }
+
+# Execution backends for the tile-processing stage, by the name used to select them.
+worker_pools = {pool.backend: pool for pool in (ProcessWorkerPool, ThreadWorkerPool, InlineWorkerPool)}
@@ -0,0 +1,32 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from granule_ingester.pipeline.ResourceBudget import ResourceBudget
+
+
+class PendingTileWindow:
+    """
+    Bounds the tiles that have been dispatched to the worker pool but not yet written to the stores, both by number
+    and by serialized size.
+
+    The pipeline reserves room for a batch's tiles before dispatching it, and for the batch's bytes once it has been
+    processed; the writer gives both back once the batch has been saved. When the stores fall behind, the window
+    fills up and the pipeline stops dispatching until the writers catch up. A window can be shared by every granule
+    a consumer processes, which bounds the memory held by all of them together.
+    """
+
+    def __init__(self, max_tiles: int, max_bytes: int):
+        self.tiles = ResourceBudget(max_tiles)
+        self.bytes = ResourceBudget(max_bytes)
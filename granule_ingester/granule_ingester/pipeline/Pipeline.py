@@ -13,105 +13,50 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import copy
+import functools
+import hashlib
+import itertools
+import json
 import logging
-import pickle
 import time
-from multiprocessing import Manager
-from typing import List
+from collections import OrderedDict
+from typing import Iterable, Iterator, List
 
-import xarray as xr
 import yaml
-from aiomultiprocess import Pool
-from aiomultiprocess.types import ProxyException
+from granule_ingester.checkpoints import CheckpointStore, TileCheckpoint
 from granule_ingester.exceptions import PipelineBuildingError
-from granule_ingester.granule_loaders import GranuleLoader
+from granule_ingester.granule_loaders import GranuleLoader, S3Downloader
+from granule_ingester.metrics import GranuleMetrics, registry
+from granule_ingester.metrics.GranuleMetrics import IPC, OPEN, SERIALIZATION, SLICE
 from granule_ingester.pipeline.Modules import \
     modules as processor_module_mappings
+from granule_ingester.pipeline.MemoryGovernor import BatchPlan, MemoryGovernor
+from granule_ingester.pipeline.Modules import worker_pools
+from granule_ingester.pipeline.PendingTileWindow import PendingTileWindow
+from granule_ingester.pipeline.ResourceBudget import ResourceBudget
+from granule_ingester.pipeline.TileWriter import TileWriter
+from granule_ingester.pipeline.WorkerPool import WorkerPool, processor_chains
+from granule_ingester.processors import GenerateContentHash
 from granule_ingester.processors.TileProcessor import TileProcessor
+from granule_ingester.processors.reading_processors import TileReadingProcessor
 from granule_ingester.slicers import TileSlicer
-from granule_ingester.writers import DataStore, MetadataStore
 from nexusproto import DataTile_pb2 as nexusproto
-from tblib import pickling_support
 
 logger = logging.getLogger(__name__)
 
-# Could not find any info on the aforementioned bug; though I did find that macos restricts the queue size to 2**15-1.
-# Trying to bump this size up a bit as it seems to cause a performance bottleneck when handling a lot of tiles.
-MAX_CHUNK_SIZE = 2 ** 14 - 1
-BATCH_SIZE = 256
-
-_worker_data_store: DataStore = None
-_worker_metadata_store: MetadataStore = None
-_worker_processor_list: List[TileProcessor] = None
-_worker_dataset = None
-_shared_memory = None
-
-
-def _init_worker(processor_list, dataset, data_store_factory, metadata_store_factory, shared_memory, log_level):
-    global _worker_processor_list
-    global _worker_dataset
-    global _shared_memory
-
-    # _worker_data_store and _worker_metadata_store open multiple TCP sockets from each worker process;
-    # however, these sockets will be automatically closed by the OS once the worker processes die so no need to worry.
-    _worker_processor_list = processor_list
-    _worker_dataset = dataset
-    _shared_memory = shared_memory
-
-    logging.basicConfig(level=log_level)
-
-    logging.getLogger("").setLevel(log_level)
-    loggers = [logging.getLogger(name) for name in logging.root.manager.loggerDict]
-    for logger in loggers:
-        logger.setLevel(log_level)
-
-    logger.debug("worker init")
-
-async def _process_tile_in_worker(serialized_input_tile: str):
-    try:
-        logger.debug('Starting tile creation subprocess')
-        logger.debug(f'serialized_input_tile: {serialized_input_tile}')
-        input_tile = nexusproto.NexusTile.FromString(serialized_input_tile)
-        logger.info(f'Creating tile for slice {input_tile.summary.section_spec}')
-        processed_tile: nexusproto = _recurse(_worker_processor_list, _worker_dataset, input_tile)
-
-        if processed_tile is None:
-            logger.info('Processed tile is empty; adding None result to return')
-            return None
-
-        logger.debug('Tile processing complete; serializing output tile')
-
-        serialized_output_tile = nexusproto.NexusTile.SerializeToString(processed_tile)
+_pipeline_templates = OrderedDict()
 
-        logger.debug('Adding serialized result to return')
-
-        return serialized_output_tile
-    except Exception as e:
-        pickling_support.install(e)
-        _shared_memory.error = pickle.dumps(e)
-        raise
-
-async def _process_tile_batch_in_worker(tile_list:List[str]):
-    logger.info('Starting tile creation batch')
-
-    result = []
-
-    for tile in tile_list:
-        output = await _process_tile_in_worker(tile)
-        result.append(output)
-
-    logger.info('Batch complete! Sending results back to pool')
-
-    return result
-
-
-def _recurse(processor_list: List[TileProcessor],
-             dataset: xr.Dataset,
-             input_tile: nexusproto.NexusTile) -> nexusproto.NexusTile:
-    if len(processor_list) == 0:
-        return input_tile
-    output_tile = processor_list[0].process(tile=input_tile, dataset=dataset)
-    return _recurse(processor_list[1:], dataset, output_tile) if output_tile else None
+BATCH_SIZE = 256
+# Default number of processed tiles that may sit in memory waiting to be written to the data and metadata stores.
+MAX_PENDING_TILES = 4096
+# Default total serialized size of the processed tiles that may sit in memory waiting to be written.
+MAX_PENDING_BYTES = 512 * 2 ** 20
+# Number of parsed pipeline configurations kept for reuse. Configurations are evicted least-recently-used first.
+MAX_CACHED_PIPELINES = 64
+# Execution backend used when neither the consumer nor the collection picks one. See Modules.worker_pools.
+DEFAULT_EXECUTION_BACKEND = 'process'
 
 
 class Pipeline:
@@ -122,27 +67,61 @@ class Pipeline:
                  metadata_store_factory,
                  tile_processors: List[TileProcessor],
                  max_concurrency: int,
-                 log_level=logging.INFO):
+                 log_level=logging.INFO,
+                 worker_pool: WorkerPool = None,
+                 max_pending_tiles: int = MAX_PENDING_TILES,
+                 execution_backend: str = None,
+                 memory_budget: ResourceBudget = None,
+                 pending_window: PendingTileWindow = None,
+                 memory_governor: MemoryGovernor = None,
+                 checkpoint_store: CheckpointStore = None,
+                 checkpoint_key: str = None,
+                 skip_unchanged_tiles: bool = False):
         self._granule_loader = granule_loader
-        self._tile_processors = tile_processors
+        self._skip_unchanged_tiles = skip_unchanged_tiles
+        chains = processor_chains(tile_processors)
+        if skip_unchanged_tiles:
+            # The hash has to cover the tile as it will be written, so it is generated last.
+            chains = [chain if any(isinstance(processor, GenerateContentHash) for processor in chain)
+                      else chain + [GenerateContentHash()]
+                      for chain in chains]
+        # A multi-output job runs every tile through several processor chains, each writing to its own dataset, so
+        # that the granule is opened and sliced once for all of them.
+        self._output_count = len(chains)
+        self._tile_processors = chains if self._output_count > 1 else chains[0]
         self._slicer = slicer
         self._data_store_factory = data_store_factory
         self._metadata_store_factory = metadata_store_factory
         self._max_concurrency = int(max_concurrency)
         self._level = log_level
-
-        # Create a SyncManager so that we can to communicate exceptions from the
-        # worker processes back to the main process.
-        self._manager = Manager()
-
-    def __del__(self):
-        self._manager.shutdown()
+        self._worker_pool = worker_pool
+        self._max_pending_tiles = int(max_pending_tiles)
+        self._execution_backend = execution_backend
+        self._memory_budget = memory_budget or ResourceBudget()
+        self._pending_window = pending_window or PendingTileWindow(self._max_pending_tiles, MAX_PENDING_BYTES)
+        self._memory_governor = memory_governor or MemoryGovernor(max_batch_size=BATCH_SIZE)
+        self._checkpoint_store = checkpoint_store if checkpoint_key is not None else None
+        self._checkpoint_key = checkpoint_key
+        # Stage timings and tile counts of the last run.
+        self.metrics: GranuleMetrics = None
 
     def set_log_level(self, level):
         self._level = level
 
     @classmethod
-    def from_string(cls, config_str: str, data_store_factory, metadata_store_factory, max_concurrency: int = 16):
+    def from_string(cls,
+                    config_str: str,
+                    data_store_factory,
+                    metadata_store_factory,
+                    max_concurrency: int = 16,
+                    worker_pool: WorkerPool = None,
+                    max_pending_tiles: int = MAX_PENDING_TILES,
+                    memory_budget: ResourceBudget = None,
+                    pending_window: PendingTileWindow = None,
+                    memory_governor: MemoryGovernor = None,
+                    checkpoint_store: CheckpointStore = None,
+                    skip_unchanged_tiles: bool = False,
+                    s3_downloader: S3Downloader = None):
         logger.debug(f'config_str: {config_str}')
         try:
             config = yaml.load(config_str, yaml.FullLoader)
@@ -151,7 +130,15 @@ class Pipeline:
                                        data_store_factory,
                                        metadata_store_factory,
                                        processor_module_mappings,
-                                       max_concurrency)
+                                       max_concurrency,
+                                       worker_pool,
+                                       max_pending_tiles,
+                                       memory_budget,
+                                       pending_window,
+                                       memory_governor,
+                                       checkpoint_store,
+                                       skip_unchanged_tiles,
+                                       s3_downloader)
 
         except yaml.scanner.ScannerError:
             raise PipelineBuildingError("Cannot build pipeline because of a syntax error in the YAML.")
@@ -169,27 +156,47 @@ class Pipeline:
                         data_store_factory,
                         metadata_store_factory,
                         module_mappings: dict,
-                        max_concurrency: int):
+                        max_concurrency: int,
+                        worker_pool: WorkerPool = None,
+                        max_pending_tiles: int = MAX_PENDING_TILES,
+                        memory_budget: ResourceBudget = None,
+                        pending_window: PendingTileWindow = None,
+                        memory_governor: MemoryGovernor = None,
+                        checkpoint_store: CheckpointStore = None,
+                        skip_unchanged_tiles: bool = False,
+                        s3_downloader: S3Downloader = None):
         try:
-            if 'preprocess' in config:
-                granule_loader = GranuleLoader(**config['granule'], **{'preprocess': config['preprocess']})
+            # Computed before parsing, which consumes parts of the config.
+            checkpoint_key = cls._hash_config(config)
+
+            # Messages for the same collection only differ by the granule resource, so everything else is parsed
+            # once and reused. Each pipeline gets its own shallow copies of the slicer and processors, because
+            # several granules may be processed at once.
+            template_key = cls._template_key(config)
+            if template_key in _pipeline_templates:
+                _pipeline_templates.move_to_end(template_key)
+                logger.debug(f'Reusing parsed pipeline {template_key}')
             else:
-                granule_loader = GranuleLoader(**config['granule'])
-
-            slicer_config = config['slicer']
-            slicer = cls._parse_module(slicer_config, module_mappings)
+                _pipeline_templates[template_key] = cls._parse_template(config, module_mappings)
+                while len(_pipeline_templates) > MAX_CACHED_PIPELINES:
+                    _pipeline_templates.popitem(last=False)
+            granule_loader, slicer, tile_processors, execution_backend = _pipeline_templates[template_key]
 
-            tile_processors = []
-            for processor_config in config['processors']:
-                module = cls._parse_module(processor_config, module_mappings)
-                tile_processors.append(module)
-
-            return cls(granule_loader,
-                       slicer,
+            return cls(granule_loader.with_resource(config['granule']['resource'], s3_downloader),
+                       copy.copy(slicer),
                        data_store_factory,
                        metadata_store_factory,
-                       tile_processors,
-                       max_concurrency)
+                       [[copy.copy(processor) for processor in chain] for chain in processor_chains(tile_processors)],
+                       max_concurrency,
+                       worker_pool=worker_pool,
+                       max_pending_tiles=max_pending_tiles,
+                       execution_backend=execution_backend,
+                       memory_budget=memory_budget,
+                       pending_window=pending_window,
+                       memory_governor=memory_governor,
+                       checkpoint_store=checkpoint_store,
+                       checkpoint_key=checkpoint_key,
+                       skip_unchanged_tiles=skip_unchanged_tiles)
         except PipelineBuildingError:
             raise
         except KeyError as e:
@@ -198,6 +205,43 @@ class Pipeline:
             logger.exception(e)
             raise PipelineBuildingError(f"Cannot build pipeline because of the following error: {e}")
 
+    @classmethod
+    def _parse_template(cls, config: dict, module_mappings: dict):
+        if 'preprocess' in config:
+            granule_loader = GranuleLoader(**config['granule'], **{'preprocess': config['preprocess']})
+        else:
+            granule_loader = GranuleLoader(**config['granule'])
+
+        execution_backend = config.get('execution_backend')
+        if execution_backend is not None and execution_backend not in worker_pools:
+            raise PipelineBuildingError(f"'{execution_backend}' is not a valid execution backend.")
+
+        slicer_config = config['slicer']
+        slicer = cls._parse_module(slicer_config, module_mappings)
+
+        if 'outputs' in config:
+            if 'processors' in config:
+                raise PipelineBuildingError("Cannot build pipeline with both processors and outputs.")
+            tile_processors = [[cls._parse_module(processor_config, module_mappings)
+                                for processor_config in output['processors']]
+                               for output in config['outputs']]
+        else:
+            tile_processors = []
+            for processor_config in config['processors']:
+                module = cls._parse_module(processor_config, module_mappings)
+                tile_processors.append(module)
+
+        return granule_loader, slicer, tile_processors, execution_backend
+
+    @staticmethod
+    def _template_key(config: dict) -> str:
+        template = {**config, 'granule': {k: v for k, v in config['granule'].items() if k != 'resource'}}
+        return hashlib.sha256(json.dumps(template, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _hash_config(config: dict) -> str:
+        return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
     @classmethod
     def _parse_module(cls, module_config: dict, module_mappings: dict):
         module_name = module_config.pop('name')
@@ -213,55 +257,202 @@ class Pipeline:
         return processor_module
 
     async def run(self):
-        async with self._granule_loader as (dataset, granule_name):
-            start = time.perf_counter()
-
-            shared_memory = self._manager.Namespace()
-            async with Pool(processes=self._max_concurrency,
-                            initializer=_init_worker,
-                            initargs=(self._tile_processors,
-                                      dataset,
-                                      self._data_store_factory,
-                                      self._metadata_store_factory,
-                                      shared_memory,
-                                      self._level),
-                            childconcurrency=self._max_concurrency) as pool:
-                serialized_tiles = [nexusproto.NexusTile.SerializeToString(tile) for tile in
-                                    self._slicer.generate_tiles(dataset, granule_name)]
-                # aiomultiprocess is built on top of the stdlib multiprocessing library, which has the limitation that
-                # a queue can't have more than 2**15-1 tasks. So, we have to batch it.
-
-                results = []
-
-                batches = self._chunk_list(serialized_tiles, BATCH_SIZE)
-
-                for chunk in self._chunk_list(batches, MAX_CHUNK_SIZE):
+        if self._worker_pool is not None and self._execution_backend in (None, self._worker_pool.backend):
+            await self._run(self._worker_pool)
+        else:
+            # No long-lived pool was provided, or the collection asked for a different execution backend than the
+            # one it provides, so spin one up just for this granule.
+            pool_class = worker_pools[self._execution_backend or DEFAULT_EXECUTION_BACKEND]
+            async with pool_class(self._max_concurrency, self._level) as worker_pool:
+                await self._run(worker_pool)
+
+    async def _run(self, worker_pool: WorkerPool):
+        metrics = self.metrics = GranuleMetrics()
+        open_start = time.perf_counter()
+        succeeded = False
+        try:
+            async with self._granule_loader as (dataset, granule_name):
+                metrics.granule_name = granule_name
+                metrics.add(OPEN, time.perf_counter() - open_start)
+
+                plan = self._plan(dataset, worker_pool)
+                metrics.batch_plan = plan
+                # Granules being processed concurrently share the memory budget. The uncompressed size of the
+                # granule is what the readers may hold in memory at once, in every worker that reads the granule
+                # itself.
+                estimated_bytes = max(dataset.nbytes,
+                                      worker_pool.granule_copies * min(dataset.nbytes, plan.granule_read_bytes))
+                logger.info(f"Reserving {estimated_bytes} bytes of the memory budget for granule {granule_name}")
+                async with self._memory_budget.reserve(estimated_bytes):
+                    logger.info(f"Processing granule {granule_name} in batches of {plan.batch_size} tiles with "
+                                f"{plan.max_concurrency} batches at a time (estimated {plan.tile_bytes} bytes per "
+                                f"tile, up to {plan.granule_read_bytes} bytes read at once by each of "
+                                f"{worker_pool.granule_copies} workers, memory ceiling "
+                                f"{self._memory_governor.memory_ceiling})")
+                    if self._output_count > 1:
+                        logger.info(f"Running every tile of granule {granule_name} through {self._output_count} "
+                                    f"processor chains")
+
+                    start = time.perf_counter()
+                    job_id = await worker_pool.register_job(self._tile_processors,
+                                                            dataset,
+                                                            self._granule_loader.dataset_opener())
                     try:
-                        logger.info(f'Starting batch of {len(chunk)} tasks in worker pool')
-                        for rb in await pool.map(_process_tile_batch_in_worker, chunk):
-                            for r in rb:
-                                if r is not None:
-                                    results.append(nexusproto.NexusTile.FromString(r))
-                        logger.info(f'Finished batch of {len(chunk)} tasks in worker pool')
+                        tiles = self._slicer.generate_tiles(dataset, granule_name)
+                        checkpoint = None
+                        if self._checkpoint_store is not None:
+                            # Skip the tiles a previous, interrupted attempt at this granule already wrote.
+                            checkpoint = TileCheckpoint(await self._checkpoint_store.load(self._checkpoint_key))
+                            if checkpoint.completed_count:
+                                logger.info(f"Resuming granule {granule_name}; {checkpoint.completed_count} tiles "
+                                            f"were already written")
+                            tiles = checkpoint.pending(tiles)
+
+                        # Tile specs are generated and serialized lazily, one batch at a time, so the first batch
+                        # reaches the workers right away and only the batches in flight are ever held in memory.
+                        batches = self._serialized_batches(tiles, plan.batch_size, metrics)
+
+                        # Processed batches are written while the rest of the granule is still being generated. The
+                        # pending tile window bounds how many tiles, and how many bytes of them, are held in memory
+                        # between dispatch and the stores.
+                        if plan.batch_size > self._max_pending_tiles:
+                            logger.warning(f"Batches of {plan.batch_size} tiles are larger than the pending tile "
+                                           f"window of {self._max_pending_tiles} tiles, so only one batch is held "
+                                           f"between dispatch and the stores at a time")
+                        async with TileWriter(self._data_store_factory(),
+                                              self._metadata_store_factory(),
+                                              max_queued_batches=max(1, self._max_pending_tiles // plan.batch_size),
+                                              metrics=metrics,
+                                              skip_unchanged_tiles=self._skip_unchanged_tiles) as writer:
+                            await self._process_batches(worker_pool,
+                                                        job_id,
+                                                        batches,
+                                                        writer,
+                                                        metrics,
+                                                        plan.max_concurrency,
+                                                        checkpoint)
+                    finally:
+                        worker_pool.release_job(job_id)
+
+                if self._checkpoint_store is not None:
+                    await self._checkpoint_store.clear(self._checkpoint_key)
+            succeeded = True
+        finally:
+            registry.record_granule(metrics, time.perf_counter() - open_start, succeeded)
 
-                    except ProxyException:
-                        logger.info(f'Finished batch of {len(chunk)} tasks in worker pool with error')
-                        pool.terminate()
-                        # Give the shared memory manager some time to write the exception
-                        # await asyncio.sleep(1)
-                        raise pickle.loads(shared_memory.error)
+        end = time.perf_counter()
+        logger.info(f"Generated and wrote {writer.tile_count} tiles in {end - start} seconds")
+        logger.info("Pipeline finished in {} seconds".format(end - start))
+        metrics.log_summary(end - open_start)
+
+    def _plan(self, dataset, worker_pool: WorkerPool) -> BatchPlan:
+        plan = self._memory_governor.plan(dataset,
+                                          self._slicer,
+                                          worker_pool.max_concurrency,
+                                          worker_pool.granule_copies)
+        if self._memory_budget.capacity is not None:
+            # What the workers read at once has to fit in the budget along with everything else.
+            plan = plan._replace(granule_read_bytes=min(plan.granule_read_bytes,
+                                                        self._memory_budget.capacity // worker_pool.granule_copies))
+        for chain in processor_chains(self._tile_processors):
+            for processor in chain:
+                if isinstance(processor, TileReadingProcessor):
+                    processor.limit_granule_read_bytes(plan.granule_read_bytes)
+        return plan
+
+    async def _process_batches(self,
+                               worker_pool: WorkerPool,
+                               job_id: str,
+                               batches,
+                               writer: TileWriter,
+                               metrics: GranuleMetrics,
+                               max_concurrency: int = None,
+                               checkpoint: TileCheckpoint = None):
+        # Keep every worker busy, with a batch queued up behind each one.
+        in_flight = asyncio.Semaphore((max_concurrency or worker_pool.max_concurrency) * 2)
+        pending = set()
+        window = self._pending_window
+        checkpoint_lock = asyncio.Lock()
+
+        def release(reserved_tiles: int, reserved_bytes: int):
+            window.tiles.release(reserved_tiles)
+            window.bytes.release(reserved_bytes)
+
+        async def save_checkpoint(tile_ranges):
+            # Saves are serialized, so that an older snapshot of the checkpoint never overwrites a newer one.
+            async with checkpoint_lock:
+                checkpoint.complete(tile_ranges)
+                await self._checkpoint_store.save(self._checkpoint_key, checkpoint.ranges)
+
+        async def process_batch(batch, tile_ranges):
+            reserved_tiles = reserved_bytes = 0
+            handed_over = False
+            try:
+                # Wait for room in the window before using a worker, so that dispatch pauses while the writers are
+                # behind. The writer gives the room back once the batch has been saved.
+                reserved_tiles = await window.tiles.acquire(len(batch) * self._output_count)
+
+                dispatched = time.perf_counter()
+                results, stage_seconds = await worker_pool.process_batch(job_id, batch)
+                # Whatever part of the round trip was not spent processing tiles went to waiting for a free worker
+                # and moving the batch between processes.
+                metrics.add(IPC, max(0.0, time.perf_counter() - dispatched - sum(stage_seconds.values())))
+                metrics.merge(stage_seconds)
+
+                with metrics.time(SERIALIZATION):
+                    tiles = [nexusproto.NexusTile.FromString(r) for r in results if r is not None]
+                tile_bytes = sum(len(r) for r in results if r is not None)
+                metrics.count_tiles(len(tiles), tile_bytes)
+                # A batch is checkpointed once all of its tiles are saved, or right away if they were all filtered
+                # out.
+                on_saved = functools.partial(save_checkpoint, tile_ranges) if checkpoint is not None else None
+                if tiles:
+                    reserved_bytes = await window.bytes.acquire(tile_bytes)
+                    await writer.put(tiles,
+                                     on_written=functools.partial(release, reserved_tiles, reserved_bytes),
+                                     on_saved=on_saved)
+                    handed_over = True
+                elif on_saved is not None:
+                    await on_saved()
+            finally:
+                in_flight.release()
+                if not handed_over:
+                    release(reserved_tiles, reserved_bytes)
 
-                tile_gen_end = time.perf_counter()
+        try:
+            for batch in batches:
+                await in_flight.acquire()
 
-                logger.info(f"Finished generating tiles in {tile_gen_end - start} seconds")
-                logger.info(f"Now writing generated tiles...")
+                # Stop dispatching as soon as any batch has failed
+                for task in [task for task in pending if task.done()]:
+                    pending.remove(task)
+                    task.result()
 
-                await self._data_store_factory().save_batch(results)
-                await self._metadata_store_factory().save_batch(results)
+                logger.debug(f'Dispatching batch of {len(batch)} tiles to worker pool')
+                metrics.batch_count += 1
+                tile_ranges = checkpoint.claim(len(batch)) if checkpoint is not None else None
+                pending.add(asyncio.ensure_future(process_batch(batch, tile_ranges)))
 
-        end = time.perf_counter()
-        logger.info("Pipeline finished in {} seconds".format(end - start))
+            await asyncio.gather(*pending)
+        except Exception as e:
+            section_spec = getattr(e, 'section_spec', None)
+            if section_spec is not None:
+                logger.error(f'Processing tile {section_spec} of granule {metrics.granule_name} failed: {e!r}')
+            logger.info('Processing tiles in worker pool failed; cancelling outstanding batches')
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise
 
     @staticmethod
-    def _chunk_list(items, chunk_size: int):
-        return [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    def _serialized_batches(tiles: Iterable[nexusproto.NexusTile],
+                            batch_size: int,
+                            metrics: GranuleMetrics = None) -> Iterator[List[bytes]]:
+        tiles = iter(tiles)
+        metrics = metrics or GranuleMetrics()
+        while True:
+            with metrics.time(SLICE):
+                batch = [nexusproto.NexusTile.SerializeToString(tile) for tile in itertools.islice(tiles, batch_size)]
+            if not batch:
+                return
+            yield batch
@@ -0,0 +1,168 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import pickle
+import uuid
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import xarray as xr
+from granule_ingester.metrics.GranuleMetrics import StageKey
+from aiomultiprocess import Pool
+from granule_ingester.pipeline.WorkerPool import WorkerPool, process_tile_batch, release_processors
+from granule_ingester.processors import TileProcessor
+from tblib import pickling_support
+
+logger = logging.getLogger(__name__)
+
+# Number of granule jobs each worker process keeps unpickled at once. Jobs are evicted least-recently-used first.
+MAX_CACHED_JOBS = 4
+# Number of released job ids sent along with each batch, so that workers forget finished jobs they still hold.
+MAX_RELEASED_JOBS = 64
+
+_worker_jobs = OrderedDict()
+
+
+def _init_worker(log_level):
+    logging.basicConfig(level=log_level)
+
+    logging.getLogger("").setLevel(log_level)
+    loggers = [logging.getLogger(name) for name in logging.root.manager.loggerDict]
+    for logger in loggers:
+        logger.setLevel(log_level)
+
+    logger.debug("worker init")
+
+
+def _get_worker_job(job_id: str, serialized_job: bytes):
+    if job_id in _worker_jobs:
+        _worker_jobs.move_to_end(job_id)
+        return _worker_jobs[job_id]
+
+    logger.debug(f'Loading job {job_id} into worker')
+    processor_list, dataset_source = pickle.loads(serialized_job)
+    # The dataset source is either the dataset itself, or a callable that opens the granule in this process.
+    dataset = dataset_source() if callable(dataset_source) else dataset_source
+    _worker_jobs[job_id] = (processor_list, dataset)
+
+    while len(_worker_jobs) > MAX_CACHED_JOBS:
+        evicted_job_id = next(iter(_worker_jobs))
+        logger.debug(f'Evicting job {evicted_job_id} from worker')
+        _forget_worker_job(evicted_job_id)
+
+    return _worker_jobs[job_id]
+
+
+def _forget_worker_job(job_id: str):
+    job = _worker_jobs.pop(job_id, None)
+    if job is not None:
+        processor_list, dataset = job
+        release_processors(processor_list)
+        dataset.close()
+
+
+async def _process_tile_batch_in_worker(job_id: str,
+                                        serialized_job: bytes,
+                                        tile_list: List[bytes],
+                                        released_job_ids: Iterable[str] = ()):
+    logger.info('Starting tile creation batch')
+
+    # Errors are sent back along with the results rather than raised, so that the pool re-raises the original
+    # exception, traceback and failing tile spec instead of aiomultiprocess' generic ProxyException.
+    try:
+        for released_job_id in released_job_ids:
+            _forget_worker_job(released_job_id)
+        processor_list, dataset = _get_worker_job(job_id, serialized_job)
+        results, stage_seconds = process_tile_batch(processor_list, dataset, tile_list)
+    except Exception as e:
+        return None, None, _serialize_error(e)
+
+    logger.info('Batch complete! Sending results back to pool')
+
+    return results, stage_seconds, None
+
+
+def _serialize_error(error: Exception) -> bytes:
+    pickling_support.install(error)
+    try:
+        return pickle.dumps(error)
+    except Exception:
+        # Not every exception can be pickled; keep its type, message and tile spec at least.
+        fallback = RuntimeError(f'{type(error).__name__}: {error}')
+        fallback.section_spec = getattr(error, 'section_spec', None)
+        return pickle.dumps(fallback)
+
+
+class ProcessWorkerPool(WorkerPool):
+    """
+    Processes tiles in a pool of worker processes.
+
+    Granule jobs are shipped to the workers along with each batch, where they are loaded once per worker and cached
+    until they are evicted, or until the worker is sent a batch after the job was released.
+    """
+
+    backend = 'process'
+
+    def __init__(self, max_concurrency: int = 16, log_level=logging.INFO):
+        super().__init__(max_concurrency, log_level)
+        self._pool: Pool = None
+        self._jobs = {}
+        self._released_jobs = deque(maxlen=MAX_RELEASED_JOBS)
+
+    @property
+    def granule_copies(self) -> int:
+        # Every worker process loads its own copy of each job.
+        return self._max_concurrency
+
+    def start(self):
+        self._pool = Pool(processes=self._max_concurrency,
+                          initializer=_init_worker,
+                          initargs=(self._level,),
+                          childconcurrency=self._max_concurrency)
+        logger.info(f'Started worker pool with {self._max_concurrency} processes')
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.join()
+            self._pool = None
+
+    async def register_job(self,
+                           processor_list: List[TileProcessor],
+                           dataset: xr.Dataset,
+                           dataset_opener: Optional[Callable[..., xr.Dataset]] = None) -> str:
+        # Prefer shipping the opener, so that each worker reads the file itself rather than receiving a pickled copy
+        # of the dataset.
+        dataset_source = dataset_opener if dataset_opener is not None else dataset
+        job_id = str(uuid.uuid4())
+        self._jobs[job_id] = pickle.dumps((processor_list, dataset_source))
+        return job_id
+
+    def release_job(self, job_id: str):
+        if self._jobs.pop(job_id, None) is not None:
+            self._released_jobs.append(job_id)
+
+    async def process_batch(self,
+                            job_id: str,
+                            serialized_tiles: List[bytes]) -> Tuple[List[Optional[bytes]], Dict[StageKey, float]]:
+        results, stage_seconds, error = await self._pool.apply(_process_tile_batch_in_worker,
+                                                               (job_id,
+                                                                self._jobs[job_id],
+                                                                serialized_tiles,
+                                                                tuple(self._released_jobs)))
+        if error is not None:
+            raise pickle.loads(error)
+        return results, stage_seconds
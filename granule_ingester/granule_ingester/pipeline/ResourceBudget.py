@@ -0,0 +1,94 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import collections
+import logging
+from contextlib import asynccontextmanager
+from typing import Deque, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceBudget:
+    """
+    An asyncio semaphore with weights: holders reserve an amount of some resource (bytes of memory, tiles, ...) and
+    wait until the total reserved stays within the capacity.
+
+    Waiters are served first-come, first-served, so a large reservation is not starved by a stream of small ones.
+    A reservation larger than the whole capacity is allowed once nothing else is reserved, so that it runs alone
+    rather than never. A budget with no capacity never blocks.
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        self._capacity = capacity
+        self._reserved = 0
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = collections.deque()
+
+    @property
+    def capacity(self) -> Optional[int]:
+        return self._capacity
+
+    @property
+    def reserved(self) -> int:
+        return self._reserved
+
+    async def acquire(self, amount: int) -> int:
+        """
+        Waits until amount can be reserved and reserves it. Returns the amount actually reserved, which is what must
+        be passed to release().
+        """
+        if self._capacity is not None:
+            amount = min(amount, self._capacity)
+
+        if not self._waiters and self._fits(amount):
+            self._reserved += amount
+            return amount
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append((amount, waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The reservation was granted just as we were cancelled, so hand it back.
+                self.release(amount)
+            else:
+                self._waiters.remove((amount, waiter))
+                self._wake_waiters()
+            raise
+        return amount
+
+    def release(self, amount: int):
+        self._reserved -= amount
+        self._wake_waiters()
+
+    @asynccontextmanager
+    async def reserve(self, amount: int):
+        reserved = await self.acquire(amount)
+        try:
+            yield reserved
+        finally:
+            self.release(reserved)
+
+    def _fits(self, amount: int) -> bool:
+        return self._capacity is None or self._reserved + amount <= self._capacity
+
+    def _wake_waiters(self):
+        while self._waiters and self._fits(self._waiters[0][0]):
+            amount, waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._reserved += amount
+                waiter.set_result(None)
@@ -0,0 +1,85 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+import xarray as xr
+from granule_ingester.metrics.GranuleMetrics import StageKey
+from granule_ingester.pipeline.WorkerPool import WorkerPool, process_tile_batch, release_processors
+from granule_ingester.processors import TileProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadWorkerPool(WorkerPool):
+    """
+    Processes tiles in a pool of threads in the consumer's own process.
+
+    Most of the per-tile work is numpy and HDF5 code that releases the GIL, so threads get much of the parallelism
+    of worker processes without serializing tiles across process boundaries or opening the granule once per worker.
+    All threads share one dataset per granule. The granule loader opens granules without locking, so the pool opens
+    its own locked handle on the granule with the dataset opener.
+    """
+
+    backend = 'thread'
+
+    def __init__(self, max_concurrency: int = 16, log_level=logging.INFO):
+        super().__init__(max_concurrency, log_level)
+        self._executor: ThreadPoolExecutor = None
+        self._jobs = {}
+
+    def start(self):
+        self._executor = ThreadPoolExecutor(max_workers=self._max_concurrency, thread_name_prefix='tile-worker')
+        logger.info(f'Started worker pool with {self._max_concurrency} threads')
+
+    async def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def register_job(self,
+                           processor_list: List[TileProcessor],
+                           dataset: xr.Dataset,
+                           dataset_opener: Optional[Callable[..., xr.Dataset]] = None) -> str:
+        if dataset_opener is not None:
+            # Opening the granule reads from the file (or from S3), so it is done by the pool's threads as well.
+            loop = asyncio.get_running_loop()
+            dataset = await loop.run_in_executor(self._executor, partial(dataset_opener, lock=None))
+            close_on_release = True
+        else:
+            close_on_release = False
+
+        job_id = str(uuid.uuid4())
+        self._jobs[job_id] = (processor_list, dataset, close_on_release)
+        return job_id
+
+    def release_job(self, job_id: str):
+        job = self._jobs.pop(job_id, None)
+        if job is not None:
+            release_processors(job[0])
+            if job[2]:
+                job[1].close()
+
+    async def process_batch(self,
+                            job_id: str,
+                            serialized_tiles: List[bytes]) -> Tuple[List[Optional[bytes]], Dict[StageKey, float]]:
+        processor_list, dataset, _ = self._jobs[job_id]
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, process_tile_batch, processor_list, dataset, serialized_tiles)
@@ -0,0 +1,137 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, List
+
+from granule_ingester.metrics import GranuleMetrics
+from granule_ingester.metrics.GranuleMetrics import LOOKUP, WRITE
+from granule_ingester.processors import GenerateContentHash
+from granule_ingester.writers import DataStore, MetadataStore
+from nexusproto import DataTile_pb2 as nexusproto
+
+logger = logging.getLogger(__name__)
+
+
+class TileWriter:
+    """
+    Writes batches of processed tiles to the data and metadata stores while the rest of the granule is still being
+    processed.
+
+    Batches are handed over through a bounded queue, so a producer that gets too far ahead of the stores blocks in
+    put() instead of accumulating the whole granule in memory. Each batch can come with an on_written callback, which
+    is called once the batch is done with, whether it was saved or not, and an on_saved coroutine function, which is
+    awaited once the batch has been saved to both stores. The stores are closed when the writer exits.
+
+    With skip_unchanged_tiles, the content hashes of each batch (see GenerateContentHash) are looked up in the metadata
+    store in one request, and only the tiles that are new or whose hash differs are written.
+    """
+
+    def __init__(self,
+                 data_store: DataStore,
+                 metadata_store: MetadataStore,
+                 max_queued_batches: int = 8,
+                 metrics: GranuleMetrics = None,
+                 skip_unchanged_tiles: bool = False):
+        self._data_store = data_store
+        self._metadata_store = metadata_store
+        self._metrics = metrics or GranuleMetrics()
+        self._queue = asyncio.Queue(maxsize=max(1, int(max_queued_batches)))
+        self._task: asyncio.Future = None
+        self._error: Exception = None
+        self._skip_unchanged_tiles = skip_unchanged_tiles
+        self.tile_count = 0
+
+    async def __aenter__(self):
+        self._task = asyncio.ensure_future(self._drain())
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None:
+                await self.close()
+            else:
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+                while not self._queue.empty():
+                    item = self._queue.get_nowait()
+                    if item is not None:
+                        item[1]()
+        finally:
+            # Stores that buffer their writes (such as the local file sinks) only finish them when closed.
+            self._data_store.close()
+            self._metadata_store.close()
+
+    async def put(self,
+                  tiles: List[nexusproto.NexusTile],
+                  on_written: Callable[[], None] = None,
+                  on_saved: Callable[[], Awaitable[None]] = None):
+        if self._error is not None:
+            raise self._error
+        await self._queue.put((tiles, on_written or (lambda: None), on_saved))
+
+    async def close(self):
+        await self._queue.put(None)
+        await self._task
+        if self._error is not None:
+            raise self._error
+
+    async def _drain(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            tiles, on_written, on_saved = item
+
+            try:
+                # Once a write has failed, keep draining the queue so that producers blocked in put() can see the
+                # error.
+                if self._error is not None:
+                    continue
+
+                if self._skip_unchanged_tiles:
+                    tiles = await self._changed_tiles(tiles)
+                if tiles:
+                    with self._metrics.time(WRITE, type(self._data_store).__name__):
+                        await self._data_store.save_batch(tiles)
+                    with self._metrics.time(WRITE, type(self._metadata_store).__name__):
+                        await self._metadata_store.save_batch(tiles)
+                self.tile_count += len(tiles)
+                if on_saved is not None:
+                    await on_saved()
+            except Exception as e:
+                logger.exception(f'Failed to write a batch of {len(tiles)} tiles')
+                self._error = e
+            finally:
+                on_written()
+
+    async def _changed_tiles(self, tiles: List[nexusproto.NexusTile]) -> List[nexusproto.NexusTile]:
+        with self._metrics.time(LOOKUP, type(self._metadata_store).__name__):
+            stored_hashes = await self._metadata_store.get_content_hashes([tile.summary.tile_id for tile in tiles])
+        changed_tiles = []
+        for tile in tiles:
+            content_hash = GenerateContentHash.get_content_hash(tile)
+            if content_hash is None or stored_hashes.get(tile.summary.tile_id) != content_hash:
+                changed_tiles.append(tile)
+        unchanged_count = len(tiles) - len(changed_tiles)
+        if unchanged_count:
+            logger.debug(f'Skipping {unchanged_count} of {len(tiles)} tiles that are unchanged since they were '
+                         f'last written')
+            self._metrics.unchanged_tile_count += unchanged_count
+        return changed_tiles
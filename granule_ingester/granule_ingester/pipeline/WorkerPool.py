@@ -0,0 +1,182 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Tuple
+
+import xarray as xr
+from granule_ingester.metrics.GranuleMetrics import PROCESSOR, SERIALIZATION, GranuleMetrics, StageKey
+from granule_ingester.processors import DecodedTile, TileProcessor
+from nexusproto import DataTile_pb2 as nexusproto
+
+logger = logging.getLogger(__name__)
+
+
+def process_tile_batch(processor_list: List[TileProcessor],
+                       dataset: xr.Dataset,
+                       tile_list: List[bytes]) -> Tuple[List[Optional[bytes]], Dict[StageKey, float]]:
+    """
+    Runs each serialized tile in tile_list through the processor chain and returns the serialized results, with None
+    in place of every tile that was filtered out, along with the time spent in each processor and in (de)serializing
+    tiles. This is the unit of work every WorkerPool runs, wherever it runs it.
+
+    For a multi-output job, processor_list is a list of processor chains instead (see processor_chains). Each tile is
+    then run through every chain, and the results are given tile by tile, in the order of the chains.
+
+    If a tile fails, the batch stops there and the exception is raised with the tile's spec in its section_spec
+    attribute.
+    """
+    metrics = GranuleMetrics()
+    chains = processor_chains(processor_list)
+    results = [result for tile in tile_list for result in _process_tile(chains, dataset, tile, metrics)]
+    return results, dict(metrics.stage_seconds)
+
+
+def processor_chains(processor_list: list) -> List[List[TileProcessor]]:
+    """Returns the processor chains of a job: the processor list itself, or its chains for a multi-output job."""
+    if processor_list and isinstance(processor_list[0], list):
+        return processor_list
+    return [processor_list]
+
+
+def release_processors(processor_list: list):
+    """Lets every processor of a job free what it read from the job's granule."""
+    for chain in processor_chains(processor_list):
+        for processor in chain:
+            processor.release()
+
+
+def _process_tile(processor_chains: List[List[TileProcessor]],
+                  dataset: xr.Dataset,
+                  serialized_input_tile: bytes,
+                  metrics: GranuleMetrics) -> List[Optional[bytes]]:
+    logger.debug(f'serialized_input_tile: {serialized_input_tile}')
+    with metrics.time(SERIALIZATION):
+        input_tile = nexusproto.NexusTile.FromString(serialized_input_tile)
+    logger.info(f'Creating tile for slice {input_tile.summary.section_spec}')
+
+    results = []
+    for i, processor_list in enumerate(processor_chains):
+        # Processors change the tile they are given, so every chain but the last gets its own copy.
+        if i < len(processor_chains) - 1:
+            chain_tile = nexusproto.NexusTile()
+            chain_tile.CopyFrom(input_tile)
+        else:
+            chain_tile = input_tile
+        try:
+            processed_tile = _recurse(processor_list, dataset, DecodedTile(chain_tile), metrics)
+        except Exception as e:
+            if getattr(e, 'section_spec', None) is None:
+                e.section_spec = input_tile.summary.section_spec
+            raise
+
+        if processed_tile is None:
+            logger.info('Processed tile is empty; adding None result to return')
+            results.append(None)
+            continue
+
+        logger.debug('Tile processing complete; serializing output tile')
+        with metrics.time(SERIALIZATION):
+            results.append(nexusproto.NexusTile.SerializeToString(processed_tile.to_nexus_tile()))
+    return results
+
+
+def _recurse(processor_list: List[TileProcessor],
+             dataset: xr.Dataset,
+             input_tile: DecodedTile,
+             metrics: GranuleMetrics) -> DecodedTile:
+    if len(processor_list) == 0:
+        return input_tile
+    with metrics.time(PROCESSOR, type(processor_list[0]).__name__):
+        output_tile = processor_list[0].process_decoded(input_tile, dataset=dataset)
+    return _recurse(processor_list[1:], dataset, output_tile, metrics) if output_tile else None
+
+
+class WorkerPool(ABC):
+    """
+    Runs batches of tiles through a granule's processor chain.
+
+    A pool is started once and reused for every granule. Granule-specific state (the processor list and the dataset)
+    is registered as a job before the granule's batches are submitted, and released once the granule is done.
+    Implementations only differ in where process_tile_batch runs: in worker processes, in worker threads, or inline
+    on the event loop.
+    """
+
+    # Name used to select this backend with --execution-backend or a collection's executionBackend property.
+    backend: str = None
+
+    def __init__(self, max_concurrency: int = 16, log_level=logging.INFO):
+        self._max_concurrency = int(max_concurrency)
+        self._level = log_level
+
+    @property
+    def max_concurrency(self) -> int:
+        """The number of batches this pool processes at the same time."""
+        return self._max_concurrency
+
+    @property
+    def granule_copies(self) -> int:
+        """
+        The number of copies of a job's processors, and of what they read from the granule, this pool may hold at
+        once.
+        """
+        return 1
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @abstractmethod
+    def start(self):
+        pass
+
+    @abstractmethod
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def register_job(self,
+                           processor_list: List[TileProcessor],
+                           dataset: xr.Dataset,
+                           dataset_opener: Optional[Callable[..., xr.Dataset]] = None) -> str:
+        """
+        Registers a granule with the pool and returns the job id to submit its batches with. processor_list is the
+        granule's processor chain, or a list of chains for a multi-output job (see process_tile_batch).
+        dataset_opener should be a picklable callable that opens the granule again (see
+        GranuleLoader.dataset_opener); pools that process tiles in other processes or threads use it to get their own
+        handle on the granule. It is called without arguments, or with the keyword argument lock=None by pools whose
+        threads read the dataset at the same time, which should give a dataset that is safe to read from several
+        threads at once.
+        """
+        pass
+
+    @abstractmethod
+    def release_job(self, job_id: str):
+        """Forgets a job once its granule is done, releasing its processors (see TileProcessor.release)."""
+        pass
+
+    @abstractmethod
+    async def process_batch(self,
+                            job_id: str,
+                            serialized_tiles: List[bytes]) -> Tuple[List[Optional[bytes]], Dict[StageKey, float]]:
+        """
+        Processes a batch of serialized tiles and returns the result of process_tile_batch. Exceptions raised by the
+        processors are re-raised here, with the spec of the tile that failed in their section_spec attribute.
+        """
+        pass
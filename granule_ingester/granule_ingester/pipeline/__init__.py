@@ -14,4 +14,11 @@
 # limitations under the License.
 
 from granule_ingester.pipeline.Pipeline import Pipeline
-from granule_ingester.pipeline.Modules import modules
+from granule_ingester.pipeline.PendingTileWindow import PendingTileWindow
+from granule_ingester.pipeline.MemoryGovernor import BatchPlan, MemoryGovernor
+from granule_ingester.pipeline.ResourceBudget import ResourceBudget
+from granule_ingester.pipeline.Modules import modules, worker_pools
+from granule_ingester.pipeline.WorkerPool import WorkerPool
+from granule_ingester.pipeline.InlineWorkerPool import InlineWorkerPool
+from granule_ingester.pipeline.ProcessWorkerPool import ProcessWorkerPool
+from granule_ingester.pipeline.ThreadWorkerPool import ThreadWorkerPool
@@ -0,0 +1,63 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+from nexusproto.DataTile_pb2 import NexusTile
+from nexusproto.serialization import from_shaped_array, to_shaped_array
+
+
+class DecodedTile:
+    """
+    A NexusTile on its way through the processor chain, with its array fields (latitude, longitude, variable_data,
+    time, ...) held as numpy arrays.
+
+    Arrays are decoded from the protobuf the first time they are asked for, and only encoded back into the NexusTile
+    by to_nexus_tile(), so a chain of processors working on the same tile decodes and encodes each array at most once.
+    """
+
+    def __init__(self, nexus_tile: NexusTile):
+        self.nexus_tile = nexus_tile
+        self._arrays = {}
+        self._modified = set()
+
+    @property
+    def summary(self):
+        return self.nexus_tile.summary
+
+    @property
+    def tile_type(self) -> str:
+        return self.nexus_tile.tile.WhichOneof("tile_type")
+
+    @property
+    def tile_data(self):
+        return getattr(self.nexus_tile.tile, self.tile_type)
+
+    def get_array(self, name: str) -> np.ndarray:
+        if name not in self._arrays:
+            self._arrays[name] = from_shaped_array(getattr(self.tile_data, name))
+        return self._arrays[name]
+
+    def set_array(self, name: str, array: np.ndarray):
+        # Must also be called after modifying an array returned by get_array() in place
+        self._arrays[name] = array
+        self._modified.add(name)
+
+    def to_nexus_tile(self) -> NexusTile:
+        if self._modified:
+            tile_data = self.tile_data
+            for name in self._modified:
+                getattr(tile_data, name).CopyFrom(to_shaped_array(self._arrays[name]))
+            self._modified.clear()
+        return self.nexus_tile
@@ -17,9 +17,9 @@ import logging
 
 import numpy
 from nexusproto import DataTile_pb2 as nexusproto
-from nexusproto.serialization import from_shaped_array
 
-from granule_ingester.processors.TileProcessor import TileProcessor
+from granule_ingester.processors.DecodedTile import DecodedTile
+from granule_ingester.processors.TileProcessor import DecodedTileProcessor
 
 logger = logging.getLogger(__name__)
 
@@ -28,12 +28,10 @@ def parse_input(nexus_tile_data):
     return nexusproto.NexusTile.FromString(nexus_tile_data)
 
 
-class EmptyTileFilter(TileProcessor):
-    def process(self, tile, *args, **kwargs):
-        tile_type = tile.tile.WhichOneof("tile_type")
+class EmptyTileFilter(DecodedTileProcessor):
+    def process_decoded(self, tile: DecodedTile, *args, **kwargs):
         logger.debug(f'processing granule: {tile.summary.granule}')
-        tile_data = getattr(tile.tile, tile_type)
-        data = from_shaped_array(tile_data.variable_data)
+        data = tile.get_array('variable_data')
         # Only supply data if there is actual values in the tile
         if data.size - numpy.count_nonzero(numpy.isnan(data)) > 0:
             return tile
@@ -16,12 +16,12 @@ import logging
 
 import numpy as np
 
-from nexusproto.serialization import from_shaped_array, to_shaped_array
-from granule_ingester.processors.TileProcessor import TileProcessor
+from granule_ingester.processors.DecodedTile import DecodedTile
+from granule_ingester.processors.TileProcessor import DecodedTileProcessor
 logger = logging.getLogger(__name__)
 
 
-class ForceAscendingLatitude(TileProcessor):
+class ForceAscendingLatitude(DecodedTileProcessor):
     def __init__(self, default_latitude_axis=0):
         self.__default_latitude_axis = default_latitude_axis
         self.__latitude_keywords = {'lat', 'latitude', 'latitudes', 'yc', 'ydim_grid'}
@@ -37,21 +37,17 @@ class ForceAscendingLatitude(TileProcessor):
         logger.debug(f'cannot find one of latitude keywords from {self.__latitude_keywords} in axis_tuple: {axis_tuple}. using the default axis')
         return self.__default_latitude_axis
 
-    def process(self, tile, *args, **kwargs):
+    def process_decoded(self, tile: DecodedTile, *args, **kwargs):
         """
         This method will reverse the ordering of latitude values in a tile if necessary to ensure that the latitude values are ascending.
 ​
         :param self:
-        :param tile: The nexus_tile
+        :param tile: The decoded nexus_tile
         :return: Tile data with altered latitude values
         """
-        the_tile_type = tile.tile.WhichOneof("tile_type")
         logger.debug(f'processing granule: {tile.summary.granule}')
 
-        the_tile_data = getattr(tile.tile, the_tile_type)
-
-        latitudes = from_shaped_array(the_tile_data.latitude)
-        data = from_shaped_array(the_tile_data.variable_data)
+        latitudes = tile.get_array('latitude')
         if len(latitudes) < 2:
             logger.debug(f'Not enough latitude in data to flip. No need to do so..')
             return tile
@@ -63,7 +59,7 @@ class ForceAscendingLatitude(TileProcessor):
         latitudes = np.flip(latitudes)
         latitude_axis = self.__get_latitude_axis(tile.summary.data_dim_names)
         logger.debug(f'flipping data on axis: {latitude_axis}')
-        data = np.flip(data, axis=latitude_axis)
-        the_tile_data.latitude.CopyFrom(to_shaped_array(latitudes))
-        the_tile_data.variable_data.CopyFrom(to_shaped_array(data))
+        data = np.flip(tile.get_array('variable_data'), axis=latitude_axis)
+        tile.set_array('latitude', latitudes)
+        tile.set_array('variable_data', data)
         return tile
@@ -0,0 +1,72 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import logging
+from typing import Optional
+
+from nexusproto import DataTile_pb2 as nexusproto
+from granule_ingester.processors.DecodedTile import DecodedTile
+from granule_ingester.processors.TileProcessor import TileProcessor
+logger = logging.getLogger(__name__)
+
+# Name of the global attribute the hash is kept in. The metadata stores index global attributes as fields, so the
+# hash is stored alongside the rest of the tile's metadata.
+CONTENT_HASH_ATTRIBUTE = 'tile_content_hash_s'
+
+
+class GenerateContentHash(TileProcessor):
+    """
+    Records a hash of the tile's data and summary, so that a granule that is ingested again can skip writing the
+    tiles that have not changed since the last time (see --skip-unchanged-tiles). Must run after every processor that
+    changes the tile.
+    """
+
+    def process(self, tile: nexusproto.NexusTile, *args, **kwargs):
+        content_hash = self.content_hash(tile)
+        logger.debug(f'content hash of tile {tile.summary.tile_id}: {content_hash}')
+        # A tile that already has a hash (e.g. one processed again) keeps a single, up to date one.
+        for attribute in tile.summary.global_attributes:
+            if attribute.name == CONTENT_HASH_ATTRIBUTE:
+                del attribute.values[:]
+                break
+        else:
+            attribute = tile.summary.global_attributes.add()
+            attribute.name = CONTENT_HASH_ATTRIBUTE
+        attribute.values.append(content_hash)
+        return tile
+
+    def process_decoded(self, tile: DecodedTile, *args, **kwargs):
+        # The hash covers the encoded arrays; the worker re-uses the encoded tile, so nothing is encoded twice.
+        self.process(tile.to_nexus_tile(), *args, **kwargs)
+        return tile
+
+    @staticmethod
+    def content_hash(tile: nexusproto.NexusTile) -> str:
+        """Hashes the tile as it would be written, without any content hash it already has."""
+        unhashed = nexusproto.NexusTile()
+        unhashed.CopyFrom(tile)
+        attributes = [attribute for attribute in unhashed.summary.global_attributes
+                      if attribute.name != CONTENT_HASH_ATTRIBUTE]
+        del unhashed.summary.global_attributes[:]
+        unhashed.summary.global_attributes.extend(attributes)
+        return hashlib.sha256(unhashed.SerializeToString(deterministic=True)).hexdigest()
+
+    @staticmethod
+    def get_content_hash(tile: nexusproto.NexusTile) -> Optional[str]:
+        for attribute in tile.summary.global_attributes:
+            if attribute.name == CONTENT_HASH_ATTRIBUTE and attribute.values:
+                return attribute.values[0]
+        return None
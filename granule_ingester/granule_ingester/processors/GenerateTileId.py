@@ -17,6 +17,7 @@ import os
 import uuid
 
 from nexusproto import DataTile_pb2 as nexusproto
+from granule_ingester.processors.DecodedTile import DecodedTile
 from granule_ingester.processors.TileProcessor import TileProcessor
 logger = logging.getLogger(__name__)
 
@@ -34,3 +35,8 @@ class GenerateTileId(TileProcessor):
         logger.debug(f'generated_id: {generated_id}')
         tile.summary.tile_id = str(generated_id)
         return tile
+
+    def process_decoded(self, tile: DecodedTile, *args, **kwargs):
+        # Only the summary is touched, so the decoded arrays can be left as they are
+        self.process(tile.nexus_tile, *args, **kwargs)
+        return tile
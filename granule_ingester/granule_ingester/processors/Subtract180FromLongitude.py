@@ -14,28 +14,26 @@
 # limitations under the License.
 import logging
 
-from granule_ingester.processors.TileProcessor import TileProcessor
-from nexusproto.serialization import from_shaped_array, to_shaped_array
+from granule_ingester.processors.DecodedTile import DecodedTile
+from granule_ingester.processors.TileProcessor import DecodedTileProcessor
 
 logger = logging.getLogger(__name__)
 
 
-class Subtract180FromLongitude(TileProcessor):
-    def process(self, tile, *args, **kwargs):
+class Subtract180FromLongitude(DecodedTileProcessor):
+    def process_decoded(self, tile: DecodedTile, *args, **kwargs):
         """
         This method will transform longitude values in degrees_east from 0 TO 360 to -180 to 180
         :param self:
-        :param nexus_tile: The nexus_tile
+        :param tile: The decoded nexus_tile
         :return: Tile data with altered longitude values
         """
-        the_tile_type = tile.tile.WhichOneof("tile_type")
         logger.debug(f'processing granule: {tile.summary.granule}')
-        the_tile_data = getattr(tile.tile, the_tile_type)
-        longitudes = from_shaped_array(the_tile_data.longitude)
+        longitudes = tile.get_array('longitude')
 
         # Only subtract 360 if the longitude is greater than 180
         longitudes[longitudes > 180] -= 360
 
-        the_tile_data.longitude.CopyFrom(to_shaped_array(longitudes))
+        tile.set_array('longitude', longitudes)
 
         return tile
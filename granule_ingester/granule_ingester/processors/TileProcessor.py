@@ -17,6 +17,8 @@ from abc import ABC, abstractmethod
 from nexusproto.serialization import from_shaped_array, to_shaped_array
 from nexusproto.DataTile_pb2 import NexusTile
 
+from granule_ingester.processors.DecodedTile import DecodedTile
+
 
 # TODO: make this an informal interface, not an abstract class
 class TileProcessor(ABC):
@@ -39,3 +41,28 @@ class TileProcessor(ABC):
         # return tile
 
         pass
+
+    def release(self):
+        # Called once the processor is done with its granule, to free whatever it read from it.
+        pass
+
+    def process_decoded(self, tile: DecodedTile, *args, **kwargs):
+        # Called by the pipeline instead of process(). Processors that have not been written against DecodedTile
+        # get the encoded NexusTile, exactly as if process() had been called directly.
+        processed_tile = self.process(tile.to_nexus_tile(), *args, **kwargs)
+        return DecodedTile(processed_tile) if processed_tile is not None else None
+
+
+class DecodedTileProcessor(TileProcessor, ABC):
+    """
+    Base class for processors that work on the decoded arrays of a DecodedTile, so that tiles are not decoded and
+    re-encoded by every processor in the chain. process() still accepts and returns a plain NexusTile.
+    """
+
+    def process(self, tile: NexusTile, *args, **kwargs):
+        processed_tile = self.process_decoded(DecodedTile(tile), *args, **kwargs)
+        return processed_tile.to_nexus_tile() if processed_tile is not None else None
+
+    @abstractmethod
+    def process_decoded(self, tile: DecodedTile, *args, **kwargs):
+        pass
@@ -19,7 +19,8 @@ import numpy
 from nexusproto import DataTile_pb2 as nexusproto
 from nexusproto.serialization import from_shaped_array
 
-from granule_ingester.processors.TileProcessor import TileProcessor
+from granule_ingester.processors.DecodedTile import DecodedTile
+from granule_ingester.processors.TileProcessor import DecodedTileProcessor
 logger = logging.getLogger(__name__)
 
 
@@ -38,23 +39,31 @@ def find_time_min_max(tile_data):
     raise NoTimeException
 
 
-class TileSummarizingProcessor(TileProcessor):
+def find_decoded_time_min_max(tile: DecodedTile):
+    tile_data = tile.tile_data
+    if tile_data.time and isinstance(tile_data.time, nexusproto.ShapedArray):
+        time_data = tile.get_array('time')
+        return int(numpy.nanmin(time_data).item()), int(numpy.nanmax(time_data).item())
+
+    return find_time_min_max(tile_data)
+
+
+class TileSummarizingProcessor(DecodedTileProcessor):
 
     def __init__(self, dataset_name: str, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._dataset_name = dataset_name
 
-    def process(self, tile, dataset, *args, **kwargs):
-        tile_type = tile.tile.WhichOneof("tile_type")
+    def process_decoded(self, tile: DecodedTile, dataset, *args, **kwargs):
+        tile_type = tile.tile_type
         logger.debug(f'processing granule: {tile.summary.granule}')
-        tile_data = getattr(tile.tile, tile_type)
 
-        latitudes = numpy.ma.masked_invalid(from_shaped_array(tile_data.latitude))
-        longitudes = numpy.ma.masked_invalid(from_shaped_array(tile_data.longitude))
-        data = from_shaped_array(tile_data.variable_data)
+        latitudes = numpy.ma.masked_invalid(tile.get_array('latitude'))
+        longitudes = numpy.ma.masked_invalid(tile.get_array('longitude'))
+        data = tile.get_array('variable_data')
         logger.debug(f'retrieved lat, long, data')
 
-        tile_summary = tile.summary if tile.HasField("summary") else nexusproto.TileSummary()
+        tile_summary = tile.summary if tile.nexus_tile.HasField("summary") else nexusproto.TileSummary()
         logger.debug(f'retrieved summary')
 
         tile_summary.dataset_name = self._dataset_name
@@ -92,7 +101,7 @@ class TileSummarizingProcessor(TileProcessor):
         logger.debug(f'find min max time')
 
         try:
-            min_time, max_time = find_time_min_max(tile_data)
+            min_time, max_time = find_decoded_time_min_max(tile)
             logger.debug(f'set min max time')
             tile_summary.stats.min_time = min_time
             tile_summary.stats.max_time = max_time
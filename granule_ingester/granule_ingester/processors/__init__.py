@@ -13,9 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from granule_ingester.processors.DecodedTile import DecodedTile
 from granule_ingester.processors.EmptyTileFilter import EmptyTileFilter
+from granule_ingester.processors.GenerateContentHash import GenerateContentHash
 from granule_ingester.processors.GenerateTileId import GenerateTileId
-from granule_ingester.processors.TileProcessor import TileProcessor
+from granule_ingester.processors.TileProcessor import DecodedTileProcessor, TileProcessor
 from granule_ingester.processors.TileSummarizingProcessor import TileSummarizingProcessor
 from granule_ingester.processors.kelvintocelsius import KelvinToCelsius
 from granule_ingester.processors.Subtract180FromLongitude import Subtract180FromLongitude
@@ -16,15 +16,14 @@ import json
 import logging
 from copy import deepcopy
 
-from nexusproto.serialization import from_shaped_array, to_shaped_array
-from nexusproto.DataTile_pb2 import NexusTile
-from granule_ingester.processors.TileProcessor import TileProcessor
+from granule_ingester.processors.DecodedTile import DecodedTile
+from granule_ingester.processors.TileProcessor import DecodedTileProcessor
 logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] [%(name)s::%(lineno)d] %(message)s")
 
 logger = logging.getLogger(__name__)
 
 
-class KelvinToCelsius(TileProcessor):
+class KelvinToCelsius(DecodedTileProcessor):
     def __retrieve_var_units(self, variable_name, ds):
         variable_unit = []
         copied_variable_name = deepcopy(variable_name)
@@ -44,10 +43,8 @@ class KelvinToCelsius(TileProcessor):
                 logger.exception(f'some error in __retrieve_var_units: {str(e)}')
         return variable_unit
 
-    def process(self, tile: NexusTile, *args, **kwargs):
-        the_tile_type = tile.tile.WhichOneof("tile_type")
+    def process_decoded(self, tile: DecodedTile, *args, **kwargs):
         logger.debug(f'processing granule: {tile.summary.granule}')
-        the_tile_data = getattr(tile.tile, the_tile_type)
         kelvins = ['kelvin', 'degk', 'deg_k', 'degreesk', 'degrees_k', 'degree_k', 'degreek']
 
         if 'dataset' in kwargs:
@@ -61,7 +58,7 @@ class KelvinToCelsius(TileProcessor):
                 return tile
             variable_unit = [k.lower() for k in variable_unit]
             if any([unit in variable_unit for unit in kelvins]):
-                var_data = from_shaped_array(the_tile_data.variable_data) - 273.15
-                the_tile_data.variable_data.CopyFrom(to_shaped_array(var_data))
+                var_data = tile.get_array('variable_data') - 273.15
+                tile.set_array('variable_data', var_data)
         
         return tile
@@ -18,8 +18,8 @@ from typing import Dict
 import numpy as np
 import xarray as xr
 from nexusproto import DataTile_pb2 as nexusproto
-from nexusproto.serialization import to_shaped_array
 
+from granule_ingester.processors.DecodedTile import DecodedTile
 from granule_ingester.processors.reading_processors.TileReadingProcessor import TileReadingProcessor
 
 
@@ -39,17 +39,16 @@ class EccoReadingProcessor(TileReadingProcessor):
         self.time = time
         self.tile = tile
 
-    def _generate_tile(self, ds: xr.Dataset, dimensions_to_slices: Dict[str, slice], input_tile):
+    def _generate_decoded_tile(self, ds: xr.Dataset, dimensions_to_slices: Dict[str, slice], input_tile: DecodedTile):
         data_variable = self.variable[0] if isinstance(self.variable, list) else self.variable
         new_tile = nexusproto.EccoTile()
 
-        lat_subset = ds[self.latitude][type(self)._slices_for_variable(ds[self.latitude], dimensions_to_slices)]
-        lon_subset = ds[self.longitude][type(self)._slices_for_variable(ds[self.longitude], dimensions_to_slices)]
+        lat_subset = type(self)._read_slab(ds[self.latitude], dimensions_to_slices)
+        lon_subset = type(self)._read_slab(ds[self.longitude], dimensions_to_slices)
         lat_subset = np.ma.filled(np.squeeze(lat_subset), np.NaN)
         lon_subset = np.ma.filled(np.squeeze(lon_subset), np.NaN)
 
-        data_subset = ds[data_variable][
-            type(self)._slices_for_variable(ds[data_variable], dimensions_to_slices)]
+        data_subset = type(self)._read_slab(ds[data_variable], dimensions_to_slices)
         data_subset = np.ma.filled(np.squeeze(data_subset), np.NaN)
 
         new_tile.tile = ds[self.tile][dimensions_to_slices[self.tile].start].item()
@@ -73,9 +72,9 @@ class EccoReadingProcessor(TileReadingProcessor):
                                                                                                dim_len=time_slice_len))
             new_tile.time = int(ds[self.time][time_slice.start].item() / 1e9)
 
-        new_tile.latitude.CopyFrom(to_shaped_array(lat_subset))
-        new_tile.longitude.CopyFrom(to_shaped_array(lon_subset))
-        new_tile.variable_data.CopyFrom(to_shaped_array(data_subset))
+        input_tile.set_array('latitude', type(self)._owned_array(lat_subset))
+        input_tile.set_array('longitude', type(self)._owned_array(lon_subset))
+        input_tile.set_array('variable_data', type(self)._owned_array(data_subset))
 
-        input_tile.tile.ecco_tile.CopyFrom(new_tile)
+        input_tile.nexus_tile.tile.ecco_tile.CopyFrom(new_tile)
         return input_tile
@@ -21,8 +21,8 @@ import numpy as np
 import xarray as xr
 from granule_ingester.processors.reading_processors.MultiBandUtils import MultiBandUtils
 from nexusproto import DataTile_pb2 as nexusproto
-from nexusproto.serialization import to_shaped_array
 
+from granule_ingester.processors.DecodedTile import DecodedTile
 from granule_ingester.processors.reading_processors.TileReadingProcessor import TileReadingProcessor
 
 logger = logging.getLogger(__name__)
@@ -34,7 +34,7 @@ class GridMultiVariableReadingProcessor(TileReadingProcessor):
         self.depth = depth
         self.time = time
 
-    def _generate_tile(self, ds: xr.Dataset, dimensions_to_slices: Dict[str, slice], input_tile):
+    def _generate_decoded_tile(self, ds: xr.Dataset, dimensions_to_slices: Dict[str, slice], input_tile: DecodedTile):
         """
         Update 2021-05-28 : adding support for banded datasets
             - self.variable can be a string or a list of strings
@@ -48,13 +48,13 @@ class GridMultiVariableReadingProcessor(TileReadingProcessor):
         Update 2021-07-09: temporarily cancelling dimension switches as it means lots of changes on query side.
         :param ds: xarray.Dataset - netcdf4 object
         :param dimensions_to_slices: Dict[str, slice] - slice dict with keys as the keys of the netcdf4 datasets
-        :param input_tile: nexusproto.NexusTile()
+        :param input_tile: DecodedTile of a nexusproto.NexusTile()
         :return: input_tile - filled with the value
         """
         new_tile = nexusproto.GridMultiVariableTile()
 
-        lat_subset = ds[self.latitude][type(self)._slices_for_variable(ds[self.latitude], dimensions_to_slices)]
-        lon_subset = ds[self.longitude][type(self)._slices_for_variable(ds[self.longitude], dimensions_to_slices)]
+        lat_subset = type(self)._read_slab(ds[self.latitude], dimensions_to_slices)
+        lon_subset = type(self)._read_slab(ds[self.longitude], dimensions_to_slices)
 
         lat_subset = np.squeeze(lat_subset)
         if lat_subset.shape == ():
@@ -72,9 +72,9 @@ class GridMultiVariableReadingProcessor(TileReadingProcessor):
         logger.debug(f'reading as banded grid as self.variable is a list. self.variable: {self.variable}')
         if len(self.variable) < 1:
             raise ValueError(f'list of variable is empty. Need at least 1 variable')
-        data_subset = [ds[k][type(self)._slices_for_variable(ds[k], dimensions_to_slices)] for k in self.variable]
+        data_subset = [type(self)._read_slab(ds[k], dimensions_to_slices) for k in self.variable]
         updated_dims, updated_dims_indices = MultiBandUtils.move_band_dimension(list(data_subset[0].dims))
-        data_subset = [ds.data for ds in data_subset]
+        data_subset = [ds.values for ds in data_subset]
         data_subset = np.array(data_subset)
         logger.debug(f'transposing data_subset')
         data_subset = data_subset.transpose(updated_dims_indices)
@@ -102,9 +102,9 @@ class GridMultiVariableReadingProcessor(TileReadingProcessor):
                 ds[self.time] = ds.indexes[self.time].to_datetimeindex()
             new_tile.time = int(ds[self.time][time_slice.start].item() / 1e9)
 
-        new_tile.latitude.CopyFrom(to_shaped_array(lat_subset))
-        new_tile.longitude.CopyFrom(to_shaped_array(lon_subset))
-        new_tile.variable_data.CopyFrom(to_shaped_array(data_subset))
+        input_tile.set_array('latitude', type(self)._owned_array(lat_subset))
+        input_tile.set_array('longitude', type(self)._owned_array(lon_subset))
+        input_tile.set_array('variable_data', type(self)._owned_array(data_subset))
 
-        input_tile.tile.grid_multi_variable_tile.CopyFrom(new_tile)
+        input_tile.nexus_tile.tile.grid_multi_variable_tile.CopyFrom(new_tile)
         return input_tile
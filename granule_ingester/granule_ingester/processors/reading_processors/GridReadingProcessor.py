@@ -19,27 +19,49 @@ import cftime
 import numpy as np
 import xarray as xr
 from nexusproto import DataTile_pb2 as nexusproto
-from nexusproto.serialization import to_shaped_array
 
+from granule_ingester.processors.DecodedTile import DecodedTile
 from granule_ingester.processors.reading_processors.TileReadingProcessor import TileReadingProcessor
 
 
 class GridReadingProcessor(TileReadingProcessor):
-    def __init__(self, variable, latitude, longitude, depth=None, time=None, **kwargs):
+    def __init__(self,
+                 variable,
+                 latitude,
+                 longitude,
+                 depth=None,
+                 time=None,
+                 max_granule_read_bytes=None,
+                 **kwargs):
         super().__init__(variable, latitude, longitude, **kwargs)
         if isinstance(variable, list) and len(variable) != 1:
             raise RuntimeError(f'TimeSeriesReadingProcessor does not support multiple variable: {variable}')
         self.depth = depth
         self.time = time
+        # Granules whose latitude, longitude and data variable fit in this many bytes (and in what the pipeline planned
+        # for) are read into memory once, and every tile is cut out of those arrays. Larger granules are read one tile
+        # at a time.
+        self.max_granule_read_bytes = int(max_granule_read_bytes) if max_granule_read_bytes is not None else None
 
-    def _generate_tile(self, ds: xr.Dataset, dimensions_to_slices: Dict[str, slice], input_tile):
+    def _generate_decoded_tile(self, ds: xr.Dataset, dimensions_to_slices: Dict[str, slice], input_tile: DecodedTile):
         data_variable = self.variable[0] if isinstance(self.variable, list) else self.variable
         new_tile = nexusproto.GridTile()
 
         expand_axes = []
 
-        lat_subset = ds[self.latitude][type(self)._slices_for_variable(ds[self.latitude], dimensions_to_slices)]
-        lon_subset = ds[self.longitude][type(self)._slices_for_variable(ds[self.longitude], dimensions_to_slices)]
+        granule_arrays = self._load_granule_arrays(ds,
+                                                   [self.latitude, self.longitude, data_variable],
+                                                   self.max_granule_read_bytes)
+        if granule_arrays is not None:
+            lat_subset = type(self)._slice_array(granule_arrays[self.latitude],
+                                                 ds[self.latitude].dims,
+                                                 dimensions_to_slices)
+            lon_subset = type(self)._slice_array(granule_arrays[self.longitude],
+                                                 ds[self.longitude].dims,
+                                                 dimensions_to_slices)
+        else:
+            lat_subset = type(self)._read_slab(ds[self.latitude], dimensions_to_slices)
+            lon_subset = type(self)._read_slab(ds[self.longitude], dimensions_to_slices)
 
         lat_subset = np.squeeze(lat_subset)
         if lat_subset.shape == ():
@@ -54,8 +76,12 @@ class GridReadingProcessor(TileReadingProcessor):
         lat_subset = np.ma.filled(lat_subset, np.NaN)
         lon_subset = np.ma.filled(lon_subset, np.NaN)
 
-        data_subset = ds[data_variable][type(self)._slices_for_variable(ds[data_variable],
-                                                                        dimensions_to_slices)].data
+        if granule_arrays is not None:
+            data_subset = type(self)._slice_array(granule_arrays[data_variable],
+                                                  ds[data_variable].dims,
+                                                  dimensions_to_slices)
+        else:
+            data_subset = type(self)._read_slab(ds[data_variable], dimensions_to_slices).values
         data_subset = np.array(np.squeeze(data_subset))
 
         if len(expand_axes) > 0:
@@ -83,9 +109,9 @@ class GridReadingProcessor(TileReadingProcessor):
                 ds[self.time] = ds.indexes[self.time].to_datetimeindex()
             new_tile.time = int(ds[self.time][time_slice.start].item() / 1e9)
 
-        new_tile.latitude.CopyFrom(to_shaped_array(lat_subset))
-        new_tile.longitude.CopyFrom(to_shaped_array(lon_subset))
-        new_tile.variable_data.CopyFrom(to_shaped_array(data_subset))
+        input_tile.set_array('latitude', type(self)._owned_array(lat_subset))
+        input_tile.set_array('longitude', type(self)._owned_array(lon_subset))
+        input_tile.set_array('variable_data', type(self)._owned_array(data_subset))
 
-        input_tile.tile.grid_tile.CopyFrom(new_tile)
+        input_tile.nexus_tile.tile.grid_tile.CopyFrom(new_tile)
         return input_tile
@@ -15,19 +15,25 @@
 import datetime
 import json
 import logging
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, Union
+from typing import Dict, List, Optional, Union
 
 import numpy as np
 import xarray as xr
 from granule_ingester.exceptions import TileProcessingError
-from granule_ingester.processors.TileProcessor import TileProcessor
+from granule_ingester.processors.DecodedTile import DecodedTile
+from granule_ingester.processors.TileProcessor import DecodedTileProcessor
 from nexusproto import DataTile_pb2 as nexusproto
 
 logger = logging.getLogger(__name__)
 
+# Most bytes of variables a reader reads for the whole granule at once, unless the pipeline plans for less (see
+# MemoryGovernor.plan).
+MAX_GRANULE_READ_BYTES = 256 * 1024 * 1024
 
-class TileReadingProcessor(TileProcessor, ABC):
+
+class TileReadingProcessor(DecodedTileProcessor, ABC):
 
     def __init__(self, variable: Union[str, list], latitude: str, longitude: str, *args, **kwargs):
         try:
@@ -40,23 +46,57 @@ class TileReadingProcessor(TileProcessor, ABC):
             raise RuntimeError(f'variable list is empty: {self.variable}')
         self.latitude = latitude
         self.longitude = longitude
-
-    def process(self, tile, dataset: xr.Dataset, *args, **kwargs):
+        self._granule_read_limit = MAX_GRANULE_READ_BYTES
+        self._granule_arrays = None
+        self._granule_arrays_lock = threading.Lock()
+
+    def __getstate__(self):
+        # Copies and pickled processors start without the granule arrays, which belong to the dataset they were read
+        # from, and get their own lock.
+        state = self.__dict__.copy()
+        state['_granule_arrays'] = None
+        del state['_granule_arrays_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._granule_arrays_lock = threading.Lock()
+
+    def limit_granule_read_bytes(self, max_bytes: int):
+        """Lowers the most bytes this reader reads for the whole granule at once, as planned by the pipeline."""
+        self._granule_read_limit = max(0, int(max_bytes))
+
+    def release(self):
+        with self._granule_arrays_lock:
+            self._granule_arrays = None
+
+    def process_decoded(self, tile: DecodedTile, dataset: xr.Dataset, *args, **kwargs):
         logger.debug(f'Reading Processor: {type(self)}')
         try:
             dimensions_to_slices = self._convert_spec_to_slices(tile.summary.section_spec)
 
             output_tile = nexusproto.NexusTile()
-            output_tile.CopyFrom(tile)
+            output_tile.CopyFrom(tile.to_nexus_tile())
             output_tile.summary.data_var_name = json.dumps(self.variable)
 
-            return self._generate_tile(dataset, dimensions_to_slices, output_tile)
+            # The arrays read from the granule are handed down the chain as they are, and only encoded into the tile
+            # once the chain is done with them.
+            return self._generate_decoded_tile(dataset, dimensions_to_slices, DecodedTile(output_tile))
         except Exception as e:
             logger.exception(e)
             raise TileProcessingError(f"Could not generate tiles from the granule because of the following error: {e}.")
 
+    def _generate_tile(self,
+                       dataset: xr.Dataset,
+                       dimensions_to_slices: Dict[str, slice],
+                       tile: nexusproto.NexusTile) -> nexusproto.NexusTile:
+        return self._generate_decoded_tile(dataset, dimensions_to_slices, DecodedTile(tile)).to_nexus_tile()
+
     @abstractmethod
-    def _generate_tile(self, dataset: xr.Dataset, dimensions_to_slices: Dict[str, slice], tile):
+    def _generate_decoded_tile(self,
+                               dataset: xr.Dataset,
+                               dimensions_to_slices: Dict[str, slice],
+                               tile: DecodedTile) -> DecodedTile:
         pass
 
     @classmethod
@@ -69,6 +109,60 @@ class TileReadingProcessor(TileProcessor, ABC):
 
         return tile_specifications, file_path
 
+    def _load_granule_arrays(self,
+                             ds: xr.Dataset,
+                             variable_names: List[str],
+                             max_bytes: int = None) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Reads the given variables of the whole granule into memory once, so that every tile can be cut out of them
+        as a numpy view instead of going back to the dataset for each tile. Returns None if the variables together
+        are larger than max_bytes or the limit planned by the pipeline, in which case the caller should read each tile
+        from the dataset instead. The arrays are kept until the processor is released or given another dataset.
+        """
+        max_bytes = self._granule_read_limit if max_bytes is None else min(max_bytes, self._granule_read_limit)
+
+        # Threads processing tiles of the same granule share the processor, so the granule is only read once.
+        with self._granule_arrays_lock:
+            if self._granule_arrays is not None and self._granule_arrays[0] is ds:
+                return self._granule_arrays[1]
+            self._granule_arrays = None
+
+            variable_names = set(variable_names)
+            granule_bytes = sum(ds[name].nbytes for name in variable_names)
+            if granule_bytes > max_bytes:
+                logger.debug(f'Reading tiles one at a time because {variable_names} need {granule_bytes} bytes, '
+                             f'which is more than the {max_bytes} byte limit')
+                arrays = None
+            else:
+                logger.debug(f'Reading {variable_names} ({granule_bytes} bytes) for the whole granule')
+                arrays = {name: np.asarray(type(self)._computed(ds[name]).values) for name in variable_names}
+
+            self._granule_arrays = (ds, arrays)
+            return arrays
+
+    @staticmethod
+    def _owned_array(array) -> np.ndarray:
+        # Arrays are set on the tile as they would come out of it once encoded: as plain numpy arrays that belong to
+        # the tile alone, since later processors may change them in place.
+        return np.array(np.asanyarray(array), subok=False)
+
+    @staticmethod
+    def _slice_array(array: np.ndarray, dims, dimension_to_slice: Dict[str, slice]) -> np.ndarray:
+        return array[tuple(dimension_to_slice[dim_name] for dim_name in dims)]
+
+    @staticmethod
+    def _computed(variable: xr.DataArray) -> xr.DataArray:
+        # Granules opened in chunks are read in the thread that processes the tile, since the worker pool already
+        # processes tiles in parallel. The scheduler is given to this computation only rather than set in dask's config,
+        # which is shared by the whole process.
+        if variable.chunks is not None:
+            return variable.compute(scheduler='synchronous')
+        return variable
+
+    @classmethod
+    def _read_slab(cls, variable: xr.DataArray, dimension_to_slice: Dict[str, slice]) -> xr.DataArray:
+        return cls._computed(variable[cls._slices_for_variable(variable, dimension_to_slice)])
+
     @staticmethod
     def _slices_for_variable(variable: xr.DataArray, dimension_to_slice: Dict[str, slice]) -> Dict[str, slice]:
         return {dim_name: dimension_to_slice[dim_name] for dim_name in variable.dims}
@@ -18,8 +18,8 @@ from typing import Dict
 import numpy as np
 import xarray as xr
 from nexusproto import DataTile_pb2 as nexusproto
-from nexusproto.serialization import to_shaped_array
 
+from granule_ingester.processors.DecodedTile import DecodedTile
 from granule_ingester.processors.reading_processors.TileReadingProcessor import TileReadingProcessor
 
 
@@ -31,17 +31,16 @@ class TimeSeriesReadingProcessor(TileReadingProcessor):
         self.depth = depth
         self.time = time
 
-    def _generate_tile(self, ds: xr.Dataset, dimensions_to_slices: Dict[str, slice], input_tile):
+    def _generate_decoded_tile(self, ds: xr.Dataset, dimensions_to_slices: Dict[str, slice], input_tile: DecodedTile):
         data_variable = self.variable[0] if isinstance(self.variable, list) else self.variable
         new_tile = nexusproto.TimeSeriesTile()
 
-        lat_subset = ds[self.latitude][type(self)._slices_for_variable(ds[self.latitude], dimensions_to_slices)]
-        lon_subset = ds[self.longitude][type(self)._slices_for_variable(ds[self.longitude], dimensions_to_slices)]
+        lat_subset = type(self)._read_slab(ds[self.latitude], dimensions_to_slices)
+        lon_subset = type(self)._read_slab(ds[self.longitude], dimensions_to_slices)
         lat_subset = np.ma.filled(lat_subset, np.NaN)
         lon_subset = np.ma.filled(lon_subset, np.NaN)
 
-        data_subset = ds[data_variable][type(self)._slices_for_variable(ds[data_variable],
-                                                                        dimensions_to_slices)]
+        data_subset = type(self)._read_slab(ds[data_variable], dimensions_to_slices)
         data_subset = np.ma.filled(data_subset, np.NaN)
 
         if self.depth:
@@ -54,15 +53,15 @@ class TimeSeriesReadingProcessor(TileReadingProcessor):
                                                                                                 dim_len=depth_slice_len))
             new_tile.depth = ds[self.depth][depth_slice].item()
 
-        time_subset = ds[self.time][type(self)._slices_for_variable(ds[self.time], dimensions_to_slices)]
+        time_subset = type(self)._read_slab(ds[self.time], dimensions_to_slices)
         time_subset = np.ma.filled(type(self)._convert_to_timestamp(time_subset), np.NaN)
 
-        new_tile.latitude.CopyFrom(to_shaped_array(lat_subset))
-        new_tile.longitude.CopyFrom(to_shaped_array(lon_subset))
-        new_tile.variable_data.CopyFrom(to_shaped_array(data_subset))
-        new_tile.time.CopyFrom(to_shaped_array(time_subset))
+        input_tile.set_array('latitude', type(self)._owned_array(lat_subset))
+        input_tile.set_array('longitude', type(self)._owned_array(lon_subset))
+        input_tile.set_array('variable_data', type(self)._owned_array(data_subset))
+        input_tile.set_array('time', type(self)._owned_array(time_subset))
 
-        input_tile.tile.time_series_tile.CopyFrom(new_tile)
+        input_tile.nexus_tile.tile.time_series_tile.CopyFrom(new_tile)
         return input_tile
 
     # def read_data(self, tile_specifications, file_path, output_tile):
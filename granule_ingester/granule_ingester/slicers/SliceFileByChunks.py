@@ -0,0 +1,135 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import itertools
+import logging
+import math
+from typing import Dict, Iterator, List, Optional, Union
+
+import xarray as xr
+
+from granule_ingester.slicers.SliceFileByStepSize import SliceFileByStepSize
+
+logger = logging.getLogger(__name__)
+
+
+class SliceFileByChunks(SliceFileByStepSize):
+    """
+    Slices a granule by step size like SliceFileByStepSize, but takes the on-disk chunk layout of the granule into
+    account so that each compressed chunk is decompressed as few times as possible.
+
+    Step sizes are aligned to the chunk size of each dimension: a step larger than the chunk is rounded down to a
+    multiple of the chunk, and a smaller step is rounded down to a divisor of it, so that no tile straddles a chunk
+    boundary. A step is kept as it is when the chunk size has no divisor of at least half of it (a prime chunk size,
+    for instance), rather than multiplying the number of tiles. Dimensions without a step size are taken whole, as
+    SliceFileByStepSize does. Tile specs are then emitted chunk by chunk, so the tiles cut out of the same chunk end up
+    next to each other (and usually in the same batch) and can be served from the HDF5 chunk cache.
+
+    The chunk layout is taken from the given variable(s), or from the largest chunked data variable of the granule.
+    Granules that are stored contiguously are sliced exactly like SliceFileByStepSize would.
+    """
+
+    def __init__(self,
+                 dimension_step_sizes: Dict[str, int],
+                 variable: Optional[Union[str, List[str]]] = None,
+                 align_to_chunks: bool = True,
+                 *args, **kwargs):
+        super().__init__(dimension_step_sizes, *args, **kwargs)
+        self._variables = [variable] if isinstance(variable, str) else variable
+        self._align_to_chunks = align_to_chunks
+        self._chunk_sizes: Dict[str, int] = {}
+
+    def generate_tiles(self, dataset: xr.Dataset, granule_name: str = None):
+        self._chunk_sizes = self._find_chunk_sizes(dataset)
+        return super().generate_tiles(dataset, granule_name)
+
+    def _iter_slices(self, dimension_specs: Dict[str, int]) -> Iterator[str]:
+        if not self._chunk_sizes:
+            logger.info("Granule has no chunk layout; slicing by step size only.")
+            return super()._iter_slices(dimension_specs)
+
+        self._check_dimensions(dimension_specs)
+
+        dimension_names = list(dimension_specs.keys())
+        step_sizes = []
+        block_bounds = []
+        for dim_name, dim_len in dimension_specs.items():
+            if dim_name not in self._dimension_step_sizes:
+                step_sizes.append(dim_len)
+                block_bounds.append([(0, dim_len)])
+                continue
+
+            step_size = min(self._dimension_step_sizes[dim_name], dim_len)
+            chunk_size = min(self._chunk_sizes.get(dim_name, step_size), dim_len)
+
+            if self._align_to_chunks:
+                aligned_step_size = self._align_step_size(step_size, chunk_size)
+                if aligned_step_size != step_size:
+                    logger.info(f"Aligned step size of dimension {dim_name} from {step_size} to {aligned_step_size} "
+                                f"to match its chunk size of {chunk_size}")
+                step_size = aligned_step_size
+
+            # Every block covers whole chunks and a whole number of tiles, so all the tiles cut from a chunk are in
+            # the same block.
+            block_size = math.ceil(chunk_size / step_size) * step_size
+            step_sizes.append(step_size)
+            block_bounds.append([(start, min(start + block_size, dim_len)) for start in range(0, dim_len, block_size)])
+
+        logger.info("Sliced granule into {} slices.".format(
+            math.prod(math.ceil(dim_len / step_size) for dim_len, step_size in zip(dimension_specs.values(),
+                                                                                   step_sizes))))
+
+        return self._iter_blocks(dimension_names, step_sizes, block_bounds)
+
+    @staticmethod
+    def _iter_blocks(dimension_names: List[str], step_sizes: List[int], block_bounds: List[list]) -> Iterator[str]:
+        for block in itertools.product(*block_bounds):
+            tile_bounds = [['{name}:{start}:{end}'.format(name=dim_name, start=start, end=min(start + step_size, end))
+                            for start in range(block_start, end, step_size)]
+                           for dim_name, step_size, (block_start, end) in zip(dimension_names, step_sizes, block)]
+            for chunks in itertools.product(*tile_bounds):
+                yield ','.join(chunks)
+
+    @staticmethod
+    def _align_step_size(step_size: int, chunk_size: int) -> int:
+        if step_size >= chunk_size:
+            return step_size - step_size % chunk_size
+        divisor = max(divisor for divisor in range(1, step_size + 1) if chunk_size % divisor == 0)
+        return divisor if divisor * 2 >= step_size else step_size
+
+    def _find_chunk_sizes(self, dataset: xr.Dataset) -> Dict[str, int]:
+        if self._variables:
+            variables = [dataset[name] for name in self._variables]
+        else:
+            variables = sorted(dataset.data_vars.values(), key=lambda v: v.size, reverse=True)
+
+        for variable in variables:
+            chunk_sizes = self._variable_chunk_sizes(variable)
+            if chunk_sizes:
+                logger.debug(f"Using the chunk layout of variable {variable.name}: {chunk_sizes}")
+                return chunk_sizes
+        return {}
+
+    @staticmethod
+    def _variable_chunk_sizes(variable: xr.DataArray) -> Dict[str, int]:
+        if variable.chunks is not None:
+            # Dask-backed variable: use the size of the first chunk along each dimension.
+            return {dim: chunks[0] for dim, chunks in zip(variable.dims, variable.chunks)}
+
+        # netCDF4 reports the chunk layout as 'chunksizes', h5netcdf and zarr as 'chunks'.
+        chunks = variable.encoding.get('chunksizes') or variable.encoding.get('chunks')
+        if not chunks or variable.encoding.get('contiguous', False):
+            return {}
+        return dict(zip(variable.dims, chunks))
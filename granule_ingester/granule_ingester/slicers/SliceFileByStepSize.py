@@ -15,7 +15,8 @@
 
 import itertools
 import logging
-from typing import List, Dict
+import math
+from typing import Dict, Iterator, List, Mapping
 
 from granule_ingester.slicers.TileSlicer import TileSlicer
 
@@ -29,17 +30,30 @@ class SliceFileByStepSize(TileSlicer):
         super().__init__(*args, **kwargs)
         self._dimension_step_sizes = dimension_step_sizes
 
+    def tile_shape(self, dimensions: Mapping[str, int]) -> Dict[str, int]:
+        return {dim_name: min(self._dimension_step_sizes.get(dim_name, dim_len), dim_len)
+                for dim_name, dim_len in dimensions.items()}
+
     def _generate_slices(self, dimension_specs: Dict[str, int]) -> List[str]:
+        return list(self._iter_slices(dimension_specs))
+
+    def _iter_slices(self, dimension_specs: Dict[str, int]) -> Iterator[str]:
+        self._check_dimensions(dimension_specs)
+
+        dimension_bounds = self._generate_dimension_bounds(dimension_specs)
+        logger.info("Sliced granule into {} slices.".format(math.prod(len(bounds) for bounds in dimension_bounds)))
+        return (','.join(chunks) for chunks in itertools.product(*dimension_bounds))
+
+    def _check_dimensions(self, dimension_specs: Dict[str, int]):
         # make sure all provided dimensions are in dataset
         for dim_name in self._dimension_step_sizes.keys():
             if dim_name not in list(dimension_specs.keys()):
                 raise KeyError('Provided dimension "{}" not found in dataset'.format(dim_name))
 
-        slices = self._generate_chunk_boundary_slices(dimension_specs)
-        logger.info("Sliced granule into {} slices.".format(len(slices)))
-        return slices
-
     def _generate_chunk_boundary_slices(self, dimension_specs) -> list:
+        return [','.join(chunks) for chunks in itertools.product(*self._generate_dimension_bounds(dimension_specs))]
+
+    def _generate_dimension_bounds(self, dimension_specs) -> List[List[str]]:
         dimension_bounds = []
         dim_step_keys = self._dimension_step_sizes.keys()
 
@@ -52,4 +66,4 @@ class SliceFileByStepSize(TileSlicer):
                                                             start=i,
                                                             end=min((i + step_size), dim_len)))
             dimension_bounds.append(bounds)
-        return [','.join(chunks) for chunks in itertools.product(*dimension_bounds)]
+        return dimension_bounds
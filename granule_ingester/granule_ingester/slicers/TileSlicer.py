@@ -14,7 +14,7 @@
 # limitations under the License.
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Mapping
 
 import xarray as xr
 from nexusproto.DataTile_pb2 import NexusTile
@@ -26,18 +26,13 @@ class TileSlicer(ABC):
         super().__init__(*args, **kwargs)
 
         self._granule_name = None
-        self._current_tile_spec_index = 0
-        self._tile_spec_list: List[str] = []
+        self._tile_specs: Iterator[str] = iter(())
 
     def __iter__(self):
         return self
 
     def __next__(self) -> NexusTile:
-        if self._current_tile_spec_index == len(self._tile_spec_list):
-            raise StopIteration
-
-        current_tile_spec = self._tile_spec_list[self._current_tile_spec_index]
-        self._current_tile_spec_index += 1
+        current_tile_spec = next(self._tile_specs)
 
         tile = NexusTile()
         tile.summary.section_spec = current_tile_spec
@@ -47,10 +42,22 @@ class TileSlicer(ABC):
     def generate_tiles(self, dataset: xr.Dataset, granule_name: str = None):
         self._granule_name = granule_name
         dimensions = dataset.dims
-        self._tile_spec_list = self._generate_slices(dimensions)
+        self._tile_specs = iter(self._iter_slices(dimensions))
 
         return self
 
+    def tile_shape(self, dimensions: Mapping[str, int]) -> Dict[str, int]:
+        """
+        Returns the largest extent along each dimension of the tiles this slicer cuts from a granule with the given
+        dimensions. Slicers that cannot tell in advance report the whole granule.
+        """
+        return dict(dimensions)
+
     @abstractmethod
-    def _generate_slices(self, dimensions):
+    def _generate_slices(self, dimensions) -> List[str]:
         pass
+
+    def _iter_slices(self, dimensions) -> Iterable[str]:
+        # Slicers that can produce their tile specs lazily should override this, so that tiles can be handed out
+        # without first building the full list of specs for the granule.
+        return self._generate_slices(dimensions)
@@ -13,5 +13,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from granule_ingester.slicers.SliceFileByChunks import SliceFileByChunks
 from granule_ingester.slicers.SliceFileByStepSize import SliceFileByStepSize
 from granule_ingester.slicers.TileSlicer import TileSlicer
@@ -27,7 +27,6 @@ from cassandra.cluster import Cluster, Session, NoHostAvailable
 from cassandra.cqlengine import columns
 from cassandra.cqlengine.models import Model
 from cassandra.policies import RetryPolicy, ConstantReconnectionPolicy
-from cassandra.query import BatchStatement, ConsistencyLevel
 from nexusproto.DataTile_pb2 import NexusTile, TileData
 
 from granule_ingester.exceptions import CassandraFailedHealthCheckError, CassandraLostConnectionError
@@ -38,8 +37,8 @@ from typing import List
 logging.getLogger('cassandra').setLevel(logging.INFO)
 logger = logging.getLogger(__name__)
 
-MAX_BATCH_SIZE = 1024
-
+# Default number of inserts save_batch keeps in flight at once.
+MAX_CONCURRENT_REQUESTS = 128
 
 
 class TileModel(Model):
@@ -50,13 +49,20 @@ class TileModel(Model):
 
 
 class CassandraStore(DataStore):
-    def __init__(self, contact_points=None, port=9042, keyspace='nexustiles', username=None, password=None):
+    def __init__(self,
+                 contact_points=None,
+                 port=9042,
+                 keyspace='nexustiles',
+                 username=None,
+                 password=None,
+                 max_concurrent_requests=MAX_CONCURRENT_REQUESTS):
         self._contact_points = contact_points
         self._username = username
         self._password = password
         self._port = port
         self._keyspace = keyspace
         self._session = None
+        self._max_concurrent_requests = max(1, int(max_concurrent_requests))
 
     async def health_check(self) -> bool:
         try:
@@ -115,37 +121,55 @@ class CassandraStore(DataStore):
         logger.info(f'Writing {len(tiles)} tiles to Cassandra')
         thetime = datetime.now()
 
-        batches = [tiles[i:i + MAX_BATCH_SIZE] for i in range(0, len(tiles), MAX_BATCH_SIZE)]
         prepared_query = self._session.prepare("INSERT INTO sea_surface_temp (tile_id, tile_blob) VALUES (?, ?)")
 
+        # Keep at most max_concurrent_requests inserts in flight, so that a large batch neither floods the driver's
+        # request queue nor holds every serialized tile in memory at once.
+        in_flight = asyncio.Semaphore(self._max_concurrent_requests)
+        futures = []
         n_tiles = len(tiles)
-        writing = 0
-
-        for batch in batches:
-            futures = []
-
-            writing += len(batch)
-
-            logger.info(f'Writing batch of {len(batch)} tiles to Cassandra | ({writing}/{n_tiles}) [{writing/n_tiles*100:7.3f}%]')
-
-            for tile in batch:
+        try:
+            for writing, tile in enumerate(tiles, start=1):
+                await in_flight.acquire()
+                if writing % self._max_concurrent_requests == 0 or writing == n_tiles:
+                    batch_size = (writing - 1) % self._max_concurrent_requests + 1
+                    logger.debug(f'Writing batch of {batch_size} tiles to Cassandra | ({writing}/{n_tiles}) '
+                                 f'[{writing / n_tiles * 100:7.3f}%]')
                 tile_id = uuid.UUID(tile.summary.tile_id)
                 serialized_tile_data = TileData.SerializeToString(tile.tile)
 
-                cassandra_future = self._session.execute_async(prepared_query, [tile_id, bytearray(serialized_tile_data)])
-                asyncio_future = asyncio.Future()
-                cassandra_future.add_callbacks(asyncio_future.set_result, asyncio_future.set_exception)
-
+                cassandra_future = self._session.execute_async(prepared_query,
+                                                               [tile_id, bytearray(serialized_tile_data)])
+                asyncio_future = self._wrap_future(cassandra_future)
+                asyncio_future.add_done_callback(lambda _: in_flight.release())
                 futures.append(asyncio_future)
 
+            await asyncio.gather(*futures)
+        except Exception:
             for f in futures:
-                await f
+                f.cancel()
+            raise
 
         logger.info(f'Wrote {len(tiles)} tiles to Cassandra in {str(datetime.now() - thetime)} seconds')
 
     @staticmethod
-    async def _execute_query_async(session: Session, query, parameters=None):
-        cassandra_future = session.execute_async(query, parameters)
-        asyncio_future = asyncio.Future()
-        cassandra_future.add_callbacks(asyncio_future.set_result, asyncio_future.set_exception)
-        return await asyncio_future
+    def _wrap_future(cassandra_future) -> asyncio.Future:
+        # The driver runs callbacks on its own event thread, so results have to be handed back to the event loop.
+        loop = asyncio.get_event_loop()
+        asyncio_future = loop.create_future()
+
+        def set_result(result):
+            if not asyncio_future.done():
+                asyncio_future.set_result(result)
+
+        def set_exception(exception):
+            if not asyncio_future.done():
+                asyncio_future.set_exception(exception)
+
+        cassandra_future.add_callbacks(lambda result: loop.call_soon_threadsafe(set_result, result),
+                                       lambda exception: loop.call_soon_threadsafe(set_exception, exception))
+        return asyncio_future
+
+    @classmethod
+    async def _execute_query_async(cls, session: Session, query, parameters=None):
+        return await cls._wrap_future(session.execute_async(query, parameters))
@@ -19,8 +19,9 @@ import functools
 
 from common.async_utils.AsyncUtils import run_in_executor
 from granule_ingester.writers.MetadataStore import MetadataStore
-from elasticsearch import Elasticsearch
+from elasticsearch import ApiError, Elasticsearch, TransportError
 from granule_ingester.exceptions import (ElasticsearchFailedHealthCheckError, ElasticsearchLostConnectionError)
+from granule_ingester.processors.GenerateContentHash import CONTENT_HASH_ATTRIBUTE
 from nexusproto.DataTile_pb2 import NexusTile, TileSummary
 from datetime import datetime
 from pathlib import Path
@@ -75,6 +76,21 @@ class ElasticsearchStore(MetadataStore):
             await self.save_metadata(tile)
         #TODO: Implement write batching for ES
 
+    @run_in_executor
+    def get_content_hashes(self, tile_ids: List[str]) -> Dict[str, str]:
+        # Documents are indexed under generated ids, so tiles are looked up by their id field, which is a keyword
+        # field or a text field with a keyword sub-field depending on the index mapping.
+        query = {'bool': {'should': [{'terms': {'id': tile_ids}}, {'terms': {'id.keyword': tile_ids}}]}}
+        try:
+            response = self.elastic.search(index=self.index,
+                                           body={'query': query, '_source': ['id', CONTENT_HASH_ATTRIBUTE]},
+                                           size=len(tile_ids))
+        except (ApiError, TransportError) as e:
+            logger.warning(f"Failed to look up metadata documents in Elasticsearch. cause: {e}")
+            raise ElasticsearchLostConnectionError
+        return {hit['_source']['id']: hit['_source'][CONTENT_HASH_ATTRIBUTE] for hit in response['hits']['hits']
+                if CONTENT_HASH_ATTRIBUTE in hit['_source']}
+
     @run_in_executor
     def save_document(self, doc: dict):
         try:
@@ -128,8 +144,8 @@ class ElasticsearchStore(MetadataStore):
             input_document['ecco_tile'] = ecco_tile_id
 
         for attribute in summary.global_attributes:
-            input_document[attribute.getName()] = attribute.getValues(
-                0) if attribute.getValuesCount() == 1 else attribute.getValuesList()
+            input_document[attribute.name] = attribute.values[0] if len(attribute.values) == 1 \
+                else list(attribute.values)
 
         return input_document
     
@@ -0,0 +1,67 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+from typing import List
+
+from common.async_utils.AsyncUtils import run_in_executor
+from nexusproto.DataTile_pb2 import NexusTile
+
+from granule_ingester.writers.DataStore import DataStore
+from granule_ingester.writers.TileSegmentWriter import TileSegmentWriter
+
+logger = logging.getLogger(__name__)
+
+
+class LocalFileDataStore(DataStore):
+    """
+    Writes tile data to append-only segment files under <directory>/data instead of Cassandra, at disk speed. Each
+    record is a NexusTile holding only the tile id and the tile data, which is what CassandraStore saves. The
+    segments can be loaded into Cassandra later with bulk_loader.
+    """
+
+    SUBDIRECTORY = 'data'
+
+    def __init__(self, directory: str, max_segment_bytes: int = 256 * 2 ** 20):
+        self._directory = os.path.join(directory, self.SUBDIRECTORY)
+        self._max_segment_bytes = max_segment_bytes
+        self._writer: TileSegmentWriter = None
+
+    async def health_check(self) -> bool:
+        os.makedirs(self._directory, exist_ok=True)
+        return os.access(self._directory, os.W_OK)
+
+    def connect(self):
+        self._writer = TileSegmentWriter(self._directory, self._max_segment_bytes)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def save_data(self, tile: NexusTile) -> None:
+        await self.save_batch([tile])
+
+    @run_in_executor
+    def save_batch(self, tiles: List[NexusTile]) -> None:
+        records = []
+        for tile in tiles:
+            data_tile = NexusTile()
+            data_tile.summary.tile_id = tile.summary.tile_id
+            data_tile.tile.CopyFrom(tile.tile)
+            records.append(data_tile.SerializeToString())
+        self._writer.append(records)
+        logger.debug(f'Wrote {len(tiles)} tiles to {self._directory}')
@@ -0,0 +1,76 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+from asyncio import AbstractEventLoop
+from typing import List
+
+from common.async_utils.AsyncUtils import run_in_executor
+from google.protobuf.descriptor import FieldDescriptor
+from nexusproto.DataTile_pb2 import NexusTile
+
+from granule_ingester.writers.MetadataStore import MetadataStore
+from granule_ingester.writers.TileSegmentWriter import TileSegmentWriter
+
+logger = logging.getLogger(__name__)
+
+
+class LocalFileMetadataStore(MetadataStore):
+    """
+    Writes tile metadata to append-only segment files under <directory>/metadata instead of Solr or Elasticsearch.
+    Each record is the NexusTile with its summary and the scalar fields of its tile (depth, ECCO tile number, ...),
+    but without the data arrays, so that bulk_loader can build the same documents SolrStore and ElasticsearchStore
+    would.
+    """
+
+    SUBDIRECTORY = 'metadata'
+
+    def __init__(self, directory: str, max_segment_bytes: int = 64 * 2 ** 20):
+        self._directory = os.path.join(directory, self.SUBDIRECTORY)
+        self._max_segment_bytes = max_segment_bytes
+        self._writer: TileSegmentWriter = None
+
+    async def health_check(self) -> bool:
+        os.makedirs(self._directory, exist_ok=True)
+        return os.access(self._directory, os.W_OK)
+
+    def connect(self, loop: AbstractEventLoop = None) -> None:
+        self._writer = TileSegmentWriter(self._directory, self._max_segment_bytes)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def save_metadata(self, nexus_tile: NexusTile) -> None:
+        await self.save_batch([nexus_tile])
+
+    @run_in_executor
+    def save_batch(self, tiles: List[NexusTile]) -> None:
+        self._writer.append([self._strip_tile_data(tile).SerializeToString() for tile in tiles])
+        logger.debug(f'Wrote metadata of {len(tiles)} tiles to {self._directory}')
+
+    @staticmethod
+    def _strip_tile_data(tile: NexusTile) -> NexusTile:
+        stripped = NexusTile()
+        stripped.CopyFrom(tile)
+        tile_type = stripped.tile.WhichOneof('tile_type')
+        if tile_type is not None:
+            tile_data = getattr(stripped.tile, tile_type)
+            for field, _ in tile_data.ListFields():
+                if field.type == FieldDescriptor.TYPE_MESSAGE:
+                    tile_data.ClearField(field.name)
+        return stripped
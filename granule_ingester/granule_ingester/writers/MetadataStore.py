@@ -21,7 +21,7 @@ from granule_ingester.healthcheck import HealthCheck
 from asyncio import AbstractEventLoop
 
 
-from typing import List
+from typing import Dict, List
 
 
 class MetadataStore(HealthCheck, ABC):
@@ -33,6 +33,13 @@ class MetadataStore(HealthCheck, ABC):
     def save_batch(self, tiles: List[nexusproto.NexusTile]) -> None:
         pass
 
+    async def get_content_hashes(self, tile_ids: List[str]) -> Dict[str, str]:
+        """
+        Returns the content hash (see GenerateContentHash) stored with each of the given tiles, for the tiles that are
+        in the store and have one. Stores that cannot look tiles up return no hashes, so every tile gets written.
+        """
+        return {}
+
     @abstractmethod
     def connect(self, loop: AbstractEventLoop = None) -> None:
         pass
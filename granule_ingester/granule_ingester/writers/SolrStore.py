@@ -31,6 +31,7 @@ from tenacity import retry, stop_after_attempt, wait_exponential
 from common.async_utils.AsyncUtils import run_in_executor
 from granule_ingester.exceptions import (SolrFailedHealthCheckError,
                                          SolrLostConnectionError)
+from granule_ingester.processors.GenerateContentHash import CONTENT_HASH_ATTRIBUTE
 from granule_ingester.writers.MetadataStore import MetadataStore
 from nexusproto.DataTile_pb2 import NexusTile, TileSummary
 
@@ -102,10 +103,12 @@ class SolrStore(MetadataStore):
     def close(self):
         if self._solr is not None:
             self._solr.get_session().close()
+            self._solr = None
 
         if self._zk is not None:
             self._zk.zk.stop()
             self._zk.zk.close()
+            self._zk = None
 
     async def health_check(self):
         try:
@@ -144,6 +147,25 @@ class SolrStore(MetadataStore):
             await self._save_document(batch)
         logger.info(f'Wrote {len(solr_docs)} metadata items to Solr in {str(datetime.now() - thetime)} seconds')
 
+    async def get_content_hashes(self, tile_ids: List[str]) -> Dict[str, str]:
+        content_hashes = {}
+        for i in range(0, len(tile_ids), MAX_BATCH_SIZE):
+            content_hashes.update(await self._query_content_hashes(tile_ids[i:i + MAX_BATCH_SIZE]))
+        return content_hashes
+
+    @run_in_executor
+    @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=1, max=12))
+    def _query_content_hashes(self, tile_ids: List[str]) -> Dict[str, str]:
+        try:
+            results = self._solr.search('*:*',
+                                        fq='{!terms f=id}' + ','.join(tile_ids),
+                                        fl=f'id,{CONTENT_HASH_ATTRIBUTE}',
+                                        rows=len(tile_ids))
+        except pysolr.SolrError as e:
+            logger.exception(f'May have lost connection to Solr, and cannot look up tiles. cause: {e}')
+            raise SolrLostConnectionError(f'Lost connection to Solr, and cannot look up tiles. cause: {e}')
+        return {doc['id']: doc[CONTENT_HASH_ATTRIBUTE] for doc in results if CONTENT_HASH_ATTRIBUTE in doc}
+
     @run_in_executor
     @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=1, max=12))
     def _save_document(self, doc: Union[dict, list]):
@@ -213,8 +235,8 @@ class SolrStore(MetadataStore):
             input_document['ecco_tile'] = ecco_tile_id
 
         for attribute in summary.global_attributes:
-            input_document[attribute.getName()] = attribute.getValues(
-                0) if attribute.getValuesCount() == 1 else attribute.getValuesList()
+            input_document[attribute.name] = attribute.values[0] if len(attribute.values) == 1 \
+                else list(attribute.values)
 
         return input_document
 
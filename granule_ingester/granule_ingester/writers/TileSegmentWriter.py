@@ -0,0 +1,107 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+import struct
+import time
+import uuid
+from typing import BinaryIO, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+# Segment files are renamed to this extension once they are complete, and only complete segments are loaded.
+SEGMENT_EXTENSION = '.seg'
+PARTIAL_EXTENSION = '.partial'
+LOADED_EXTENSION = '.loaded'
+
+_RECORD_HEADER = struct.Struct('>I')
+
+
+class TileSegmentWriter:
+    """
+    Appends serialized tiles to segment files in a directory, each record prefixed with its length.
+
+    A segment is written under a temporary name and renamed once it reaches max_segment_bytes or the writer is
+    closed, so a reader never sees a segment that is still being written, or that was left behind by a crash.
+    Segment names are unique across writers, so any number of ingesters can share a directory.
+    """
+
+    def __init__(self, directory: str, max_segment_bytes: int = 256 * 2 ** 20):
+        self._directory = directory
+        self._max_segment_bytes = int(max_segment_bytes)
+        self._file: BinaryIO = None
+        self._path: str = None
+        self._segment_bytes = 0
+        self._writer_id = uuid.uuid4().hex
+        self._segment_count = 0
+
+    def append(self, records: List[bytes]):
+        for record in records:
+            if self._file is None:
+                self._open_segment()
+            self._file.write(_RECORD_HEADER.pack(len(record)))
+            self._file.write(record)
+            self._segment_bytes += _RECORD_HEADER.size + len(record)
+            if self._segment_bytes >= self._max_segment_bytes:
+                self._close_segment()
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        self._close_segment()
+
+    def _open_segment(self):
+        os.makedirs(self._directory, exist_ok=True)
+        name = f'{time.strftime("%Y%m%dT%H%M%S")}-{self._writer_id}-{self._segment_count:06d}'
+        self._segment_count += 1
+        self._path = os.path.join(self._directory, name)
+        self._file = open(self._path + PARTIAL_EXTENSION, 'wb')
+        self._segment_bytes = 0
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        self._file.close()
+        os.replace(self._path + PARTIAL_EXTENSION, self._path + SEGMENT_EXTENSION)
+        logger.debug(f'Wrote segment {self._path + SEGMENT_EXTENSION} of {self._segment_bytes} bytes')
+        self._file = None
+
+    @staticmethod
+    def segments(directory: str) -> List[str]:
+        """Returns the complete segments in directory that have not been loaded yet, oldest first."""
+        if not os.path.isdir(directory):
+            return []
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                      if name.endswith(SEGMENT_EXTENSION))
+
+    @staticmethod
+    def read(path: str) -> Iterator[bytes]:
+        with open(path, 'rb') as f:
+            while True:
+                header = f.read(_RECORD_HEADER.size)
+                if not header:
+                    return
+                if len(header) < _RECORD_HEADER.size:
+                    raise IOError(f'Segment {path} is truncated')
+                length, = _RECORD_HEADER.unpack(header)
+                record = f.read(length)
+                if len(record) < length:
+                    raise IOError(f'Segment {path} is truncated')
+                yield record
+
+    @staticmethod
+    def mark_loaded(path: str):
+        os.replace(path, path[:-len(SEGMENT_EXTENSION)] + LOADED_EXTENSION)
@@ -17,3 +17,5 @@ from granule_ingester.writers.DataStore import DataStore
 from granule_ingester.writers.MetadataStore import MetadataStore
 from granule_ingester.writers.SolrStore import SolrStore
 from granule_ingester.writers.CassandraStore import CassandraStore
+from granule_ingester.writers.LocalFileDataStore import LocalFileDataStore
+from granule_ingester.writers.LocalFileMetadataStore import LocalFileMetadataStore
@@ -0,0 +1,51 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from common.async_test_utils.AsyncTestUtils import async_test
+
+from granule_ingester.benchmarks.run_benchmarks import compare_to_baseline, format_report, run_benchmarks
+
+
+class TestRunBenchmarks(unittest.TestCase):
+
+    @async_test
+    async def test_run_benchmarks(self):
+        results = await run_benchmarks(['swath', 'ecco'], scale=0.01, backend='inline', max_concurrency=1)
+
+        self.assertEqual(['swath', 'ecco'], [result['granule_type'] for result in results])
+        for result in results:
+            self.assertGreater(result['tiles'], 0)
+            self.assertGreater(result['tiles_per_second'], 0)
+            self.assertGreater(result['peak_rss_mb'], 0)
+        self.assertIn('EccoReadingProcessor', results[1]['processor_seconds'])
+        self.assertIn('ecco', format_report(results, results))
+
+    def test_compare_to_baseline(self):
+        baseline = [{'granule_type': 'grid', 'backend': 'process', 'tiles_per_second': 100.0},
+                    {'granule_type': 'swath', 'backend': 'process', 'tiles_per_second': 100.0}]
+        results = [{'granule_type': 'grid', 'backend': 'process', 'tiles_per_second': 95.0},
+                   {'granule_type': 'swath', 'backend': 'process', 'tiles_per_second': 50.0},
+                   {'granule_type': 'swath', 'backend': 'thread', 'tiles_per_second': 10.0}]
+
+        regressions = compare_to_baseline(results, baseline, tolerance=0.1)
+
+        self.assertEqual(1, len(regressions))
+        self.assertTrue(regressions[0].startswith('swath (process)'))
+
+
+if __name__ == '__main__':
+    unittest.main()
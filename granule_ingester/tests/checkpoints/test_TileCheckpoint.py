@@ -0,0 +1,124 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import xarray as xr
+import yaml
+from common.async_test_utils.AsyncTestUtils import async_test
+
+from granule_ingester.benchmarks.InMemoryMetadataStore import InMemoryMetadataStore
+from granule_ingester.checkpoints import LocalCheckpointStore, TileCheckpoint
+from granule_ingester.pipeline import MemoryGovernor, Pipeline
+
+
+class FailingDataStore(InMemoryMetadataStore):
+    def __init__(self, fail_on_batch: int = None):
+        super().__init__()
+        self.batch_count = 0
+        self._fail_on_batch = fail_on_batch
+
+    async def save_batch(self, tiles):
+        self.batch_count += 1
+        if self.batch_count == self._fail_on_batch:
+            raise RuntimeError('store went away')
+        await super().save_batch(tiles)
+
+
+class TestTileCheckpoint(unittest.TestCase):
+
+    def test_pending_tiles_skip_completed_ranges(self):
+        checkpoint = TileCheckpoint([(0, 2), (4, 5)])
+
+        self.assertEqual(['c', 'd', 'f'], list(checkpoint.pending('abcdef')))
+        self.assertEqual(3, checkpoint.completed_count)
+
+    def test_claimed_ranges_are_merged_on_completion(self):
+        checkpoint = TileCheckpoint([(1, 2)])
+        pending = checkpoint.pending(range(6))
+
+        self.assertEqual([0, 2], [next(pending), next(pending)])
+        first = checkpoint.claim(2)
+        self.assertEqual([(0, 1), (2, 3)], first)
+        self.assertEqual([3, 4, 5], list(pending))
+        second = checkpoint.claim(3)
+
+        checkpoint.complete(second)
+        self.assertEqual([(1, 2), (3, 6)], checkpoint.ranges)
+        checkpoint.complete(first)
+        self.assertEqual([(0, 6)], checkpoint.ranges)
+
+
+class TestCheckpointedPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.checkpoint_store = LocalCheckpointStore(os.path.join(self._temp_dir.name, 'checkpoints'))
+        granule_path = os.path.join(self._temp_dir.name, 'granule.nc')
+        xr.Dataset({'sst': (('lat', 'lon'), np.ones((4, 6), dtype=np.float32))},
+                   coords={'lat': np.arange(4, dtype=np.float32),
+                           'lon': np.arange(6, dtype=np.float32)}).to_netcdf(granule_path)
+        self.config = f"""
+granule:
+  resource: {granule_path}
+slicer:
+  name: sliceFileByStepSize
+  dimension_step_sizes:
+    lat: 1
+    lon: 6
+processors:
+  - name: Grid
+    variable: '["sst"]'
+    latitude: lat
+    longitude: lon
+  - name: tileSummary
+    dataset_name: test
+  - name: generateTileId
+execution_backend: inline
+"""
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _pipeline(self, data_store, metadata_store):
+        return Pipeline.from_string(self.config,
+                                    data_store_factory=lambda: data_store,
+                                    metadata_store_factory=lambda: metadata_store,
+                                    max_concurrency=1,
+                                    memory_governor=MemoryGovernor(max_batch_size=1),
+                                    checkpoint_store=self.checkpoint_store)
+
+    @async_test
+    async def test_interrupted_granule_resumes(self):
+        interrupted_store = FailingDataStore(fail_on_batch=3)
+        with self.assertRaises(RuntimeError):
+            await self._pipeline(interrupted_store, InMemoryMetadataStore()).run()
+        self.assertEqual(2, interrupted_store.tile_count)
+
+        checkpoint_key = Pipeline._hash_config(yaml.safe_load(self.config))
+        self.assertEqual([(0, 2)], await self.checkpoint_store.load(checkpoint_key))
+
+        resumed_store = FailingDataStore()
+        await self._pipeline(resumed_store, InMemoryMetadataStore()).run()
+
+        self.assertEqual(2, resumed_store.tile_count)
+        self.assertEqual([], await self.checkpoint_store.load(checkpoint_key))
+
+
+if __name__ == '__main__':
+    unittest.main()
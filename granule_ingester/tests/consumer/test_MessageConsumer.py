@@ -0,0 +1,172 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import unittest
+from unittest import mock
+
+from common.async_test_utils.AsyncTestUtils import AsyncMock, async_test
+from granule_ingester.consumer import MessageConsumer
+from granule_ingester.exceptions import CassandraLostConnectionError
+
+
+class MockQueueIterator:
+    def __init__(self, messages):
+        self._messages = iter(messages)
+        self.close = AsyncMock()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._messages)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class TestMessageConsumer(unittest.TestCase):
+
+    def setUp(self):
+        self.queue_iter = MockQueueIterator([f'message-{i}' for i in range(5)])
+        queue = mock.MagicMock()
+        queue.iterator.return_value = self.queue_iter
+        self.channel = mock.MagicMock()
+        self.channel.set_qos = AsyncMock()
+        self.channel.close = AsyncMock()
+        self.channel.declare_queue = AsyncMock(return_value=queue)
+
+        self.consumer = MessageConsumer('localhost', 'guest', 'guest', 'nexus', mock.MagicMock(), mock.MagicMock())
+        self.consumer._connection = mock.MagicMock()
+        self.consumer._connection.channel = AsyncMock(return_value=self.channel)
+
+    @async_test
+    async def test_granules_are_processed_concurrently(self):
+        running = 0
+        max_running = 0
+        processed = []
+
+        async def received_message(message, *args):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            processed.append(message)
+
+        with mock.patch.object(MessageConsumer, '_received_message', side_effect=received_message):
+            await self.consumer.start_consuming(execution_backend='inline', max_concurrent_granules=2)
+
+        self.channel.set_qos.assert_called_once_with(prefetch_count=2)
+        self.assertEqual(2, max_running)
+        self.assertCountEqual([f'message-{i}' for i in range(5)], processed)
+
+    @async_test
+    async def test_granules_are_prefetched(self):
+        messages = [mock.MagicMock(body=f'granule:\n  resource: s3://bucket/granule-{i}.nc\n'.encode('utf-8'))
+                    for i in range(3)]
+        messages.append(mock.MagicMock(body=b'granule:\n  resource: /data/granule-3.nc\n'))
+        self.queue_iter = MockQueueIterator(messages)
+        self.channel.declare_queue.return_value.iterator.return_value = self.queue_iter
+        downloader = mock.MagicMock()
+        downloader.download = AsyncMock(side_effect=lambda url: mock.MagicMock(name=url))
+        downloaded = []
+
+        async def received_message(message, *args):
+            prefetcher = args[-1]
+            url = message.body.decode('utf-8').split()[-1]
+            if url.startswith('s3://'):
+                # Every granule on S3 was already being downloaded before its message was processed.
+                self.assertIn(url, prefetcher._prefetched)
+                downloaded.append(await prefetcher.download(url))
+            await asyncio.sleep(0.01)
+
+        with mock.patch.object(MessageConsumer, '_received_message', side_effect=received_message):
+            await self.consumer.start_consuming(execution_backend='inline',
+                                                max_concurrent_granules=1,
+                                                s3_downloader=downloader,
+                                                prefetch_granules=1)
+
+        self.channel.set_qos.assert_called_once_with(prefetch_count=2)
+        self.assertEqual(3, len(downloaded))
+        self.assertEqual(3, downloader.download.call_count)
+
+    @async_test
+    async def test_granules_read_in_place_are_not_prefetched(self):
+        messages = [mock.MagicMock(body=body.encode('utf-8')) for body in (
+            'granule:\n  resource: s3://bucket/store.zarr\n',
+            'granule:\n  resource: s3://bucket/store\n  format: zarr\n',
+            'granule:\n  resource: s3://bucket/granule.nc\n  access: ranged\n',
+        )]
+        self.queue_iter = MockQueueIterator(messages)
+        self.channel.declare_queue.return_value.iterator.return_value = self.queue_iter
+        downloader = mock.MagicMock()
+        downloader.download = AsyncMock(side_effect=lambda url: mock.MagicMock(name=url))
+        prefetched = []
+
+        async def received_message(message, *args):
+            prefetched.extend(args[-1]._prefetched)
+
+        with mock.patch.object(MessageConsumer, '_received_message', side_effect=received_message):
+            await self.consumer.start_consuming(execution_backend='inline',
+                                                max_concurrent_granules=1,
+                                                s3_downloader=downloader,
+                                                prefetch_granules=2)
+
+        self.assertEqual([], prefetched)
+        downloader.download.assert_not_called()
+
+    @async_test
+    async def test_every_waiting_granule_is_prefetched(self):
+        messages = [mock.MagicMock(body=f'granule:\n  resource: s3://bucket/granule-{i}.nc\n'.encode('utf-8'))
+                    for i in range(3)]
+        self.queue_iter = MockQueueIterator(messages)
+        self.channel.declare_queue.return_value.iterator.return_value = self.queue_iter
+        downloader = mock.MagicMock()
+        downloader.download = AsyncMock(side_effect=lambda url: mock.MagicMock(name=url))
+        prefetched_before_first_granule = []
+
+        async def received_message(message, *args):
+            prefetcher = args[-1]
+            if not prefetched_before_first_granule:
+                # Give the consumer a chance to take the waiting messages.
+                await asyncio.sleep(0.01)
+                prefetched_before_first_granule.extend(sorted(prefetcher._prefetched))
+
+        with mock.patch.object(MessageConsumer, '_received_message', side_effect=received_message):
+            await self.consumer.start_consuming(execution_backend='inline',
+                                                max_concurrent_granules=1,
+                                                s3_downloader=downloader,
+                                                prefetch_granules=2)
+
+        self.channel.set_qos.assert_called_once_with(prefetch_count=3)
+        self.assertEqual([f's3://bucket/granule-{i}.nc' for i in range(3)], prefetched_before_first_granule)
+
+    @async_test
+    async def test_failed_granule_stops_consuming(self):
+        async def received_message(message, *args):
+            if message == 'message-0':
+                raise CassandraLostConnectionError('lost connection')
+            await asyncio.sleep(10)
+
+        with mock.patch.object(MessageConsumer, '_received_message', side_effect=received_message):
+            with self.assertRaises(CassandraLostConnectionError):
+                await self.consumer.start_consuming(execution_backend='inline', max_concurrent_granules=2)
+
+        self.queue_iter.close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import os
+import tempfile
+import unittest
+
+from common.async_test_utils.AsyncTestUtils import async_test
+
+from granule_ingester.granule_loaders import GranuleCache
+from tests.granule_loaders.test_S3Downloader import FakeS3Client, FakeSession
+
+
+class TestGranuleCache(unittest.TestCase):
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self._temp_dir.name
+        self.client = FakeS3Client({('bucket', name): name.encode('utf-8') * 10 for name in ('a', 'b', 'c')})
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _cache(self, max_bytes: int = 25) -> GranuleCache:
+        return GranuleCache(self.directory, max_bytes, part_size=4, session=FakeSession(self.client))
+
+    @async_test
+    async def test_second_access_is_a_hit(self):
+        cache = self._cache()
+
+        for _ in range(2):
+            granule = await cache.download('s3://bucket/a')
+            with open(granule.name, 'rb') as file:
+                self.assertEqual(b'a' * 10, file.read())
+            granule.close()
+
+        self.assertEqual({'miss': 1, 'hit': 1}, dict(cache.counts))
+        self.assertEqual(3, len(self.client.ranges))
+
+    @async_test
+    async def test_changed_object_is_downloaded_again(self):
+        cache = self._cache()
+        (await cache.download('s3://bucket/a')).close()
+        self.client.objects[('bucket', 'a')] = b'A' * 10
+
+        granule = await cache.download('s3://bucket/a')
+        with open(granule.name, 'rb') as file:
+            self.assertEqual(b'A' * 10, file.read())
+        granule.close()
+
+        self.assertEqual({'miss': 2}, dict(cache.counts))
+
+    @async_test
+    async def test_least_recently_used_granule_is_evicted(self):
+        cache = self._cache()
+        for name in ('a', 'b', 'a', 'c'):
+            (await cache.download(f's3://bucket/{name}')).close()
+
+        self.assertEqual(1, cache.counts['eviction'])
+        self.assertEqual(20, cache.size)
+        self.assertEqual(1, cache.counts['hit'])
+        (await cache.download('s3://bucket/a')).close()
+        self.assertEqual(2, cache.counts['hit'])
+
+    @async_test
+    async def test_open_granules_are_not_evicted(self):
+        cache = self._cache(max_bytes=10)
+        granule = await cache.download('s3://bucket/a')
+        (await cache.download('s3://bucket/b')).close()
+
+        self.assertTrue(os.path.exists(granule.name))
+        granule.close()
+        (await cache.download('s3://bucket/c')).close()
+        self.assertFalse(os.path.exists(granule.name))
+
+    @async_test
+    async def test_downloaded_granule_is_not_evicted_before_it_is_opened(self):
+        cache = self._cache(max_bytes=10)
+        finish_downloads = asyncio.Event()
+
+        async def download_to(bucket, key, file, size):
+            await finish_downloads.wait()
+            file.write(self.client.objects[(bucket, key)])
+
+        cache.download_to = download_to
+        downloads = [asyncio.ensure_future(cache.download(f's3://bucket/{name}')) for name in ('a', 'b')]
+        await asyncio.sleep(0.01)
+        # Both downloads finish before either caller resumes.
+        finish_downloads.set()
+        granules = await asyncio.gather(*downloads)
+
+        for name, granule in zip(('a', 'b'), granules):
+            with open(granule.name, 'rb') as file:
+                self.assertEqual(name.encode('utf-8') * 10, file.read())
+            granule.close()
+        self.assertEqual({}, cache._pins)
+
+    @async_test
+    async def test_cancelled_caller_does_not_keep_granule_pinned(self):
+        cache = self._cache()
+        finish_download = asyncio.Event()
+
+        async def download_to(bucket, key, file, size):
+            await finish_download.wait()
+            file.write(self.client.objects[(bucket, key)])
+
+        cache.download_to = download_to
+        cancelled = asyncio.ensure_future(cache.download('s3://bucket/a'))
+        waiting = asyncio.ensure_future(cache.download('s3://bucket/a'))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        finish_download.set()
+        granule = await waiting
+
+        self.assertEqual({granule._cache_key: 1}, cache._pins)
+        granule.close()
+        self.assertEqual({}, cache._pins)
+
+    @async_test
+    async def test_cache_is_reloaded_from_directory(self):
+        (await self._cache().download('s3://bucket/a')).close()
+        open(os.path.join(self.directory, 'interrupted.partial'), 'wb').close()
+
+        cache = self._cache()
+        (await cache.download('s3://bucket/a')).close()
+
+        self.assertEqual({'hit': 1}, dict(cache.counts))
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'interrupted.partial')))
+
+    @async_test
+    async def test_granule_larger_than_cache_is_not_cached(self):
+        cache = self._cache(max_bytes=5)
+
+        with await cache.download('s3://bucket/a') as granule:
+            self.assertFalse(granule.name.startswith(self.directory))
+        self.assertEqual([], os.listdir(self.directory))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib.util
+import os
+import pickle
+import tempfile
+import unittest
+from os import path
+
+import numpy as np
+import xarray as xr
+
+from common.async_test_utils.AsyncTestUtils import async_test
+
+from granule_ingester.exceptions import GranuleLoadingError, PipelineBuildingError
+from granule_ingester.granule_loaders import GranuleLoader
+
+
+class TestGranuleLoader(unittest.TestCase):
+
+    @async_test
+    async def test_dataset_opener(self):
+        granule_path = path.join(path.dirname(__file__), '../granules/not_empty_mur.nc4')
+        loader = GranuleLoader(resource=granule_path, preprocess=[{'name': 'squeeze', 'dimensions': ['time']}])
+
+        async with loader as (dataset, granule_name):
+            opener = pickle.loads(pickle.dumps(loader.dataset_opener()))
+            with opener() as reopened_dataset:
+                self.assertEqual(dict(dataset.sizes), dict(reopened_dataset.sizes))
+                self.assertNotIn('time', reopened_dataset.sizes)
+
+    @unittest.skipUnless(importlib.util.find_spec('dask'), 'dask is needed to open granules in chunks')
+    @async_test
+    async def test_chunked_granule_is_lazy(self):
+        granule_path = path.join(path.dirname(__file__), '../granules/not_empty_mur.nc4')
+        loader = GranuleLoader(resource=granule_path,
+                               chunks={'lat': 10, 'lon': 10},
+                               preprocess=[{'name': 'squeeze', 'dimensions': ['time']}])
+
+        async with loader as (dataset, granule_name):
+            self.assertEqual((10, 10), tuple(chunks[0] for chunks in dataset['analysed_sst'].chunks))
+            with GranuleLoader._open_dataset(granule_path, preprocess=loader._preprocess) as eager_dataset:
+                np.testing.assert_array_equal(eager_dataset['analysed_sst'][5:15, 5:15].values,
+                                              dataset['analysed_sst'][5:15, 5:15].values)
+
+            opener = pickle.loads(pickle.dumps(loader.dataset_opener()))
+            with opener() as reopened_dataset:
+                self.assertIsNotNone(reopened_dataset['analysed_sst'].chunks)
+
+    @unittest.skipIf(importlib.util.find_spec('dask'), 'dask is installed')
+    def test_chunks_require_dask(self):
+        with self.assertRaises(PipelineBuildingError):
+            GranuleLoader(resource='granule.nc', chunks='auto')
+
+    def test_zarr_stores_are_recognized(self):
+        with tempfile.TemporaryDirectory() as store_path:
+            # Other directories are not Zarr stores.
+            self.assertFalse(GranuleLoader(resource=store_path)._is_zarr())
+            open(os.path.join(store_path, '.zgroup'), 'w').close()
+            self.assertTrue(GranuleLoader(resource=store_path)._is_zarr())
+        self.assertTrue(GranuleLoader(resource='s3://bucket/granules/granule.zarr/')._is_zarr())
+        self.assertTrue(GranuleLoader(resource='s3://bucket/granules/granule', format='zarr')._is_zarr())
+        self.assertFalse(GranuleLoader(resource='s3://bucket/granules/granule.nc')._is_zarr())
+        self.assertFalse(GranuleLoader(resource='/data/granule.zarr', format='netcdf')._is_zarr())
+        with self.assertRaises(PipelineBuildingError):
+            GranuleLoader(resource='/data/granule.grib', format='grib')
+
+    @unittest.skipUnless(importlib.util.find_spec('zarr'), 'zarr is needed to read Zarr stores')
+    @async_test
+    async def test_zarr_store(self):
+        granule_path = path.join(path.dirname(__file__), '../granules/not_empty_mur.nc4')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store_path = os.path.join(temp_dir, 'not_empty_mur.zarr')
+            with xr.open_dataset(granule_path) as netcdf_dataset:
+                netcdf_dataset.to_zarr(store_path, consolidated=True)
+
+            loader = GranuleLoader(resource=store_path + '/')
+            async with loader as (dataset, granule_name):
+                self.assertEqual('not_empty_mur.zarr', granule_name)
+                opener = pickle.loads(pickle.dumps(loader.dataset_opener()))
+                with xr.open_dataset(granule_path) as netcdf_dataset, opener(lock=None) as reopened_dataset:
+                    for zarr_dataset in (dataset, reopened_dataset):
+                        np.testing.assert_array_equal(netcdf_dataset['analysed_sst'][0, 5:15, 5:15].values,
+                                                      zarr_dataset['analysed_sst'][0, 5:15, 5:15].values)
+
+    @unittest.skipIf(importlib.util.find_spec('zarr'), 'zarr is installed')
+    @async_test
+    async def test_zarr_store_needs_zarr(self):
+        with tempfile.TemporaryDirectory() as store_path:
+            open(os.path.join(store_path, 'zarr.json'), 'w').close()
+            with self.assertRaisesRegex(GranuleLoadingError, 'zarr'):
+                async with GranuleLoader(resource=store_path):
+                    pass
+
+
+if __name__ == '__main__':
+    unittest.main()
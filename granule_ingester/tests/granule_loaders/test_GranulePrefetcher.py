@@ -0,0 +1,117 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import unittest
+
+from common.async_test_utils.AsyncTestUtils import async_test
+
+from granule_ingester.granule_loaders import GranulePrefetcher
+
+
+class FakeGranuleFile:
+    def __init__(self, url: str):
+        self.name = url
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeDownloader:
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.downloads = []
+        self.files = []
+
+    async def download(self, url: str) -> FakeGranuleFile:
+        self.downloads.append(url)
+        await asyncio.sleep(self.delay)
+        granule_file = FakeGranuleFile(url)
+        self.files.append(granule_file)
+        return granule_file
+
+
+class TestGranulePrefetcher(unittest.TestCase):
+
+    @async_test
+    async def test_prefetched_granule_is_used(self):
+        downloader = FakeDownloader()
+        prefetcher = GranulePrefetcher(downloader)
+        prefetcher.prefetch('s3://bucket/a.nc')
+        await asyncio.sleep(0.01)
+
+        granule_file = await prefetcher.download('s3://bucket/a.nc')
+        self.assertEqual('s3://bucket/a.nc', granule_file.name)
+        self.assertEqual(['s3://bucket/a.nc'], downloader.downloads)
+        self.assertEqual(1, prefetcher.counts['used'])
+
+        # Once used, the granule is downloaded again if it is needed again.
+        await prefetcher.download('s3://bucket/a.nc')
+        self.assertEqual(['s3://bucket/a.nc', 's3://bucket/a.nc'], downloader.downloads)
+
+    @async_test
+    async def test_download_waits_for_prefetch_in_progress(self):
+        downloader = FakeDownloader(delay=0.05)
+        prefetcher = GranulePrefetcher(downloader)
+        prefetcher.prefetch('s3://bucket/a.nc')
+        await asyncio.sleep(0)
+
+        await prefetcher.download('s3://bucket/a.nc')
+        self.assertEqual(['s3://bucket/a.nc'], downloader.downloads)
+
+    @async_test
+    async def test_prefetches_of_the_same_granule_are_kept_apart(self):
+        downloader = FakeDownloader()
+        prefetcher = GranulePrefetcher(downloader)
+        first = prefetcher.prefetch('s3://bucket/a.nc')
+        second = prefetcher.prefetch('s3://bucket/a.nc')
+        await asyncio.sleep(0.01)
+
+        first_file = await prefetcher.download('s3://bucket/a.nc')
+        # The message that used the first prefetch is done; the second prefetch is still there for the next one.
+        prefetcher.discard('s3://bucket/a.nc', first)
+        second_file = await prefetcher.download('s3://bucket/a.nc')
+        prefetcher.discard('s3://bucket/a.nc', second)
+
+        self.assertIsNot(first_file, second_file)
+        self.assertFalse(second_file.closed)
+        self.assertEqual(2, len(downloader.downloads))
+        self.assertEqual(2, prefetcher.counts['used'])
+        self.assertEqual(0, prefetcher.counts['discarded'])
+
+    @async_test
+    async def test_discarded_granules_are_closed(self):
+        downloader = FakeDownloader(delay=0.05)
+        prefetcher = GranulePrefetcher(downloader)
+        first = prefetcher.prefetch('s3://bucket/a.nc')
+        prefetcher.prefetch('s3://bucket/b.nc')
+        await asyncio.sleep(0.1)
+        prefetcher.prefetch('s3://bucket/c.nc')
+        await asyncio.sleep(0)
+
+        prefetcher.discard('s3://bucket/a.nc', first)
+        prefetcher.close()
+        await asyncio.sleep(0.1)
+
+        # c.nc was still downloading and was cancelled.
+        self.assertEqual(['s3://bucket/a.nc', 's3://bucket/b.nc'],
+                         [granule_file.name for granule_file in downloader.files])
+        self.assertTrue(all(granule_file.closed for granule_file in downloader.files))
+        self.assertEqual(3, prefetcher.counts['discarded'])
+
+
+if __name__ == '__main__':
+    unittest.main()
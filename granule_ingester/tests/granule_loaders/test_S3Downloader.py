@@ -0,0 +1,133 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import hashlib
+import os
+import unittest
+from unittest import mock
+
+from common.async_test_utils.AsyncTestUtils import async_test
+
+from granule_ingester.exceptions import GranuleLoadingError
+from granule_ingester.granule_loaders import GranuleLoader, S3Downloader
+
+
+class FakeBody:
+    def __init__(self, client, data: bytes):
+        self._client = client
+        self._data = data
+
+    async def read(self, amt: int) -> bytes:
+        await asyncio.sleep(0)
+        chunk, self._data = self._data[:amt], self._data[amt:]
+        return chunk
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._client.in_flight -= 1
+
+
+class FakeS3Client:
+    def __init__(self, objects: dict, truncate_parts: bool = False):
+        self.objects = objects
+        self.truncate_parts = truncate_parts
+        self.ranges = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def head_object(self, Bucket, Key):
+        data = self.objects[(Bucket, Key)]
+        return {'ContentLength': len(data), 'ETag': f'"{hashlib.md5(data).hexdigest()}"'}
+
+    async def get_object(self, Bucket, Key, Range):
+        start, end = map(int, Range[len('bytes='):].split('-'))
+        self.ranges.append((start, end))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        data = self.objects[(Bucket, Key)][start:end + 1]
+        return {'Body': FakeBody(self, data[:-1] if self.truncate_parts else data)}
+
+
+class FakeSession:
+    def __init__(self, client: FakeS3Client):
+        self._client = client
+
+    def client(self, service_name):
+        client = self._client
+
+        class ClientContext:
+            async def __aenter__(self):
+                return client
+
+            async def __aexit__(self, exc_type, exc_val, exc_tb):
+                pass
+
+        return ClientContext()
+
+
+class TestS3Downloader(unittest.TestCase):
+
+    @async_test
+    async def test_parts_are_written_in_place(self):
+        data = bytes(range(25))
+        client = FakeS3Client({('bucket', 'path/granule.nc'): data})
+        downloader = S3Downloader(part_size=10, max_concurrency=4, session=FakeSession(client))
+
+        with mock.patch('granule_ingester.granule_loaders.S3Downloader.CHUNK_SIZE', 4):
+            with await downloader.download('s3://bucket/path/granule.nc') as temp_file:
+                self.assertEqual(25, os.path.getsize(temp_file.name))
+                with open(temp_file.name, 'rb') as downloaded:
+                    self.assertEqual(data, downloaded.read())
+
+        self.assertCountEqual([(0, 9), (10, 19), (20, 24)], client.ranges)
+
+    @async_test
+    async def test_concurrency_is_bounded(self):
+        client = FakeS3Client({('bucket', 'granule.nc'): b'x' * 60})
+        downloader = S3Downloader(part_size=10, max_concurrency=2, session=FakeSession(client))
+
+        with await downloader.download('s3://bucket/granule.nc'):
+            pass
+
+        self.assertEqual(6, len(client.ranges))
+        self.assertEqual(2, client.max_in_flight)
+
+    @async_test
+    async def test_incomplete_part_fails(self):
+        client = FakeS3Client({('bucket', 'granule.nc'): b'x' * 30}, truncate_parts=True)
+        downloader = S3Downloader(part_size=10, session=FakeSession(client))
+
+        with self.assertRaises(GranuleLoadingError):
+            await downloader.download('s3://bucket/granule.nc')
+
+    @async_test
+    async def test_granule_loader_opens_downloaded_granule(self):
+        granule_path = os.path.join(os.path.dirname(__file__), '../granules/not_empty_mur.nc4')
+        with open(granule_path, 'rb') as granule:
+            client = FakeS3Client({('bucket', 'not_empty_mur.nc4'): granule.read()})
+        downloader = S3Downloader(part_size=2 ** 16, session=FakeSession(client))
+        loader = GranuleLoader(resource=granule_path)
+
+        async with loader.with_resource('s3://bucket/not_empty_mur.nc4', downloader) as (dataset, granule_name):
+            async with GranuleLoader(resource=granule_path) as (expected_dataset, _):
+                self.assertEqual('not_empty_mur.nc4', granule_name)
+                self.assertTrue(dataset.identical(expected_dataset))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+from os import path
+from unittest import mock
+
+import numpy as np
+import xarray as xr
+from common.async_test_utils.AsyncTestUtils import AsyncMock, async_test
+
+from granule_ingester.exceptions import PipelineBuildingError
+from granule_ingester.granule_loaders import GranuleLoader, S3RangedFile
+
+
+class FakeBody:
+    def __init__(self, data: bytes):
+        self._data = data
+
+    def read(self) -> bytes:
+        return self._data
+
+
+class FakeSyncS3Client:
+    def __init__(self, objects: dict):
+        self.objects = objects
+        self.ranges = []
+
+    def head_object(self, Bucket, Key):
+        return {'ContentLength': len(self.objects[(Bucket, Key)])}
+
+    def get_object(self, Bucket, Key, Range):
+        start, end = map(int, Range[len('bytes='):].split('-'))
+        self.ranges.append((start, end))
+        return {'Body': FakeBody(self.objects[(Bucket, Key)][start:end + 1])}
+
+
+class TestS3RangedFile(unittest.TestCase):
+
+    def setUp(self):
+        self._data = os.urandom(10000)
+        self._client = FakeSyncS3Client({('bucket', 'granule.nc'): self._data})
+
+    def _open(self, **kwargs) -> S3RangedFile:
+        return S3RangedFile.from_url('s3://bucket/granule.nc', client=self._client, **kwargs)
+
+    def test_reads_and_seeks(self):
+        with self._open(block_size=1000) as ranged_file:
+            self.assertEqual(10000, ranged_file.size)
+            self.assertEqual(self._data[:10], ranged_file.read(10))
+            ranged_file.seek(2500)
+            self.assertEqual(self._data[2500:4200], ranged_file.read(1700))
+            ranged_file.seek(-100, io.SEEK_END)
+            self.assertEqual(self._data[-100:], ranged_file.read())
+            self.assertEqual(b'', ranged_file.read(10))
+
+    def test_blocks_are_cached(self):
+        with self._open(block_size=1000, read_ahead_blocks=0) as ranged_file:
+            ranged_file.seek(5100)
+            ranged_file.read(100)
+            ranged_file.seek(5500)
+            ranged_file.read(400)
+            ranged_file.seek(5050)
+            ranged_file.read(10)
+
+        self.assertEqual([(5000, 5999)], self._client.ranges)
+
+    def test_only_missing_blocks_are_fetched(self):
+        with self._open(block_size=1000, read_ahead_blocks=0) as ranged_file:
+            ranged_file.seek(3000)
+            ranged_file.read(1000)
+            ranged_file.seek(1000)
+            self.assertEqual(self._data[1000:5000], ranged_file.read(4000))
+
+        self.assertEqual([(3000, 3999), (1000, 2999), (4000, 4999)], self._client.ranges)
+
+    def test_sequential_reads_read_ahead(self):
+        with self._open(block_size=1000, read_ahead_blocks=2) as ranged_file:
+            ranged_file.read(100)
+            ranged_file.read(1000)
+            self.assertEqual(self._data[1100:5000], ranged_file.read(3900))
+
+        # The first read is not known to be sequential, the second one is and fetches two more blocks.
+        self.assertEqual([(0, 999), (1000, 3999), (4000, 6999)], self._client.ranges)
+        self.assertEqual(7000, ranged_file.bytes_fetched)
+        self.assertEqual(3, ranged_file.request_count)
+
+    def test_least_recently_used_blocks_are_evicted(self):
+        with self._open(block_size=1000, max_cached_blocks=2, read_ahead_blocks=0) as ranged_file:
+            for position in (0, 5000, 0, 9000, 5000):
+                ranged_file.seek(position)
+                ranged_file.read(10)
+
+        self.assertEqual([(0, 999), (5000, 5999), (9000, 9999), (5000, 5999)], self._client.ranges)
+
+
+class TestGranuleLoaderRangedAccess(unittest.TestCase):
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        granule_path = os.path.join(self._temp_dir.name, 'granule.nc')
+        xr.Dataset({'sst': (('lat', 'lon'), np.arange(200 * 300, dtype=np.float32).reshape(200, 300))}) \
+            .to_netcdf(granule_path, format='NETCDF3_64BIT', engine='scipy')
+        with open(granule_path, 'rb') as granule_file:
+            self._client = FakeSyncS3Client({('bucket', 'path/granule.nc'): granule_file.read()})
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    @async_test
+    async def test_granule_is_read_in_place(self):
+        loader = GranuleLoader(resource='s3://bucket/path/granule.nc', access='ranged')
+        with mock.patch('boto3.client', return_value=self._client):
+            async with loader as (dataset, granule_name):
+                self.assertEqual('granule.nc', granule_name)
+                self.assertEqual(np.float32(299), dataset['sst'][0, 299].values)
+
+                with loader.dataset_opener()() as reopened_dataset:
+                    self.assertEqual(np.float32(301), reopened_dataset['sst'][1, 1].values)
+
+    @async_test
+    async def test_ranged_files_are_closed_with_their_datasets(self):
+        ranged_files = []
+        open_ranged_file = GranuleLoader._open_ranged_file
+
+        def track_ranged_file(url):
+            ranged_files.append(open_ranged_file(url))
+            return ranged_files[-1]
+
+        loader = GranuleLoader(resource='s3://bucket/path/granule.nc', access='ranged')
+        with mock.patch('boto3.client', return_value=self._client), \
+                mock.patch.object(GranuleLoader, '_open_ranged_file', side_effect=track_ranged_file):
+            async with loader:
+                with loader.dataset_opener()():
+                    pass
+                self.assertEqual([False, True], [ranged_file.closed for ranged_file in ranged_files])
+
+        self.assertTrue(ranged_files[0].closed)
+
+    @unittest.skipUnless(importlib.util.find_spec('h5netcdf') and importlib.util.find_spec('h5py'),
+                         'h5netcdf and h5py are needed to read HDF5 granules in place')
+    @async_test
+    async def test_hdf5_granule_is_read_partially(self):
+        with open(path.join(path.dirname(__file__), '../granules/not_empty_mur.nc4'), 'rb') as granule_file:
+            client = FakeSyncS3Client({('bucket', 'not_empty_mur.nc4'): granule_file.read()})
+        loader = GranuleLoader(resource='s3://bucket/not_empty_mur.nc4', access='ranged')
+        with mock.patch('boto3.client', return_value=client):
+            async with loader as (dataset, granule_name):
+                dataset['analysed_sst'][0, 0, 0].values
+
+        fetched = sum(end - start + 1 for start, end in client.ranges)
+        self.assertLess(fetched, len(client.objects[('bucket', 'not_empty_mur.nc4')]))
+
+    @unittest.skipIf(importlib.util.find_spec('h5netcdf') and importlib.util.find_spec('h5py'),
+                     'h5netcdf and h5py are installed')
+    @async_test
+    async def test_hdf5_granule_is_downloaded_without_h5netcdf(self):
+        granule_path = path.join(path.dirname(__file__), '../granules/not_empty_mur.nc4')
+        with open(granule_path, 'rb') as granule_file:
+            client = FakeSyncS3Client({('bucket', 'not_empty_mur.nc4'): granule_file.read()})
+        downloader = mock.MagicMock()
+        downloader.download = AsyncMock(side_effect=lambda url: open(granule_path, 'rb'))
+        loader = GranuleLoader(resource='granule.nc', access='ranged').with_resource('s3://bucket/not_empty_mur.nc4',
+                                                                                     s3_downloader=downloader)
+        with mock.patch('boto3.client', return_value=client):
+            async with loader as (dataset, granule_name):
+                self.assertIn('analysed_sst', dataset)
+
+        downloader.download.assert_called_once_with('s3://bucket/not_empty_mur.nc4')
+        self.assertEqual(granule_path, loader._file_path)
+
+    def test_unknown_access_mode(self):
+        with self.assertRaises(PipelineBuildingError):
+            GranuleLoader(resource='s3://bucket/path/granule.nc', access='streaming')
+
+
+if __name__ == '__main__':
+    unittest.main()
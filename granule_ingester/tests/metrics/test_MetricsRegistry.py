@@ -0,0 +1,50 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from granule_ingester.metrics import GranuleMetrics, MetricsRegistry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def test_record_granule(self):
+        granule_metrics = GranuleMetrics('granule.nc')
+        granule_metrics.add('open', 1.5)
+        granule_metrics.add('processor', 2.0, 'GridReadingProcessor')
+        granule_metrics.add('processor', 0.5, 'GridReadingProcessor')
+        granule_metrics.count_tiles(10, 4096)
+
+        metrics_registry = MetricsRegistry()
+        metrics_registry.record_granule(granule_metrics, 5.0)
+        metrics_registry.record_granule(GranuleMetrics(), 1.0, succeeded=False)
+        rendered = metrics_registry.render().splitlines()
+
+        self.assertIn('# TYPE granule_ingester_stage_seconds_total counter', rendered)
+        self.assertIn('granule_ingester_granules_total{status="success"} 1.0', rendered)
+        self.assertIn('granule_ingester_granules_total{status="failure"} 1.0', rendered)
+        self.assertIn('granule_ingester_granule_seconds_total 6.0', rendered)
+        self.assertIn('granule_ingester_stage_seconds_total{stage="open"} 1.5', rendered)
+        self.assertIn('granule_ingester_stage_seconds_total{name="GridReadingProcessor",stage="processor"} 2.5',
+                      rendered)
+        self.assertIn('granule_ingester_tiles_total 10.0', rendered)
+        self.assertIn('granule_ingester_tile_bytes_total 4096.0', rendered)
+
+    def test_increment_unknown_metric(self):
+        self.assertRaises(KeyError, MetricsRegistry().increment, 'not_a_metric')
+
+
+if __name__ == '__main__':
+    unittest.main()
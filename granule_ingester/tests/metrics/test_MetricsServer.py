@@ -0,0 +1,50 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import socket
+import unittest
+
+import aiohttp
+
+from common.async_test_utils.AsyncTestUtils import async_test
+from granule_ingester.metrics import GranuleMetrics, MetricsRegistry, MetricsServer
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestMetricsServer(unittest.TestCase):
+
+    @async_test
+    async def test_serves_metrics(self):
+        metrics_registry = MetricsRegistry()
+        metrics_registry.record_granule(GranuleMetrics(), 2.0)
+        port = free_port()
+
+        async with MetricsServer(port, host='127.0.0.1', metrics_registry=metrics_registry):
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f'http://127.0.0.1:{port}/metrics') as response:
+                    self.assertEqual(200, response.status)
+                    self.assertTrue(response.headers['Content-Type'].startswith('text/plain; version=0.0.4'))
+                    body = await response.text()
+
+        self.assertIn('granule_ingester_granule_seconds_total 2.0', body.splitlines())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+import numpy as np
+import xarray as xr
+
+from granule_ingester.pipeline.MemoryGovernor import BatchPlan, MemoryGovernor
+from granule_ingester.processors.reading_processors.TileReadingProcessor import MAX_GRANULE_READ_BYTES
+from granule_ingester.slicers import SliceFileByStepSize
+
+
+class TestMemoryGovernor(unittest.TestCase):
+
+    def setUp(self):
+        # Two float64 variables of 10 x 100 x 100, and float32 lat/lon coordinates.
+        self.dataset = xr.Dataset({'sst': (('time', 'lat', 'lon'), np.zeros((10, 100, 100))),
+                                   'error': (('time', 'lat', 'lon'), np.zeros((10, 100, 100)))},
+                                  coords={'lat': np.zeros(100, dtype=np.float32),
+                                          'lon': np.zeros(100, dtype=np.float32)})
+        self.slicer = SliceFileByStepSize(dimension_step_sizes={'time': 1, 'lat': 30, 'lon': 30})
+
+    def test_estimate_tile_bytes(self):
+        tile_shape = self.slicer.tile_shape(self.dataset.sizes)
+
+        self.assertEqual({'time': 1, 'lat': 30, 'lon': 30}, tile_shape)
+        self.assertEqual(2 * 8 * 30 * 30 + 2 * 4 * 30, MemoryGovernor.estimate_tile_bytes(self.dataset, tile_shape))
+
+    def test_no_ceiling_keeps_defaults(self):
+        plan = MemoryGovernor(max_batch_size=256).plan(self.dataset, self.slicer, 16)
+
+        self.assertEqual(BatchPlan(14640, 256, 16, MAX_GRANULE_READ_BYTES), plan)
+
+    def test_batches_are_shrunk_to_fit_ceiling(self):
+        # Room for 320 tiles: 16 workers with two batches each get batches of 10 tiles.
+        plan = MemoryGovernor(memory_ceiling=14640 * 320, max_batch_size=256).plan(self.dataset, self.slicer, 16)
+
+        self.assertEqual(BatchPlan(14640, 10, 16, 14640 * 320), plan)
+
+    def test_concurrency_is_lowered_when_single_tiles_do_not_fit(self):
+        plan = MemoryGovernor(memory_ceiling=14640 * 6, max_batch_size=256).plan(self.dataset, self.slicer, 16)
+
+        self.assertEqual(BatchPlan(14640, 1, 3, 14640 * 6), plan)
+
+    def test_tile_larger_than_ceiling_runs_alone(self):
+        plan = MemoryGovernor(memory_ceiling=1024, max_batch_size=256).plan(self.dataset, self.slicer, 16)
+
+        self.assertEqual(BatchPlan(14640, 1, 1, 1024), plan)
+
+    def test_granule_reads_are_split_between_copies(self):
+        governor = MemoryGovernor(memory_ceiling=2 ** 30, max_batch_size=256, max_granule_read_bytes=2 ** 29)
+
+        self.assertEqual(2 ** 29, governor.plan(self.dataset, self.slicer, 16).granule_read_bytes)
+        self.assertEqual(2 ** 26, governor.plan(self.dataset, self.slicer, 16, granule_copies=16).granule_read_bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,12 +13,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import os
 import unittest
+from unittest import mock
 
+import yaml
+
+from common.async_test_utils.AsyncTestUtils import AsyncMock, async_test
 from nexusproto import DataTile_pb2 as nexusproto
 
-from granule_ingester.pipeline.Pipeline import Pipeline
+from granule_ingester.metrics import GranuleMetrics
+from granule_ingester.pipeline import PendingTileWindow
+from granule_ingester.pipeline.Pipeline import Pipeline, _pipeline_templates
 from granule_ingester.processors import GenerateTileId
 from granule_ingester.processors.reading_processors import EccoReadingProcessor
 from granule_ingester.slicers.SliceFileByStepSize import SliceFileByStepSize
@@ -57,6 +64,60 @@ class TestPipeline(unittest.TestCase):
         self.assertEqual(type(pipeline._tile_processors[0]), EccoReadingProcessor)
         self.assertEqual(type(pipeline._tile_processors[1]), GenerateTileId)
 
+    def test_parse_config_with_invalid_execution_backend(self):
+        relative_path = "../config_files/ingestion_config_testfile.yaml"
+        with open(os.path.join(os.path.dirname(__file__), relative_path)) as file:
+            yaml_str = file.read() + "\nexecution_backend: gpu\n"
+
+        self.assertRaises(PipelineBuildingError, Pipeline.from_string, yaml_str, DataStore, MetadataStore)
+
+    def test_parse_config_with_outputs(self):
+        relative_path = "../config_files/ingestion_config_testfile.yaml"
+        with open(os.path.join(os.path.dirname(__file__), relative_path)) as file:
+            config = yaml.load(file.read(), yaml.FullLoader)
+        processors = config.pop('processors')
+        config['outputs'] = [{'processors': processors}, {'processors': [{'name': 'generateTileId'}]}]
+
+        pipeline = Pipeline.from_string(yaml.dump(config), DataStore, MetadataStore)
+
+        self.assertEqual(2, pipeline._output_count)
+        self.assertEqual([[EccoReadingProcessor, GenerateTileId], [GenerateTileId]],
+                         [[type(processor) for processor in chain] for chain in pipeline._tile_processors])
+
+        config['processors'] = processors
+        self.assertRaises(PipelineBuildingError, Pipeline.from_string, yaml.dump(config), DataStore, MetadataStore)
+
+    def test_parsed_pipelines_are_reused(self):
+        relative_path = "../config_files/ingestion_config_testfile.yaml"
+        with open(os.path.join(os.path.dirname(__file__), relative_path)) as file:
+            yaml_str = file.read()
+        config = yaml.load(yaml_str, yaml.FullLoader)
+        resource = config['granule']['resource']
+
+        first = Pipeline.from_string(yaml_str, DataStore, MetadataStore)
+        second = Pipeline.from_string(yaml_str.replace(resource, '/other/granule.nc'), DataStore, MetadataStore)
+
+        self.assertEqual(1, len([key for key in _pipeline_templates if key == Pipeline._template_key(config)]))
+        self.assertEqual(resource, first._granule_loader._resource)
+        self.assertEqual('/other/granule.nc', second._granule_loader._resource)
+        # Each pipeline gets its own copies, since granules may be processed concurrently.
+        self.assertIsNot(first._slicer, second._slicer)
+        self.assertIsNot(first._tile_processors[0], second._tile_processors[0])
+        # Apart from the lock guarding the granule arrays, which every copy gets its own of.
+        self.assertEqual({k: v for k, v in vars(first._tile_processors[0]).items() if k != '_granule_arrays_lock'},
+                         {k: v for k, v in vars(second._tile_processors[0]).items() if k != '_granule_arrays_lock'})
+
+    def test_parsed_pipelines_are_evicted(self):
+        relative_path = "../config_files/ingestion_config_testfile.yaml"
+        with open(os.path.join(os.path.dirname(__file__), relative_path)) as file:
+            yaml_str = file.read()
+
+        with mock.patch('granule_ingester.pipeline.Pipeline.MAX_CACHED_PIPELINES', 2):
+            for dataset_name in ['a', 'b', 'c']:
+                Pipeline.from_string(yaml_str + f"\nextra:\n  dataset: {dataset_name}\n", DataStore, MetadataStore)
+
+        self.assertEqual(2, len(_pipeline_templates))
+
     def test_parse_module(self):
         module_mappings = {
             "sliceFileByStepSize": SliceFileByStepSize
@@ -96,6 +157,52 @@ class TestPipeline(unittest.TestCase):
 
         self.assertRaises(PipelineBuildingError, Pipeline._parse_module, module_config, module_mappings)
 
+    def test_serialized_batches(self):
+        tiles = []
+        for i in range(5):
+            tile = nexusproto.NexusTile()
+            tile.summary.section_spec = f'lat:{i}:{i + 1}'
+            tiles.append(tile)
+
+        batches = list(Pipeline._serialized_batches(iter(tiles), 2))
+
+        self.assertEqual([2, 2, 1], [len(batch) for batch in batches])
+        self.assertEqual('lat:4:5', nexusproto.NexusTile.FromString(batches[2][0]).summary.section_spec)
+
+    @async_test
+    async def test_dispatch_pauses_while_pending_window_is_full(self):
+        serialized_tile = nexusproto.NexusTile.SerializeToString(nexusproto.NexusTile())
+        worker_pool = mock.MagicMock()
+        worker_pool.max_concurrency = 4
+        worker_pool.process_batch = AsyncMock(side_effect=lambda job_id, batch: (batch, {}))
+
+        written = []
+        writer = mock.MagicMock()
+        writer.put = AsyncMock(side_effect=lambda tiles, on_written, **kwargs: written.append(on_written))
+
+        window = PendingTileWindow(max_tiles=2, max_bytes=None)
+        pipeline = Pipeline(None, None, None, None, [], max_concurrency=4, pending_window=window)
+        batches = [[serialized_tile]] * 5
+        task = asyncio.ensure_future(pipeline._process_batches(worker_pool, 'job', batches, writer, GranuleMetrics()))
+
+        for _ in range(10):
+            await asyncio.sleep(0)
+        self.assertEqual(2, worker_pool.process_batch.call_count)
+
+        # Writing a batch makes room for the next one.
+        written.pop(0)()
+        for _ in range(10):
+            await asyncio.sleep(0)
+        self.assertEqual(3, worker_pool.process_batch.call_count)
+
+        while not task.done():
+            while written:
+                written.pop(0)()
+            await asyncio.sleep(0)
+        await task
+        self.assertEqual(5, worker_pool.process_batch.call_count)
+        self.assertEqual(0, window.tiles.reserved)
+
     def test_process_tile(self):
         # class MockIdProcessor:
         #     def process(self, tile, *args, **kwargs):
@@ -0,0 +1,98 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pickle
+import unittest
+
+import xarray as xr
+from nexusproto import DataTile_pb2 as nexusproto
+
+from common.async_test_utils.AsyncTestUtils import async_test
+from granule_ingester.exceptions import TileProcessingError
+from granule_ingester.pipeline.ProcessWorkerPool import MAX_CACHED_JOBS, _get_worker_job, \
+    _process_tile_batch_in_worker, _worker_jobs
+from granule_ingester.processors import TileProcessor
+
+
+class FailingProcessor(TileProcessor):
+    def process(self, tile, *args, **kwargs):
+        raise TileProcessingError('bad tile')
+
+
+class ReleasableProcessor(TileProcessor):
+    released = 0
+
+    def process(self, tile, *args, **kwargs):
+        return tile
+
+    def release(self):
+        ReleasableProcessor.released += 1
+
+
+class TestProcessWorkerPool(unittest.TestCase):
+
+    def tearDown(self):
+        _worker_jobs.clear()
+
+    def test_get_worker_job_is_cached(self):
+        serialized_job = pickle.dumps(([], xr.Dataset({'test_variable': [1, 2, 3]})))
+
+        first = _get_worker_job('job-1', serialized_job)
+        second = _get_worker_job('job-1', serialized_job)
+
+        self.assertIs(first, second)
+
+    def test_get_worker_job_evicts_least_recently_used(self):
+        serialized_job = pickle.dumps(([], xr.Dataset({'test_variable': [1, 2, 3]})))
+
+        for i in range(MAX_CACHED_JOBS):
+            _get_worker_job(f'job-{i}', serialized_job)
+        _get_worker_job('job-0', serialized_job)
+        _get_worker_job('job-new', serialized_job)
+
+        self.assertEqual(MAX_CACHED_JOBS, len(_worker_jobs))
+        self.assertIn('job-0', _worker_jobs)
+        self.assertNotIn('job-1', _worker_jobs)
+
+    @async_test
+    async def test_released_jobs_are_forgotten(self):
+        ReleasableProcessor.released = 0
+        serialized_job = pickle.dumps(([ReleasableProcessor()], xr.Dataset()))
+        _get_worker_job('job-1', serialized_job)
+        _get_worker_job('job-2', serialized_job)
+
+        await _process_tile_batch_in_worker('job-3', serialized_job, [], released_job_ids=('job-1', 'job-unknown'))
+
+        self.assertEqual(['job-2', 'job-3'], list(_worker_jobs))
+        self.assertEqual(1, ReleasableProcessor.released)
+
+    @async_test
+    async def test_errors_are_returned_with_the_batch(self):
+        serialized_job = pickle.dumps(([FailingProcessor()], xr.Dataset()))
+        tile = nexusproto.NexusTile()
+        tile.summary.section_spec = 'lat:0:10'
+
+        results, stage_seconds, error = await _process_tile_batch_in_worker(
+            'job-1', serialized_job, [nexusproto.NexusTile.SerializeToString(tile)])
+
+        self.assertIsNone(results)
+        error = pickle.loads(error)
+        self.assertIsInstance(error, TileProcessingError)
+        self.assertEqual('lat:0:10', error.section_spec)
+        self.assertIsNotNone(error.__traceback__)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import unittest
+
+from common.async_test_utils.AsyncTestUtils import async_test
+from granule_ingester.pipeline.ResourceBudget import ResourceBudget
+
+
+class TestResourceBudget(unittest.TestCase):
+
+    @async_test
+    async def test_acquire_waits_for_capacity(self):
+        budget = ResourceBudget(100)
+        await budget.acquire(60)
+
+        waiter = asyncio.ensure_future(budget.acquire(50))
+        await asyncio.sleep(0)
+        self.assertFalse(waiter.done())
+
+        budget.release(60)
+        self.assertEqual(50, await waiter)
+        self.assertEqual(50, budget.reserved)
+
+    @async_test
+    async def test_waiters_are_served_in_order(self):
+        budget = ResourceBudget(100)
+        await budget.acquire(90)
+
+        large = asyncio.ensure_future(budget.acquire(80))
+        await asyncio.sleep(0)
+        # Would fit right away, but must not overtake the large reservation that is already waiting.
+        small = asyncio.ensure_future(budget.acquire(10))
+        await asyncio.sleep(0)
+        self.assertFalse(large.done())
+        self.assertFalse(small.done())
+
+        budget.release(90)
+        await asyncio.sleep(0)
+        self.assertTrue(large.done())
+        self.assertTrue(small.done())
+        self.assertEqual(90, budget.reserved)
+
+    @async_test
+    async def test_oversized_reservation_runs_alone(self):
+        budget = ResourceBudget(100)
+        async with budget.reserve(1000) as reserved:
+            self.assertEqual(100, reserved)
+            waiter = asyncio.ensure_future(budget.acquire(1))
+            await asyncio.sleep(0)
+            self.assertFalse(waiter.done())
+        await waiter
+
+    @async_test
+    async def test_cancelled_waiter_does_not_block_others(self):
+        budget = ResourceBudget(100)
+        await budget.acquire(100)
+
+        cancelled = asyncio.ensure_future(budget.acquire(100))
+        other = asyncio.ensure_future(budget.acquire(10))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+
+        budget.release(50)
+        await asyncio.sleep(0)
+        self.assertTrue(other.done())
+        self.assertEqual(60, budget.reserved)
+
+    @async_test
+    async def test_unbounded_budget_never_blocks(self):
+        budget = ResourceBudget()
+        await budget.acquire(10 ** 12)
+        await budget.acquire(10 ** 12)
+        self.assertEqual(2 * 10 ** 12, budget.reserved)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from unittest import mock
+
+from common.async_test_utils.AsyncTestUtils import AsyncMock, async_test
+from nexusproto import DataTile_pb2 as nexusproto
+
+from granule_ingester.pipeline.TileWriter import TileWriter
+from granule_ingester.processors import GenerateContentHash
+
+
+class TestTileWriter(unittest.TestCase):
+
+    @async_test
+    async def test_writes_every_batch(self):
+        data_store = mock.MagicMock()
+        data_store.save_batch = AsyncMock()
+        metadata_store = mock.MagicMock()
+        metadata_store.save_batch = AsyncMock()
+
+        async with TileWriter(data_store, metadata_store, max_queued_batches=1) as writer:
+            for _ in range(3):
+                await writer.put([nexusproto.NexusTile(), nexusproto.NexusTile()])
+
+        self.assertEqual(6, writer.tile_count)
+        self.assertEqual(3, data_store.save_batch.call_count)
+        self.assertEqual(3, metadata_store.save_batch.call_count)
+
+    @async_test
+    async def test_write_error_is_raised_to_producer(self):
+        data_store = mock.MagicMock()
+        data_store.save_batch = AsyncMock(side_effect=RuntimeError('write failed'))
+        metadata_store = mock.MagicMock()
+        metadata_store.save_batch = AsyncMock()
+
+        with self.assertRaises(RuntimeError):
+            async with TileWriter(data_store, metadata_store, max_queued_batches=1) as writer:
+                for _ in range(5):
+                    await writer.put([nexusproto.NexusTile()])
+
+        metadata_store.save_batch.assert_not_called()
+
+    @async_test
+    async def test_on_written_is_called_for_every_batch(self):
+        data_store = mock.MagicMock()
+        data_store.save_batch = AsyncMock(side_effect=RuntimeError('write failed'))
+        metadata_store = mock.MagicMock()
+        metadata_store.save_batch = AsyncMock()
+        on_written = mock.MagicMock()
+        queued = 0
+
+        with self.assertRaises(RuntimeError):
+            async with TileWriter(data_store, metadata_store, max_queued_batches=1) as writer:
+                for _ in range(5):
+                    await writer.put([nexusproto.NexusTile()], on_written=on_written)
+                    queued += 1
+
+        # Every batch that made it into the queue is given back, whether it was written or not.
+        self.assertGreater(queued, 0)
+        self.assertEqual(queued, on_written.call_count)
+
+    @async_test
+    async def test_unchanged_tiles_are_skipped(self):
+        tiles = []
+        for i in range(3):
+            tile = nexusproto.NexusTile()
+            tile.summary.tile_id = f'tile_{i}'
+            tiles.append(GenerateContentHash().process(tile))
+        data_store = mock.MagicMock()
+        data_store.save_batch = AsyncMock()
+        metadata_store = mock.MagicMock()
+        metadata_store.save_batch = AsyncMock()
+        # tile_0 is unchanged, tile_1 was written with different contents and tile_2 is new.
+        metadata_store.get_content_hashes = AsyncMock(return_value={
+            'tile_0': GenerateContentHash.get_content_hash(tiles[0]),
+            'tile_1': 'stale'
+        })
+        on_saved = AsyncMock()
+
+        async with TileWriter(data_store, metadata_store, skip_unchanged_tiles=True) as writer:
+            await writer.put(tiles, on_saved=on_saved)
+            await writer.put(tiles[:1], on_saved=on_saved)
+
+        metadata_store.get_content_hashes.assert_called_with(['tile_0'])
+        data_store.save_batch.assert_called_once_with(tiles[1:])
+        metadata_store.save_batch.assert_called_once_with(tiles[1:])
+        self.assertEqual(2, writer.tile_count)
+        self.assertEqual(2, on_saved.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import unittest
+
+import xarray as xr
+from nexusproto import DataTile_pb2 as nexusproto
+
+from common.async_test_utils.AsyncTestUtils import async_test
+from granule_ingester.exceptions import TileProcessingError
+from granule_ingester.pipeline import InlineWorkerPool, ThreadWorkerPool
+from granule_ingester.pipeline.WorkerPool import process_tile_batch
+from granule_ingester.processors import TileProcessor
+
+
+class SetTileId(TileProcessor):
+    def process(self, tile, *args, **kwargs):
+        tile.summary.tile_id = f"{tile.summary.section_spec}-{kwargs['dataset'].attrs['title']}"
+        return tile
+
+
+class DropOddTiles(TileProcessor):
+    def process(self, tile, *args, **kwargs):
+        return None if int(tile.summary.section_spec) % 2 else tile
+
+
+class AppendToTileId(TileProcessor):
+    def __init__(self, suffix):
+        self.suffix = suffix
+
+    def process(self, tile, *args, **kwargs):
+        tile.summary.tile_id += self.suffix
+        return tile
+
+
+class FailingProcessor(TileProcessor):
+    def process(self, tile, *args, **kwargs):
+        raise TileProcessingError('bad tile')
+
+
+def serialized_tiles(count):
+    tiles = []
+    for i in range(count):
+        tile = nexusproto.NexusTile()
+        tile.summary.section_spec = str(i)
+        tiles.append(nexusproto.NexusTile.SerializeToString(tile))
+    return tiles
+
+
+class TestWorkerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.dataset = xr.Dataset(attrs={'title': 'granule'})
+
+    def test_process_tile_batch(self):
+        results, stage_seconds = process_tile_batch([DropOddTiles(), SetTileId()], self.dataset, serialized_tiles(4))
+
+        self.assertEqual(4, len(results))
+        self.assertIsNone(results[1])
+        self.assertIsNone(results[3])
+        self.assertEqual('2-granule', nexusproto.NexusTile.FromString(results[2]).summary.tile_id)
+        self.assertEqual({('processor', 'DropOddTiles'), ('processor', 'SetTileId'), ('serialization', '')},
+                         set(stage_seconds.keys()))
+
+    def test_process_tile_batch_with_several_chains(self):
+        chains = [[SetTileId(), AppendToTileId('-a')], [DropOddTiles(), SetTileId()]]
+        results, _ = process_tile_batch(chains, self.dataset, serialized_tiles(2))
+
+        # Tile by tile, in the order of the chains; each chain works on its own copy of the tile.
+        self.assertEqual(['0-granule-a', '0-granule', '1-granule-a', None],
+                         [nexusproto.NexusTile.FromString(r).summary.tile_id if r is not None else None
+                          for r in results])
+
+    @async_test
+    async def test_backends_produce_the_same_results(self):
+        expected, _ = process_tile_batch([DropOddTiles(), SetTileId()], self.dataset, serialized_tiles(8))
+
+        for pool_class in (ThreadWorkerPool, InlineWorkerPool):
+            async with pool_class(4) as pool:
+                job_id = await pool.register_job([DropOddTiles(), SetTileId()], self.dataset)
+                results, _ = await pool.process_batch(job_id, serialized_tiles(8))
+                pool.release_job(job_id)
+
+            self.assertEqual(expected, results, pool_class.backend)
+
+    @async_test
+    async def test_backends_raise_processor_errors(self):
+        for pool_class in (ThreadWorkerPool, InlineWorkerPool):
+            async with pool_class(4) as pool:
+                job_id = await pool.register_job([FailingProcessor()], self.dataset)
+                with self.assertRaises(TileProcessingError) as context:
+                    await pool.process_batch(job_id, serialized_tiles(2))
+
+            self.assertEqual('0', context.exception.section_spec, pool_class.backend)
+
+    @async_test
+    async def test_thread_pool_opens_granule_in_its_threads(self):
+        opened = []
+
+        def dataset_opener(lock=False):
+            opened.append((threading.current_thread().name, lock))
+            return self.dataset.copy()
+
+        async with ThreadWorkerPool(4) as pool:
+            job_id = await pool.register_job([SetTileId()], self.dataset, dataset_opener)
+            await pool.process_batch(job_id, serialized_tiles(2))
+            pool.release_job(job_id)
+
+        self.assertEqual(1, len(opened))
+        self.assertTrue(opened[0][0].startswith('tile-worker'))
+        self.assertIsNone(opened[0][1])
+
+    def test_inline_pool_processes_one_batch_at_a_time(self):
+        self.assertEqual(1, InlineWorkerPool(16).max_concurrency)
+
+
+if __name__ == '__main__':
+    unittest.main()
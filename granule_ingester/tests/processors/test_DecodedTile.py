@@ -0,0 +1,75 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib
+import unittest
+from unittest import mock
+
+import numpy as np
+from nexusproto import DataTile_pb2 as nexusproto
+from nexusproto.serialization import from_shaped_array, to_shaped_array
+
+from granule_ingester.processors import (DecodedTile, EmptyTileFilter, ForceAscendingLatitude,
+                                         Subtract180FromLongitude, TileProcessor)
+
+# The package re-exports the DecodedTile class under the same name as its module
+decoded_tile_module = importlib.import_module('granule_ingester.processors.DecodedTile')
+
+
+def _make_tile():
+    tile = nexusproto.NexusTile()
+    tile.summary.granule = 'test.nc'
+    tile.tile.grid_tile.latitude.CopyFrom(to_shaped_array(np.array([10.0, 5.0, 0.0])))
+    tile.tile.grid_tile.longitude.CopyFrom(to_shaped_array(np.array([170.0, 190.0])))
+    tile.tile.grid_tile.variable_data.CopyFrom(to_shaped_array(np.arange(6, dtype=np.float32).reshape(3, 2)))
+    return tile
+
+
+class TestDecodedTile(unittest.TestCase):
+
+    def test_chain_decodes_and_encodes_each_array_once(self):
+        tile = DecodedTile(_make_tile())
+        processors = [Subtract180FromLongitude(), ForceAscendingLatitude(), EmptyTileFilter()]
+
+        with mock.patch.object(decoded_tile_module, 'from_shaped_array', wraps=from_shaped_array) as decode, \
+                mock.patch.object(decoded_tile_module, 'to_shaped_array', wraps=to_shaped_array) as encode:
+            for processor in processors:
+                tile = processor.process_decoded(tile)
+            nexus_tile = tile.to_nexus_tile()
+
+        self.assertEqual(3, decode.call_count)
+        self.assertEqual(3, encode.call_count)
+        np.testing.assert_array_equal([0.0, 5.0, 10.0], from_shaped_array(nexus_tile.tile.grid_tile.latitude))
+        np.testing.assert_array_equal([170.0, -170.0], from_shaped_array(nexus_tile.tile.grid_tile.longitude))
+        np.testing.assert_array_equal([[4, 5], [2, 3], [0, 1]],
+                                      from_shaped_array(nexus_tile.tile.grid_tile.variable_data))
+
+    def test_plain_processor_sees_encoded_tile(self):
+        class AddOneProcessor(TileProcessor):
+            def process(self, tile, *args, **kwargs):
+                data = from_shaped_array(tile.tile.grid_tile.variable_data) + 1
+                tile.tile.grid_tile.variable_data.CopyFrom(to_shaped_array(data))
+                return tile
+
+        tile = DecodedTile(_make_tile())
+        tile = Subtract180FromLongitude().process_decoded(tile)
+        tile = AddOneProcessor().process_decoded(tile)
+
+        np.testing.assert_array_equal([170.0, -170.0], tile.get_array('longitude'))
+        np.testing.assert_array_equal(np.arange(1, 7).reshape(3, 2), tile.get_array('variable_data'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+import numpy as np
+from nexusproto import DataTile_pb2 as nexusproto
+from nexusproto.serialization import to_shaped_array
+
+from granule_ingester.processors import GenerateContentHash
+from granule_ingester.processors.GenerateContentHash import CONTENT_HASH_ATTRIBUTE
+
+
+class TestGenerateContentHash(unittest.TestCase):
+
+    def _tile(self, value: float = 1.0) -> nexusproto.NexusTile:
+        tile = nexusproto.NexusTile()
+        tile.summary.tile_id = 'test_id'
+        tile.summary.section_spec = 'lat:0:2,lon:0:2'
+        tile.tile.grid_tile.variable_data.CopyFrom(to_shaped_array(np.full((2, 2), value, dtype=np.float32)))
+        return tile
+
+    def test_hash_is_stored_as_global_attribute(self):
+        tile = GenerateContentHash().process(self._tile())
+
+        self.assertEqual(1, len(tile.summary.global_attributes))
+        self.assertEqual(CONTENT_HASH_ATTRIBUTE, tile.summary.global_attributes[0].name)
+        self.assertEqual(GenerateContentHash.content_hash(self._tile()), GenerateContentHash.get_content_hash(tile))
+
+    def test_hash_ignores_previous_hash(self):
+        tile = GenerateContentHash().process(self._tile())
+
+        self.assertEqual(GenerateContentHash.get_content_hash(tile), GenerateContentHash.content_hash(tile))
+
+    def test_hash_is_replaced(self):
+        tile = GenerateContentHash().process(self._tile())
+        tile.summary.stats.max = 2.0
+        tile = GenerateContentHash().process(tile)
+
+        self.assertEqual([CONTENT_HASH_ATTRIBUTE], [attribute.name for attribute in tile.summary.global_attributes])
+        self.assertEqual([GenerateContentHash.content_hash(tile)], list(tile.summary.global_attributes[0].values))
+
+    def test_hash_changes_with_data_and_summary(self):
+        original = GenerateContentHash.content_hash(self._tile())
+        changed_summary = self._tile()
+        changed_summary.summary.stats.max = 2.0
+
+        self.assertEqual(original, GenerateContentHash.content_hash(self._tile()))
+        self.assertNotEqual(original, GenerateContentHash.content_hash(self._tile(value=2.0)))
+        self.assertNotEqual(original, GenerateContentHash.content_hash(changed_summary))
+
+    def test_tile_without_hash(self):
+        self.assertIsNone(GenerateContentHash.get_content_hash(self._tile()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,6 +13,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
+import importlib.util
+import pickle
 import unittest
 from os import path
 
@@ -21,6 +24,7 @@ import xarray as xr
 from nexusproto import DataTile_pb2 as nexusproto
 from nexusproto.serialization import from_shaped_array
 
+from granule_ingester.processors import DecodedTile
 from granule_ingester.processors.reading_processors import GridReadingProcessor
 
 
@@ -468,5 +472,99 @@ class TestCalendars(unittest.TestCase):
         )
 
 
+class TestGranuleReadMode(unittest.TestCase):
+
+    def test_granule_read_matches_tile_read(self):
+        granule_path = path.join(path.dirname(__file__), '../granules/not_empty_mur.nc4')
+        granule_reader = GridReadingProcessor('analysed_sst', 'lat', 'lon', time='time')
+        tile_reader = GridReadingProcessor('analysed_sst', 'lat', 'lon', time='time', max_granule_read_bytes=0)
+
+        with xr.open_dataset(granule_path) as ds:
+            for lat_start in range(0, ds.sizes['lat'], 7):
+                for lon_start in range(0, ds.sizes['lon'], 9):
+                    dimensions_to_slices = {
+                        'time': slice(0, 1),
+                        'lat': slice(lat_start, min(lat_start + 7, ds.sizes['lat'])),
+                        'lon': slice(lon_start, min(lon_start + 9, ds.sizes['lon']))
+                    }
+                    granule_tile = granule_reader._generate_tile(ds, dimensions_to_slices, nexusproto.NexusTile())
+                    tile_tile = tile_reader._generate_tile(ds, dimensions_to_slices, nexusproto.NexusTile())
+
+                    self.assertEqual(tile_tile.tile.grid_tile.time, granule_tile.tile.grid_tile.time)
+                    for field in ('latitude', 'longitude', 'variable_data'):
+                        np.testing.assert_array_equal(
+                            from_shaped_array(getattr(tile_tile.tile.grid_tile, field)),
+                            from_shaped_array(getattr(granule_tile.tile.grid_tile, field)))
+
+        self.assertIsNotNone(granule_reader._granule_arrays[1])
+        self.assertIsNone(tile_reader._granule_arrays[1])
+
+    def test_granule_arrays_are_released(self):
+        granule_path = path.join(path.dirname(__file__), '../granules/not_empty_mur.nc4')
+        reader = GridReadingProcessor('analysed_sst', 'lat', 'lon', time='time')
+        dimensions_to_slices = {'time': slice(0, 1), 'lat': slice(0, 5), 'lon': slice(0, 5)}
+
+        with xr.open_dataset(granule_path) as ds:
+            reader._generate_tile(ds, dimensions_to_slices, nexusproto.NexusTile())
+            self.assertIs(ds, reader._granule_arrays[0])
+
+            # Copies (and pickled processors) do not carry the arrays along.
+            self.assertIsNone(copy.copy(reader)._granule_arrays)
+            self.assertIsNone(pickle.loads(pickle.dumps(reader))._granule_arrays)
+
+            reader.release()
+            self.assertIsNone(reader._granule_arrays)
+
+        with xr.open_dataset(granule_path) as other_ds:
+            reader._generate_tile(other_ds, dimensions_to_slices, nexusproto.NexusTile())
+            self.assertIs(other_ds, reader._granule_arrays[0])
+
+    def test_granule_reads_are_limited_by_plan(self):
+        granule_path = path.join(path.dirname(__file__), '../granules/not_empty_mur.nc4')
+        reader = GridReadingProcessor('analysed_sst', 'lat', 'lon', time='time')
+        reader.limit_granule_read_bytes(1024)
+
+        with xr.open_dataset(granule_path) as ds:
+            reader._generate_tile(ds, {'time': slice(0, 1), 'lat': slice(0, 5), 'lon': slice(0, 5)},
+                                  nexusproto.NexusTile())
+
+        self.assertIsNone(reader._granule_arrays[1])
+
+    def test_tiles_are_handed_on_decoded(self):
+        granule_path = path.join(path.dirname(__file__), '../granules/not_empty_mur.nc4')
+        reader = GridReadingProcessor('analysed_sst', 'lat', 'lon', time='time')
+        input_tile = nexusproto.NexusTile()
+        input_tile.summary.section_spec = 'time:0:1,lat:0:5,lon:0:5'
+
+        with xr.open_dataset(granule_path) as ds:
+            expected_tile = reader.process(input_tile, ds)
+            tile = reader.process_decoded(DecodedTile(input_tile), dataset=ds)
+            self.assertFalse(tile.nexus_tile.tile.grid_tile.HasField('variable_data'))
+
+            # Later processors may change the arrays in place without touching the granule read into memory.
+            tile.get_array('latitude')[:] = 0
+            np.testing.assert_array_equal(ds['lat'].values, reader._granule_arrays[1]['lat'])
+
+        tile.set_array('latitude', from_shaped_array(expected_tile.tile.grid_tile.latitude))
+        self.assertEqual(expected_tile, tile.to_nexus_tile())
+
+    @unittest.skipUnless(importlib.util.find_spec('dask'), 'dask is needed to open granules in chunks')
+    def test_chunked_tile_read_leaves_dask_config_alone(self):
+        import dask
+
+        granule_path = path.join(path.dirname(__file__), '../granules/not_empty_mur.nc4')
+        reader = GridReadingProcessor('analysed_sst', 'lat', 'lon', time='time', max_granule_read_bytes=0)
+        dimensions_to_slices = {'time': slice(0, 1), 'lat': slice(3, 12), 'lon': slice(4, 15)}
+        scheduler = dask.config.get('scheduler', None)
+
+        with xr.open_dataset(granule_path) as ds, xr.open_dataset(granule_path, chunks={'lat': 5, 'lon': 5}) as lazy_ds:
+            tile = reader._generate_tile(ds, dimensions_to_slices, nexusproto.NexusTile())
+            lazy_tile = reader._generate_tile(lazy_ds, dimensions_to_slices, nexusproto.NexusTile())
+
+        np.testing.assert_array_equal(from_shaped_array(tile.tile.grid_tile.variable_data),
+                                      from_shaped_array(lazy_tile.tile.grid_tile.variable_data))
+        self.assertEqual(scheduler, dask.config.get('scheduler', None))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,124 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import xarray as xr
+
+from granule_ingester.slicers.SliceFileByChunks import SliceFileByChunks
+from granule_ingester.slicers.SliceFileByStepSize import SliceFileByStepSize
+
+
+class TestSliceFileByChunks(unittest.TestCase):
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._granule_path = os.path.join(self._temp_dir.name, 'chunked.nc')
+        dataset = xr.Dataset({'sst': (('time', 'lat', 'lon'), np.zeros((2, 8, 12), dtype=np.float32))})
+        dataset.to_netcdf(self._granule_path, encoding={'sst': {'chunksizes': (1, 4, 6), 'zlib': True}})
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def test_step_sizes_are_aligned_to_chunks(self):
+        self.assertEqual(6, SliceFileByChunks._align_step_size(7, 6))
+        self.assertEqual(12, SliceFileByChunks._align_step_size(15, 6))
+        self.assertEqual(3, SliceFileByChunks._align_step_size(5, 6))
+        self.assertEqual(4, SliceFileByChunks._align_step_size(4, 4))
+
+    def test_steps_are_kept_for_chunk_sizes_without_close_divisor(self):
+        # 1021 is prime, and the largest divisor of 1799 (7 * 257) below 30 is 7.
+        self.assertEqual(500, SliceFileByChunks._align_step_size(500, 1021))
+        self.assertEqual(30, SliceFileByChunks._align_step_size(30, 1799))
+
+        prime_path = os.path.join(self._temp_dir.name, 'prime.nc')
+        dataset = xr.Dataset({'sst': (('lat', 'lon'), np.zeros((14, 12), dtype=np.float32))})
+        dataset.to_netcdf(prime_path, encoding={'sst': {'chunksizes': (7, 6), 'zlib': True}})
+        with xr.open_dataset(prime_path) as dataset:
+            slicer = SliceFileByChunks(dimension_step_sizes={'lat': 5, 'lon': 6})
+            specs = [tile.summary.section_spec for tile in slicer.generate_tiles(dataset, 'prime.nc')]
+
+        expected = SliceFileByStepSize(dimension_step_sizes={'lat': 5, 'lon': 6}) \
+            ._generate_slices({'lat': 14, 'lon': 12})
+        self.assertCountEqual(expected, specs)
+
+    def test_dimensions_without_step_size_are_taken_whole(self):
+        long_time_path = os.path.join(self._temp_dir.name, 'long_time.nc')
+        dataset = xr.Dataset({'sst': (('time', 'lat', 'lon'), np.zeros((10, 8, 12), dtype=np.float32))})
+        dataset.to_netcdf(long_time_path, encoding={'sst': {'chunksizes': (4, 4, 6), 'zlib': True}})
+        with xr.open_dataset(long_time_path) as dataset:
+            slicer = SliceFileByChunks(dimension_step_sizes={'lat': 4, 'lon': 6})
+            specs = [tile.summary.section_spec for tile in slicer.generate_tiles(dataset, 'long_time.nc')]
+
+        self.assertEqual(4, len(specs))
+        self.assertTrue(all(spec.startswith('time:0:10,') for spec in specs))
+
+    def test_tiles_do_not_straddle_chunks(self):
+        with xr.open_dataset(self._granule_path) as dataset:
+            slicer = SliceFileByChunks(dimension_step_sizes={'time': 1, 'lat': 3, 'lon': 5})
+            specs = [tile.summary.section_spec for tile in slicer.generate_tiles(dataset, 'chunked.nc')]
+
+        # lat steps of 3 become 2 (a divisor of the chunk size 4), lon steps of 5 become 3 (a divisor of 6)
+        self.assertEqual(2 * 4 * 4, len(specs))
+        self.assertEqual('time:0:1,lat:0:2,lon:0:3', specs[0])
+
+        for spec in specs:
+            bounds = {dim: tuple(map(int, rest.split(':'))) for dim, rest in
+                      (part.split(':', 1) for part in spec.split(','))}
+            for dim, chunk_size in (('time', 1), ('lat', 4), ('lon', 6)):
+                start, end = bounds[dim]
+                self.assertEqual(start // chunk_size, (end - 1) // chunk_size)
+
+    def test_tiles_are_grouped_by_chunk(self):
+        with xr.open_dataset(self._granule_path) as dataset:
+            slicer = SliceFileByChunks(dimension_step_sizes={'time': 1, 'lat': 2, 'lon': 3})
+            specs = [tile.summary.section_spec for tile in slicer.generate_tiles(dataset, 'chunked.nc')]
+
+        self.assertEqual(['time:0:1,lat:0:2,lon:0:3',
+                          'time:0:1,lat:0:2,lon:3:6',
+                          'time:0:1,lat:2:4,lon:0:3',
+                          'time:0:1,lat:2:4,lon:3:6',
+                          'time:0:1,lat:0:2,lon:6:9'], specs[:5])
+
+        step_size_specs = SliceFileByStepSize(dimension_step_sizes={'time': 1, 'lat': 2, 'lon': 3}) \
+            ._generate_slices({'time': 2, 'lat': 8, 'lon': 12})
+        self.assertCountEqual(step_size_specs, specs)
+
+    def test_unaligned_steps_are_kept(self):
+        with xr.open_dataset(self._granule_path) as dataset:
+            slicer = SliceFileByChunks(dimension_step_sizes={'time': 1, 'lat': 3, 'lon': 5}, align_to_chunks=False)
+            specs = [tile.summary.section_spec for tile in slicer.generate_tiles(dataset, 'chunked.nc')]
+
+        expected = SliceFileByStepSize(dimension_step_sizes={'time': 1, 'lat': 3, 'lon': 5}) \
+            ._generate_slices({'time': 2, 'lat': 8, 'lon': 12})
+        self.assertCountEqual(expected, specs)
+
+    def test_contiguous_granule_is_sliced_by_step_size(self):
+        contiguous_path = os.path.join(self._temp_dir.name, 'contiguous.nc')
+        xr.Dataset({'sst': (('lat', 'lon'), np.zeros((8, 12), dtype=np.float32))}).to_netcdf(contiguous_path)
+        dimension_steps = {'lat': 3, 'lon': 5}
+        with xr.open_dataset(contiguous_path) as dataset:
+            slicer = SliceFileByChunks(dimension_step_sizes=dimension_steps)
+            specs = [tile.summary.section_spec for tile in slicer.generate_tiles(dataset, 'contiguous.nc')]
+
+        expected = SliceFileByStepSize(dimension_step_sizes=dimension_steps)._generate_slices({'lat': 8, 'lon': 12})
+        self.assertEqual(expected, specs)
+
+
+if __name__ == '__main__':
+    unittest.main()
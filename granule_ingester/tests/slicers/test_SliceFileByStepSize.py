@@ -115,6 +115,20 @@ class TestSliceFileByStepSize(unittest.TestCase):
 
         self.assertEqual(boundary_slices, expected_slices)
 
+    def test_iter_slices_is_lazy(self):
+        dimension_steps = {'phony_dim_0': 4, 'phony_dim_1': 4, 'phony_dim_2': 3}
+        dimension_specs = {'phony_dim_0': 8, 'phony_dim_1': 8, 'phony_dim_2': 5}
+        slicer = SliceFileByStepSize(dimension_step_sizes=dimension_steps)
+        slices = slicer._iter_slices(dimension_specs)
+
+        self.assertNotIsInstance(slices, list)
+        self.assertEqual('phony_dim_0:0:4,phony_dim_1:0:4,phony_dim_2:0:3', next(slices))
+        self.assertEqual(slicer._generate_slices(dimension_specs)[1:], list(slices))
+
+    def test_iter_slices_missing_dimension(self):
+        slicer = SliceFileByStepSize(dimension_step_sizes={'lat': 10})
+        self.assertRaises(KeyError, slicer._iter_slices, {'lon': 20})
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -49,7 +49,7 @@ class TestTileSlicer(unittest.TestCase):
 
         expected_slices = slicer._generate_slices(None)
         self.assertEqual(file_path, slicer._granule_name)
-        self.assertEqual(expected_slices, slicer._tile_spec_list)
+        self.assertEqual(expected_slices, list(slicer._tile_specs))
 
     # def test_open_s3(self):
     #     s3_path = 's3://nexus-ingest/avhrr/198109-NCEI-L4_GHRSST-SSTblend-AVHRR_OI-GLOB-v02.0-fv02.0.nc'
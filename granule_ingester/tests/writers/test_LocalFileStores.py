@@ -0,0 +1,111 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from common.async_test_utils.AsyncTestUtils import AsyncMock, async_test
+from nexusproto.DataTile_pb2 import NexusTile
+
+from granule_ingester.bulk_loader import bulk_load
+from granule_ingester.writers import LocalFileDataStore, LocalFileMetadataStore
+from granule_ingester.writers.TileSegmentWriter import TileSegmentWriter
+
+
+def ecco_tile(tile_id: str) -> NexusTile:
+    tile = NexusTile()
+    tile.summary.tile_id = tile_id
+    tile.summary.dataset_name = 'test'
+    tile.tile.ecco_tile.tile = 3
+    tile.tile.ecco_tile.variable_data.shape.extend([2, 2])
+    tile.tile.ecco_tile.variable_data.array_data = b'\x00' * 32
+    return tile
+
+
+class TestLocalFileStores(unittest.TestCase):
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self._temp_dir.name
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    @async_test
+    async def test_tiles_are_written_to_segments(self):
+        data_store = LocalFileDataStore(self.directory)
+        metadata_store = LocalFileMetadataStore(self.directory)
+        data_store.connect()
+        metadata_store.connect()
+
+        await data_store.save_batch([ecco_tile('a'), ecco_tile('b')])
+        await metadata_store.save_batch([ecco_tile('a'), ecco_tile('b')])
+        # Segments are only visible once complete.
+        self.assertEqual([], TileSegmentWriter.segments(os.path.join(self.directory, 'data')))
+        data_store.close()
+        metadata_store.close()
+
+        data_segments = TileSegmentWriter.segments(os.path.join(self.directory, 'data'))
+        data_tiles = [NexusTile.FromString(record) for record in TileSegmentWriter.read(data_segments[0])]
+        self.assertEqual(['a', 'b'], [tile.summary.tile_id for tile in data_tiles])
+        self.assertEqual(ecco_tile('a').tile, data_tiles[0].tile)
+        self.assertEqual('', data_tiles[0].summary.dataset_name)
+
+        metadata_segments = TileSegmentWriter.segments(os.path.join(self.directory, 'metadata'))
+        metadata_tiles = [NexusTile.FromString(record) for record in TileSegmentWriter.read(metadata_segments[0])]
+        self.assertEqual('test', metadata_tiles[0].summary.dataset_name)
+        self.assertEqual(3, metadata_tiles[0].tile.ecco_tile.tile)
+        self.assertFalse(metadata_tiles[0].tile.ecco_tile.HasField('variable_data'))
+
+    def test_segments_are_rotated(self):
+        writer = TileSegmentWriter(self.directory, max_segment_bytes=10)
+        writer.append([b'12345678', b'12345678', b'1'])
+        writer.close()
+
+        segments = TileSegmentWriter.segments(self.directory)
+        self.assertEqual(3, len(segments))
+        self.assertEqual([b'12345678', b'12345678', b'1'],
+                         [record for segment in segments for record in TileSegmentWriter.read(segment)])
+
+    @async_test
+    async def test_bulk_load(self):
+        data_store = LocalFileDataStore(self.directory)
+        metadata_store = LocalFileMetadataStore(self.directory)
+        data_store.connect()
+        metadata_store.connect()
+        await data_store.save_batch([ecco_tile(str(i)) for i in range(5)])
+        await metadata_store.save_batch([ecco_tile(str(i)) for i in range(5)])
+        data_store.close()
+        metadata_store.close()
+
+        target_data_store = mock.MagicMock()
+        target_data_store.save_batch = AsyncMock()
+        target_metadata_store = mock.MagicMock()
+        target_metadata_store.save_batch = AsyncMock()
+        await bulk_load(self.directory, target_data_store, target_metadata_store, batch_size=2)
+
+        self.assertEqual(3, target_data_store.save_batch.call_count)
+        self.assertEqual(3, target_metadata_store.save_batch.call_count)
+        self.assertEqual([], TileSegmentWriter.segments(os.path.join(self.directory, 'data')))
+
+        # Loaded segments are not loaded again.
+        await bulk_load(self.directory, target_data_store, target_metadata_store, batch_size=2)
+        self.assertEqual(3, target_data_store.save_batch.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,10 +15,13 @@
 
 import json
 import unittest
+from unittest import mock
 
 from nexusproto import DataTile_pb2 as nexusproto
 
+from common.async_test_utils.AsyncTestUtils import async_test
 from granule_ingester.writers import SolrStore
+from granule_ingester.writers.SolrStore import MAX_BATCH_SIZE
 
 
 class TestSolrStore(unittest.TestCase):
@@ -44,6 +47,9 @@ class TestSolrStore(unittest.TestCase):
         tile.summary.standard_name = json.dumps('sea_surface_temperature')
 
         tile.tile.ecco_tile.depth = 10.5
+        attribute = tile.summary.global_attributes.add()
+        attribute.name = 'tile_content_hash_s'
+        attribute.values.append('test_hash')
 
         metadata_store = SolrStore()
         solr_doc = metadata_store._build_solr_doc(tile)
@@ -69,6 +75,7 @@ class TestSolrStore(unittest.TestCase):
         self.assertAlmostEqual(12.5, solr_doc['tile_avg_val_d'])
         self.assertEqual(100, solr_doc['tile_count_i'])
         self.assertAlmostEqual(10.5, solr_doc['tile_depth'])
+        self.assertEqual('test_hash', solr_doc['tile_content_hash_s'])
 
     def test_build_solr_doc_no_standard_name_02(self):
         tile = nexusproto.NexusTile()
@@ -150,3 +157,18 @@ class TestSolrStore(unittest.TestCase):
         assert ['test_variable', 'test_variable_02'] == solr_doc['tile_var_name_ss']
         assert solr_doc['test_variable.tile_standard_name_s'] == 'sea_surface_temperature'
         assert 'test_variable_02.tile_standard_name_s' not in solr_doc
+
+    @async_test
+    async def test_get_content_hashes(self):
+        metadata_store = SolrStore()
+        metadata_store._solr = mock.MagicMock()
+        metadata_store._solr.search.side_effect = lambda q, fq, fl, rows: [
+            {'id': tile_id, 'tile_content_hash_s': f'hash_{tile_id}'}
+            for tile_id in fq.split('}')[1].split(',') if tile_id != 'no_hash'
+        ]
+        tile_ids = [str(i) for i in range(MAX_BATCH_SIZE + 1)] + ['no_hash']
+
+        content_hashes = await metadata_store.get_content_hashes(tile_ids)
+
+        self.assertEqual(2, metadata_store._solr.search.call_count)
+        self.assertEqual({tile_id: f'hash_{tile_id}' for tile_id in tile_ids[:-1]}, content_hashes)